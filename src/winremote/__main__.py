@@ -2,16 +2,26 @@
 
 from __future__ import annotations
 
-import base64
+import binascii
+import fnmatch
+import functools
+import inspect
+import io
+import itertools
+import mmap
+import operator
 import os
 import platform
+import re
 import subprocess
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from typing import Callable, Iterator
 
 import click
-import pyautogui
 from click.core import ParameterSource
 from dotenv import load_dotenv
 from fastmcp import FastMCP
@@ -23,18 +33,19 @@ except ImportError:
     from fastmcp.tools import ToolAnnotations
 
 from starlette.middleware import Middleware
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 
-from winremote import __version__, desktop, network, ocr, process_mgr, recording, registry, services
+from winremote import __version__, desktop
+from winremote.cache import TTLCache
 from winremote.config import discover_config_path, load_config
+from winremote.flags import tobool as _tobool
 from winremote.security import IPAllowlistMiddleware, parse_ip_allowlist
+from winremote.taskmanager import TaskStatus
 from winremote.taskmanager import manager as task_manager
 from winremote.tiers import ALL_TOOLS, get_tier_names, parse_tool_csv, resolve_enabled_tools
 
 load_dotenv()
 
-pyautogui.FAILSAFE = False
-pyautogui.PAUSE = 0.05
 
 mcp = FastMCP(
     "winremote-mcp",
@@ -56,15 +67,65 @@ async def health_check(request):
     return JSONResponse({"status": "ok", "version": __version__})
 
 
+# Screenshots taken with Snapshot(return_ref=True), fetched on demand by ID
+_snapshot_refs = TTLCache(ttl=600, maxsize=16)
+
+
+def _store_snapshot(jpeg: bytes) -> str:
+    ref = uuid.uuid4().hex
+    _snapshot_refs.set(ref, jpeg)
+    return ref
+
+
+@mcp.custom_route("/snapshot/{snapshot_id}", methods=["GET"])
+async def snapshot_image(request):
+    jpeg = _snapshot_refs.get(request.path_params["snapshot_id"])
+    if jpeg is None:
+        return JSONResponse({"error": "Snapshot not found or expired"}, status_code=404)
+    return Response(content=jpeg, media_type="image/jpeg")
+
+
+@mcp.resource("winremote://snapshot/{snapshot_id}", mime_type="image/jpeg")
+def snapshot_resource(snapshot_id: str) -> bytes:
+    """JPEG screenshot stored by Snapshot(return_ref=True)."""
+    jpeg = _snapshot_refs.get(snapshot_id)
+    if jpeg is None:
+        raise ValueError(f"Snapshot {snapshot_id} not found or expired")
+    return jpeg
+
+
+# ---------------------------------------------------------------------------
+# Tool spec table
+# ---------------------------------------------------------------------------
+
+# (fn, annotations) for every tool, in definition order. Nothing is registered
+# with the server until register_tools() picks the enabled ones.
+_TOOL_SPECS: list[tuple[Callable, dict]] = []
+
+
+def _tool(**annotations):
+    """Record a tool function and its ToolAnnotations fields in _TOOL_SPECS."""
+
+    def decorator(fn: Callable) -> Callable:
+        _TOOL_SPECS.append((fn, annotations))
+        return fn
+
+    return decorator
+
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
 
-def _tobool(v: bool | str) -> bool:
-    if isinstance(v, bool):
-        return v
-    return str(v).lower() in ("true", "1", "yes")
+@functools.cache
+def _pyautogui():
+    """Import and configure pyautogui on first use (it is slow to import)."""
+    import pyautogui
+
+    pyautogui.FAILSAFE = False
+    pyautogui.PAUSE = 0.05
+    return pyautogui
 
 
 def _check_win32(tool_name: str = "This tool") -> str | None:
@@ -74,91 +135,161 @@ def _check_win32(tool_name: str = "This tool") -> str | None:
     return None
 
 
-def _ensure_session_connected() -> str | None:
-    """Reconnect disconnected Windows session to console if needed.
+def _format_table(rows: list[tuple[str, ...]], headers: tuple[str, ...]) -> str:
+    """Left-aligned plain-text table matching tabulate's "simple" format."""
+    widths = [len(h) + 2 for h in headers]  # tabulate pads headers by 2
+    for row in rows:
+        for i, cell in enumerate(row):
+            if len(cell) > widths[i]:
+                widths[i] = len(cell)
+    lines = ["  ".join(h.ljust(w) for h, w in zip(headers, widths)), "  ".join("-" * w for w in widths)]
+    lines.extend("  ".join(c.ljust(w) for c, w in zip(row, widths)) for row in rows)
+    return "\n".join(line.rstrip() for line in lines)
+
+
+# One `query session` row: optional '>' marker, session name (blank for
+# disconnected sessions), optional username, numeric ID, state.
+_SESSION_RE = re.compile(r"^[ >]?(\S*)\s+(?:(\S+)\s+)?(\d+)\s+(\S+)", re.MULTILINE)
+# Chinese Windows reports 断开/已断开 for Disc
+_DISCONNECTED_STATES = frozenset({"disc", "断开", "已断开", "disconnected"})
+_SESSION_OK_TTL = 5.0
+_session_ok_at = 0.0
+
+
+def _parse_query_session(stdout: str) -> tuple[int, bool] | None:
+    """Pick the user session from `query session` output as (id, is_disconnected)."""
+    user_session = console_session = None
+    for m in _SESSION_RE.finditer(stdout):
+        name, user, sid, state = m.groups()
+        name = name.lower()
+        if name == "services" or (name.startswith("rdp-tcp") and not user):
+            continue
+        if user and user_session is None:
+            user_session = (int(sid), state.lower() in _DISCONNECTED_STATES)
+        elif name == "console" and console_session is None:
+            console_session = (int(sid), state.lower() in _DISCONNECTED_STATES)
+    return user_session or console_session
+
+
+def _ensure_session_connected(force: bool = False) -> str | None:
+    """Reconnect a disconnected desktop session to console.
 
-    Returns None on success, error string on failure.
+    Uses the WTS API when pywin32 provides it, else `query session` + `tscon`.
+    Returns None on success or if already connected, error string on failure.
+    A successful check is trusted for a few seconds unless ``force`` is set.
     """
+    global _session_ok_at
+    if not force and time.monotonic() - _session_ok_at < _SESSION_OK_TTL:
+        return None
     try:
-        # Query current sessions
-        result = subprocess.run(
-            ["query", "session"],
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
-
-        if result.returncode != 0:
-            return f"Failed to query sessions: {result.stderr}"
+        if desktop.HAS_WTS:
+            session = desktop.find_user_session()
+        else:
+            result = subprocess.run(["query", "session"], capture_output=True, text=True, timeout=10)
+            if result.returncode != 0:
+                return f"Failed to query sessions: {result.stderr}"
+            session = _parse_query_session(result.stdout)
 
-        session_lines = result.stdout.strip().split("\n")
-        user_session_id = None
-        session_status = None
+        if session is None:
+            return "No user session found"
+        session_id, disconnected = session
 
-        # Parse session output to find user session
-        for line in session_lines[1:]:  # Skip header
-            if not line.strip():
-                continue
-            parts = line.split()
-            if len(parts) >= 3:
-                session_name = parts[0]
-                username = parts[1] if parts[1] != ">" else parts[2]
-                session_id = parts[2] if parts[1] != ">" else parts[1]
-                state = parts[3] if parts[1] != ">" else parts[2]
-
-                # Look for a user session (not services or console without user)
-                if (
-                    username
-                    and username.lower() not in ["", "services"]
-                    and session_name.lower() not in ["services", "console"]
-                    and session_id.isdigit()
-                ):
-                    user_session_id = int(session_id)
-                    session_status = state.lower()
-                    break
-
-        if user_session_id is None:
-            return "No user session found to reconnect"
-
-        # If session is already active, no need to reconnect
-        if session_status == "active":
-            return None
-
-        # Reconnect session to console
-        result = subprocess.run(
-            ["tscon", str(user_session_id), "/dest:console"],
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
+        if not disconnected and not force:
+            _session_ok_at = time.monotonic()
+            return None  # Already connected
 
-        if result.returncode == 0:
-            return None  # Success
+        if desktop.HAS_WTS:
+            desktop.connect_session_to_console(session_id)
         else:
-            error_msg = result.stderr.strip() or result.stdout.strip() or "Unknown error"
-            return f"Failed to reconnect session {user_session_id}: {error_msg}"
-
+            result = subprocess.run(
+                ["tscon", str(session_id), "/dest:console"],
+                capture_output=True,
+                text=True,
+                timeout=10,
+            )
+            if result.returncode != 0:
+                err = result.stderr.strip() or result.stdout.strip() or "Unknown error"
+                return f"tscon failed: {err}"
+        time.sleep(1)  # Wait for session to stabilize
+        _session_ok_at = time.monotonic()
+        return None
     except subprocess.TimeoutExpired:
-        return "Session reconnect operation timed out"
+        return "Session reconnect timed out"
     except Exception as e:
         return f"Session reconnect error: {e}"
 
 
 # ============================= DESKTOP CONTROL =============================
 
+# Windows listed by Snapshot, in z-order (topmost first); the rest are counted
+_SNAPSHOT_MAX_WINDOWS = 40
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="Snapshot",
-        readOnlyHint=True,
-        openWorldHint=False,
-    )
+# Runs the UI tree scan alongside the screen grab in Snapshot and AnnotatedSnapshot
+_snapshot_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="snapshot")
+
+# Pulls a UI rect's edges as one (left, top, right, bottom) tuple
+_RECT_EDGES = operator.itemgetter("left", "top", "right", "bottom")
+
+
+# Element labels longer than this (document titles, edit contents) are cut short
+_ELEMENT_TEXT_MAX = 60
+
+
+def _element_line(el: dict) -> str:
+    """One '[index] label — center (x,y)' line, shared by Snapshot and AnnotatedSnapshot."""
+    left, top, right, bottom = _RECT_EDGES(el["rect"])
+    label = el["text"] or el["class"]
+    if len(label) > _ELEMENT_TEXT_MAX:
+        label = label[: _ELEMENT_TEXT_MAX - 1] + "…"
+    return f"  [{el['index']}] {label} — center ({(left + right) // 2},{(top + bottom) // 2})"
+
+
+@functools.lru_cache(maxsize=4)
+def _get_font(size: int):
+    """Load the annotation font once per size; falls back to PIL's bitmap font."""
+    from PIL import ImageFont
+
+    try:
+        return ImageFont.truetype("arial.ttf", size)
+    except Exception:
+        return ImageFont.load_default()
+
+
+@functools.lru_cache(maxsize=4)
+def _digit_metrics(size: int) -> tuple[float, int]:
+    """(advance per digit, digit height) for sizing numeric labels without per-label getbbox."""
+    left, top, right, bottom = _get_font(size).getbbox("0123456789")
+    return (right - left) / 10, bottom - top
+
+
+# Annotation colours as RGB tuples, so Pillow doesn't parse colour names per draw call
+_RED = (255, 0, 0)
+_WHITE = (255, 255, 255)
+
+
+@functools.lru_cache(maxsize=128)
+def _label_tile(label: str, size: int):
+    """White-on-red number label, rendered once and pasted wherever it's needed."""
+    from PIL import Image, ImageDraw
+
+    advance, height = _digit_metrics(size)
+    tile = Image.new("RGB", (int(len(label) * advance) + 7, height + 5), _RED)
+    ImageDraw.Draw(tile).text((3, 1), label, fill=_WHITE, font=_get_font(size))
+    return tile
+
+
+@_tool(
+    title="Snapshot",
+    readOnlyHint=True,
+    openWorldHint=False,
 )
 def Snapshot(
     use_vision: bool | str = True,
     quality: int = 75,
     max_width: int = 0,
     monitor: int = 0,
+    grayscale: bool | str = False,
+    return_ref: bool | str = False,
 ) -> list:
     """Capture desktop screenshot, window list, and interactive UI elements.
 
@@ -167,19 +298,27 @@ def Snapshot(
         quality: JPEG quality 1-100 (default 75). Lower = smaller.
         max_width: Max image width in pixels. 0=native resolution (default). Set to e.g. 1920 to downscale.
         monitor: Monitor to capture. 0=all monitors (default), 1/2/3=specific monitor.
+        grayscale: Send a grayscale image (default False). Much smaller; enough for reading UI state.
+        return_ref: Keep the image server-side and return a reference instead (default False).
+            Read it as resource winremote://snapshot/<id> or GET /snapshot/<id>; kept for 10 minutes.
 
     Returns a list containing:
     - Screenshot image as JPEG (if use_vision=True)
-    - Text summary of windows and UI elements
+    - Text summary of windows and UI elements, with the image and screen resolution
     """
     try:
         parts = []
         use_vision = _tobool(use_vision)
+        grayscale = _tobool(grayscale)
+        return_ref = _tobool(return_ref)
+        # Enumerate windows/elements on the pool while this thread grabs the screen
+        tree = _snapshot_pool.submit(desktop.snapshot_tree)
+        win_lines = [f"**System Language:** {desktop._get_system_language()}"]
 
         # Screenshot (auto-reconnect session if grab fails)
         if use_vision:
             try:
-                b64 = desktop.take_screenshot(quality=quality, max_width=max_width, monitor=monitor)
+                shot = desktop.capture_screenshot(quality, max_width, monitor, grayscale, raw=return_ref)
             except Exception as screenshot_error:
                 # Check if a disconnected session is the cause
                 reconnect_result = _ensure_session_connected()
@@ -188,28 +327,36 @@ def Snapshot(
                     return [f"Snapshot error: {screenshot_error}"]
                 # Session was disconnected and reconnected, retry
                 try:
-                    b64 = desktop.take_screenshot(quality=quality, max_width=max_width, monitor=monitor)
+                    shot = desktop.capture_screenshot(quality, max_width, monitor, grayscale, raw=return_ref)
                 except Exception as retry_error:
                     return [f"Snapshot error (after session reconnect): {retry_error}"]
-            parts.append(ImageContent(type="image", data=b64, mimeType="image/jpeg"))
+            if return_ref:
+                ref = _store_snapshot(shot.data)
+                win_lines.append(f"**Screenshot ref:** winremote://snapshot/{ref} (HTTP: GET /snapshot/{ref})")
+            else:
+                parts.append(ImageContent(type="image", data=shot.data, mimeType="image/jpeg"))
+            if shot.width != shot.native_width:
+                win_lines.append(
+                    f"**Screenshot:** {shot.width}x{shot.height} of a {shot.native_width}x{shot.native_height} "
+                    f"screen — multiply image coordinates by {shot.scale:.3f} for Click/Move"
+                )
+            else:
+                win_lines.append(f"**Screenshot:** {shot.width}x{shot.height} (native resolution)")
 
         # Window list
-        windows = desktop.enumerate_windows()
-        win_lines = [f"**System Language:** {desktop._get_system_language()}", "", "**Windows:**"]
-        for w in windows:
-            win_lines.append(f"  [{w.handle}] {w.title} ({w.width}x{w.height} at {w.rect[0]},{w.rect[1]})")
+        windows, elements = tree.result()
+        win_lines += ("", "**Windows:**")
+        win_lines.extend(
+            f"  [{w.handle}] {w.title} ({w.width}x{w.height} at {w.rect[0]},{w.rect[1]})"
+            for w in windows[:_SNAPSHOT_MAX_WINDOWS]
+        )
+        if len(windows) > _SNAPSHOT_MAX_WINDOWS:
+            win_lines.append(f"  [... {len(windows) - _SNAPSHOT_MAX_WINDOWS} more]")
 
         # Interactive elements from foreground window
-        elements = desktop.get_interactive_elements()
         if elements:
-            win_lines.append("")
-            win_lines.append("**Interactive Elements (foreground window):**")
-            for el in elements[:50]:  # limit
-                r = el["rect"]
-                cx = (r["left"] + r["right"]) // 2
-                cy = (r["top"] + r["bottom"]) // 2
-                label = el["text"] or el["class"]
-                win_lines.append(f"  [{el['index']}] {label} — center ({cx},{cy})")
+            win_lines += ("", "**Interactive Elements (foreground window):**")
+            win_lines.extend(map(_element_line, elements[:50]))  # limit
 
         parts.append(TextContent(type="text", text="\n".join(win_lines)))
         return parts
@@ -217,12 +364,10 @@ def Snapshot(
         return [f"Snapshot error: {e}"]
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="Click",
-        destructiveHint=False,
-        openWorldHint=False,
-    )
+@_tool(
+    title="Click",
+    destructiveHint=False,
+    openWorldHint=False,
 )
 def Click(
     x: int,
@@ -238,26 +383,59 @@ def Click(
         button: 'left', 'right', or 'middle'.
         action: 'click', 'double', or 'hover'.
     """
+    from winremote import sendinput
+
+    pyautogui = _pyautogui()
+    desktop.invalidate_ui_cache()
     try:
-        if action == "hover":
+        if sendinput.HAS_SENDINPUT and button in sendinput.MOUSE_BUTTONS:
+            # One SendInput burst, without pyautogui's PAUSE after each primitive
+            sendinput.click_at(x, y, button, {"hover": 0, "double": 2}.get(action, 1))
+        elif action == "hover":
             pyautogui.moveTo(x, y)
-            return f"Hovered at ({x},{y})"
         elif action == "double":
             pyautogui.doubleClick(x, y, button=button)
-            return f"Double-clicked {button} at ({x},{y})"
         else:
             pyautogui.click(x, y, button=button)
+        if action == "hover":
+            return f"Hovered at ({x},{y})"
+        elif action == "double":
+            return f"Double-clicked {button} at ({x},{y})"
+        else:
             return f"Clicked {button} at ({x},{y})"
     except Exception as e:
         return f"Click error: {e}"
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="Type",
-        destructiveHint=False,
-        openWorldHint=False,
-    )
+# Type(mode="auto") pastes anything longer than this instead of sending key presses
+_PASTE_MIN_CHARS = 40
+# Gap between keystrokes for Type(mode="slow") and the pyautogui fallback
+_SLOW_TYPE_INTERVAL = 0.02
+
+
+def _paste_text(text: str, pyautogui, saved: dict) -> None:
+    """Paste *text* with Ctrl+V, then put back the clipboard captured in *saved*."""
+    from winremote import sendinput
+
+    try:
+        # Inside the try: set_clipboard may fail after emptying the clipboard
+        result = desktop.set_clipboard(text)
+        if result.startswith("Error"):
+            raise RuntimeError(f"clipboard unavailable ({result})")
+        if sendinput.HAS_SENDINPUT:
+            sendinput.send_hotkey(sendinput.parse_hotkey("ctrl+v"))
+        else:
+            pyautogui.hotkey("ctrl", "v")
+        # The target reads the clipboard while handling the paste; give it a moment before restoring
+        time.sleep(0.1)
+    finally:
+        desktop.restore_clipboard(saved)
+
+
+@_tool(
+    title="Type",
+    destructiveHint=False,
+    openWorldHint=False,
 )
 def Type(
     text: str,
@@ -265,6 +443,7 @@ def Type(
     y: int = 0,
     clear: bool | str = False,
     press_enter: bool | str = False,
+    mode: str = "auto",
 ) -> str:
     """Type text, optionally at specific coordinates.
 
@@ -274,29 +453,62 @@ def Type(
         y: Y coordinate (0 = current position).
         clear: Clear existing content first (Ctrl+A, Delete).
         press_enter: Press Enter after typing.
+        mode: 'keystroke' sends key presses, 'paste' pastes via the clipboard (restored afterwards),
+            'auto' (default) pastes text longer than 40 chars unless the clipboard holds data
+            it can't restore (images, files). Use 'keystroke' for fields that reject paste,
+            'slow' (keystrokes 20 ms apart) for apps that drop fast input.
     """
+    from winremote import sendinput
+
+    if mode not in ("auto", "keystroke", "paste", "slow"):
+        return f"Type error: unknown mode '{mode}' (use auto, keystroke, paste, or slow)"
+    paste = mode == "paste" or (mode == "auto" and len(text) > _PASTE_MIN_CHARS and desktop.HAS_WIN32)
+    saved: dict = {}
+    if paste:
+        try:
+            saved = desktop.snapshot_clipboard()
+        except RuntimeError as e:
+            # Never overwrite clipboard data that can't be put back
+            if mode == "paste":
+                return f"Type error: cannot paste without losing the clipboard ({e}); use mode='keystroke'"
+            paste = False
+    pyautogui = _pyautogui()
+    desktop.invalidate_ui_cache()
     try:
         if x and y:
-            pyautogui.click(x, y)
+            if sendinput.HAS_SENDINPUT:
+                sendinput.click_at(x, y)
+            else:
+                pyautogui.click(x, y)
             time.sleep(0.1)
         if _tobool(clear):
-            pyautogui.hotkey("ctrl", "a")
-            pyautogui.press("delete")
+            if sendinput.HAS_SENDINPUT:
+                sendinput.send_hotkey(sendinput.parse_hotkey("ctrl+a"))
+                sendinput.send_hotkey(sendinput.parse_hotkey("delete"))
+            else:
+                pyautogui.hotkey("ctrl", "a")
+                pyautogui.press("delete")
             time.sleep(0.05)
-        pyautogui.typewrite(text, interval=0.02) if text.isascii() else pyautogui.write(text)
+        if paste:
+            _paste_text(text, pyautogui, saved)
+        elif sendinput.HAS_SENDINPUT:
+            sendinput.type_text(text, interval=_SLOW_TYPE_INTERVAL if mode == "slow" else 0.0)
+        else:
+            pyautogui.typewrite(text, interval=_SLOW_TYPE_INTERVAL) if text.isascii() else pyautogui.write(text)
         if _tobool(press_enter):
-            pyautogui.press("enter")
-        return f"Typed {len(text)} chars"
+            if sendinput.HAS_SENDINPUT:
+                sendinput.send_hotkey(sendinput.parse_hotkey("enter"))
+            else:
+                pyautogui.press("enter")
+        return f"{'Pasted' if paste else 'Typed'} {len(text)} chars"
     except Exception as e:
         return f"Type error: {e}"
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="Scroll",
-        destructiveHint=False,
-        openWorldHint=False,
-    )
+@_tool(
+    title="Scroll",
+    destructiveHint=False,
+    openWorldHint=False,
 )
 def Scroll(
     amount: int,
@@ -312,25 +524,32 @@ def Scroll(
         y: Y coordinate (0 = current).
         horizontal: Horizontal scroll instead of vertical.
     """
+    from winremote import sendinput
+
+    pyautogui = _pyautogui()
+    desktop.invalidate_ui_cache()
     try:
-        if x and y:
-            pyautogui.moveTo(x, y)
-        if _tobool(horizontal):
-            pyautogui.hscroll(amount)
+        horizontal = _tobool(horizontal)
+        if sendinput.HAS_SENDINPUT:
+            move = [sendinput.move_input(x, y)] if x and y else []
+            sendinput.send_inputs([*move, sendinput.scroll_input(amount, horizontal)])
         else:
-            pyautogui.scroll(amount)
-        direction = "horizontally" if _tobool(horizontal) else "vertically"
+            if x and y:
+                pyautogui.moveTo(x, y)
+            if horizontal:
+                pyautogui.hscroll(amount)
+            else:
+                pyautogui.scroll(amount)
+        direction = "horizontally" if horizontal else "vertically"
         return f"Scrolled {amount} {direction}"
     except Exception as e:
         return f"Scroll error: {e}"
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="Move",
-        destructiveHint=False,
-        openWorldHint=False,
-    )
+@_tool(
+    title="Move",
+    destructiveHint=False,
+    openWorldHint=False,
 )
 def Move(
     x: int,
@@ -348,27 +567,34 @@ def Move(
         drag: If true, drag from start position to target.
         start_x: Drag start X.
         start_y: Drag start Y.
-        duration: Movement duration in seconds.
+        duration: Movement duration in seconds (0 = jump straight there).
     """
+    from winremote import sendinput
+
+    pyautogui = _pyautogui()
     try:
         if _tobool(drag):
             if start_x and start_y:
                 pyautogui.moveTo(start_x, start_y)
-            pyautogui.drag(x - pyautogui.position()[0], y - pyautogui.position()[1], duration=duration)
+            cx, cy = pyautogui.position()
+            pyautogui.drag(x - cx, y - cy, duration=duration)
             return f"Dragged to ({x},{y})"
+        elif duration <= 0 and sendinput.HAS_SENDINPUT:
+            sendinput.click_at(x, y, clicks=0)
         else:
             pyautogui.moveTo(x, y, duration=duration)
-            return f"Moved to ({x},{y})"
+        return f"Moved to ({x},{y})"
     except Exception as e:
         return f"Move error: {e}"
+    finally:
+        # A drag can change the UI without moving any window (sliders, reordered lists)
+        desktop.invalidate_ui_cache()
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="Shortcut",
-        destructiveHint=False,
-        openWorldHint=False,
-    )
+@_tool(
+    title="Shortcut",
+    destructiveHint=False,
+    openWorldHint=False,
 )
 def Shortcut(keys: str) -> str:
     """Execute keyboard shortcut.
@@ -376,7 +602,19 @@ def Shortcut(keys: str) -> str:
     Args:
         keys: Shortcut string, e.g. 'ctrl+c', 'alt+tab', 'win+e'.
     """
+    from winremote import sendinput
+
+    pyautogui = _pyautogui()
+    desktop.invalidate_ui_cache()
     try:
+        if sendinput.HAS_SENDINPUT:
+            try:
+                vks = sendinput.parse_hotkey(keys)
+            except KeyError:
+                vks = ()  # key name SendInput doesn't know — let pyautogui map it
+            if vks:
+                sendinput.send_hotkey(vks)
+                return f"Executed shortcut: {keys}"
         parts = [k.strip() for k in keys.lower().split("+")]
         pyautogui.hotkey(*parts)
         return f"Executed shortcut: {keys}"
@@ -384,12 +622,46 @@ def Shortcut(keys: str) -> str:
         return f"Shortcut error: {e}"
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="Wait",
-        readOnlyHint=True,
-        openWorldHint=False,
-    )
+@_tool(
+    title="InputBatch",
+    destructiveHint=False,
+    openWorldHint=False,
+)
+def InputBatch(actions: list[dict]) -> str:
+    """Run a sequence of mouse/keyboard actions in one call.
+
+    Much faster than separate Move/Click/Type/Shortcut calls: the whole sequence is
+    sent as one input burst, split only at waits. Steps run in the order given.
+
+    Args:
+        actions: Steps, each a dict with an 'action' key:
+            {"action": "move", "x": 100, "y": 200}
+            {"action": "click", "x": 100, "y": 200, "button": "left", "clicks": 1}  (x/y optional)
+            {"action": "scroll", "amount": -3, "horizontal": false}
+            {"action": "keys", "keys": "ctrl+s"}
+            {"action": "type", "text": "hello"}
+            {"action": "wait", "seconds": 0.5}  (max 10)
+    """
+    from winremote import batch
+
+    try:
+        steps = batch.parse_steps(actions)
+    except ValueError as e:
+        return f"InputBatch error: {e}"
+    desktop.invalidate_ui_cache()
+    try:
+        batch.run_steps(steps, _pyautogui())
+        return f"Ran {len(actions)} actions"
+    except KeyError as e:
+        return f"InputBatch error: unknown key {e}"
+    except Exception as e:
+        return f"InputBatch error: {e}"
+
+
+@_tool(
+    title="Wait",
+    readOnlyHint=True,
+    openWorldHint=False,
 )
 def Wait(seconds: float = 1.0) -> str:
     """Pause execution.
@@ -404,12 +676,10 @@ def Wait(seconds: float = 1.0) -> str:
 # =========================== WINDOW MANAGEMENT ============================
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="FocusWindow",
-        destructiveHint=False,
-        openWorldHint=False,
-    )
+@_tool(
+    title="FocusWindow",
+    destructiveHint=False,
+    openWorldHint=False,
 )
 def FocusWindow(title: str = "", handle: int = 0) -> str:
     """Bring a window to the foreground.
@@ -421,33 +691,31 @@ def FocusWindow(title: str = "", handle: int = 0) -> str:
     err = _check_win32("FocusWindow")
     if err:
         return err
+    desktop.invalidate_ui_cache()
     try:
         return desktop.focus_window(title=title or None, handle=handle or None)
     except Exception as e:
         return f"FocusWindow error: {e}"
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="MinimizeAll",
-        destructiveHint=False,
-        openWorldHint=False,
-    )
+@_tool(
+    title="MinimizeAll",
+    destructiveHint=False,
+    openWorldHint=False,
 )
 def MinimizeAll() -> str:
     """Minimize all windows (Win+D — show desktop)."""
+    desktop.invalidate_ui_cache()
     try:
         return desktop.minimize_all()
     except Exception as e:
         return f"MinimizeAll error: {e}"
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="App",
-        destructiveHint=False,
-        openWorldHint=True,
-    )
+@_tool(
+    title="App",
+    destructiveHint=False,
+    openWorldHint=True,
 )
 def App(
     action: str = "launch",
@@ -467,6 +735,7 @@ def App(
         width: New width (for resize).
         height: New height (for resize).
     """
+    desktop.invalidate_ui_cache()
     try:
         if action == "launch":
             return desktop.launch_app(name, args)
@@ -490,30 +759,26 @@ def App(
 # =========================== REMOTE MANAGEMENT ============================
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="Shell",
-        destructiveHint=True,
-        openWorldHint=True,
-    )
+@_tool(
+    title="Shell",
+    destructiveHint=True,
+    openWorldHint=True,
 )
 def Shell(command: str, timeout: int = 30, cwd: str = "") -> str:
     """Execute a PowerShell command.
 
+    Blocks until the command finishes; for anything that may take more than a
+    few seconds use ShellStart and PollJob instead.
+
     Args:
         command: PowerShell command to execute.
         timeout: Timeout in seconds (default 30).
         cwd: Working directory. If provided, the command runs inside that directory.
     """
+    from winremote import pshost
+
     try:
-        if cwd:
-            command = f"cd {cwd}; {command}"
-        result = subprocess.run(
-            ["powershell", "-NoProfile", "-Command", command],
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-        )
+        result = pshost.run(command, timeout=timeout, cwd=cwd)
         output = result.stdout
         if result.stderr:
             output += f"\n[STDERR] {result.stderr}"
@@ -526,12 +791,29 @@ def Shell(command: str, timeout: int = 30, cwd: str = "") -> str:
         return f"Shell error: {e}"
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="GetClipboard",
-        readOnlyHint=True,
-        openWorldHint=False,
-    )
+@_tool(
+    title="ShellStart",
+    destructiveHint=True,
+    openWorldHint=True,
+)
+async def ShellStart(command: str, timeout: int = 600, cwd: str = "") -> str:
+    """Start a PowerShell command in the background and return a job ID immediately.
+
+    Poll the job with PollJob until it finishes.
+
+    Args:
+        command: PowerShell command to execute.
+        timeout: Timeout in seconds (default 600).
+        cwd: Working directory. If provided, the command runs inside that directory.
+    """
+    job = task_manager.submit("ShellStart", Shell, command, timeout, cwd)
+    return f"Started job {job.task_id}. Call PollJob(job_id='{job.task_id}') for the result."
+
+
+@_tool(
+    title="GetClipboard",
+    readOnlyHint=True,
+    openWorldHint=False,
 )
 def GetClipboard() -> str:
     """Read the Windows clipboard text content."""
@@ -544,12 +826,10 @@ def GetClipboard() -> str:
         return f"GetClipboard error: {e}"
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="SetClipboard",
-        destructiveHint=False,
-        openWorldHint=False,
-    )
+@_tool(
+    title="SetClipboard",
+    destructiveHint=False,
+    openWorldHint=False,
 )
 def SetClipboard(text: str) -> str:
     """Set the Windows clipboard text content.
@@ -566,12 +846,10 @@ def SetClipboard(text: str) -> str:
         return f"SetClipboard error: {e}"
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="ListProcesses",
-        readOnlyHint=True,
-        openWorldHint=False,
-    )
+@_tool(
+    title="ListProcesses",
+    readOnlyHint=True,
+    openWorldHint=False,
 )
 def ListProcesses(
     filter: str = "",
@@ -585,18 +863,18 @@ def ListProcesses(
         sort_by: Sort by 'cpu', 'memory', or 'name'.
         limit: Max number of processes to return.
     """
+    from winremote import process_mgr
+
     try:
         return process_mgr.list_processes(filter_name=filter, sort_by=sort_by, limit=limit)
     except Exception as e:
         return f"ListProcesses error: {e}"
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="KillProcess",
-        destructiveHint=True,
-        openWorldHint=False,
-    )
+@_tool(
+    title="KillProcess",
+    destructiveHint=True,
+    openWorldHint=False,
 )
 def KillProcess(pid: int = 0, name: str = "") -> str:
     """Kill a process by PID or name.
@@ -605,96 +883,30 @@ def KillProcess(pid: int = 0, name: str = "") -> str:
         pid: Process ID.
         name: Process name (fuzzy matched).
     """
+    from winremote import process_mgr
+
     try:
         return process_mgr.kill_process(pid=pid, name=name)
     except Exception as e:
         return f"KillProcess error: {e}"
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="GetSystemInfo",
-        readOnlyHint=True,
-        openWorldHint=False,
-    )
+@_tool(
+    title="GetSystemInfo",
+    readOnlyHint=True,
+    openWorldHint=False,
 )
 def GetSystemInfo() -> str:
     """Get system information: CPU, memory, disk, network, uptime."""
+    from winremote import process_mgr
+
     try:
         return process_mgr.get_system_info()
     except Exception as e:
         return f"GetSystemInfo error: {e}"
 
 
-def _ensure_session_connected(force: bool = False) -> str | None:
-    """Reconnect a disconnected desktop session to console.
-
-    Returns None on success or if already connected, error string on failure.
-    """
-    try:
-        result = subprocess.run(["query", "session"], capture_output=True, text=True, timeout=10)
-        if result.returncode != 0:
-            return f"Failed to query sessions: {result.stderr}"
-
-        lines = result.stdout.strip().split("\n")
-        user_session_id = None
-        is_disconnected = False
-
-        for line in lines[1:]:
-            line = line.lstrip(">").strip()
-            if not line:
-                continue
-            parts = line.split()
-            if len(parts) < 4:
-                continue
-            # Format: sessionname username ID state ...
-            # or:     sessionname          ID state ... (no user)
-            name = parts[0].lower()
-            if name in ("services", "rdp-tcp"):
-                continue
-            # Find the numeric session ID and state
-            for i, p in enumerate(parts[1:], 1):
-                if p.isdigit():
-                    sid = int(p)
-                    if i + 1 < len(parts):
-                        state = parts[i + 1].lower()
-                        # Check if there's a username before the ID
-                        has_user = i > 1 and not parts[i - 1].isdigit()
-                        if has_user or name == "console":
-                            user_session_id = sid
-                            # Chinese Windows: 已断开=Disc, 运行中=Active
-                            is_disconnected = state in (
-                                "disc",
-                                "断开",
-                                "已断开",
-                                "disconnected",
-                            )
-                    break
-
-        if user_session_id is None:
-            return "No user session found"
-
-        if not is_disconnected and not force:
-            return None  # Already connected
-
-        result = subprocess.run(
-            ["tscon", str(user_session_id), "/dest:console"],
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
-        if result.returncode != 0:
-            err = result.stderr.strip() or result.stdout.strip() or "Unknown error"
-            return f"tscon failed: {err}"
-        time.sleep(1)  # Wait for session to stabilize
-        return None
-    except subprocess.TimeoutExpired:
-        return "Session reconnect timed out"
-    except Exception as e:
-        return f"Session reconnect error: {e}"
-
-
-@mcp.tool(annotations=ToolAnnotations(title="ReconnectSession", readOnlyHint=False))
+@_tool(title="ReconnectSession", readOnlyHint=False)
 def ReconnectSession(force: bool = False) -> list:
     """Reconnect a disconnected Windows desktop session to the console.
 
@@ -711,12 +923,10 @@ def ReconnectSession(force: bool = False) -> list:
     return [TextContent(type="text", text="Session connected to console")]
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="Notification",
-        destructiveHint=False,
-        openWorldHint=False,
-    )
+@_tool(
+    title="Notification",
+    destructiveHint=False,
+    openWorldHint=False,
 )
 def Notification(title: str = "winremote-mcp", message: str = "") -> str:
     """Show a Windows toast notification.
@@ -731,12 +941,10 @@ def Notification(title: str = "winremote-mcp", message: str = "") -> str:
         return f"Notification error: {e}"
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="LockScreen",
-        destructiveHint=True,
-        openWorldHint=False,
-    )
+@_tool(
+    title="LockScreen",
+    destructiveHint=True,
+    openWorldHint=False,
 )
 def LockScreen() -> str:
     """Lock the Windows workstation."""
@@ -746,45 +954,53 @@ def LockScreen() -> str:
         return f"LockScreen error: {e}"
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="Scrape",
-        readOnlyHint=True,
-        openWorldHint=True,
-    )
+@_tool(
+    title="Scrape",
+    readOnlyHint=True,
+    openWorldHint=True,
 )
-def Scrape(url: str) -> str:
+async def Scrape(url: str) -> str:
     """Fetch URL content and return as markdown.
 
     Args:
         url: URL to fetch.
     """
+    from winremote import scrape
+
     try:
-        import urllib.request
-
-        from markdownify import markdownify
-
-        req = urllib.request.Request(url, headers={"User-Agent": "winremote-mcp/0.3"})
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            html = resp.read().decode("utf-8", errors="replace")
-        md = markdownify(html, heading_style="ATX", strip=["script", "style"])
-        # Truncate
-        if len(md) > 50000:
-            md = md[:50000] + "\n\n[... truncated]"
-        return md
+        return await scrape.fetch_markdown(url)
     except Exception as e:
         return f"Scrape error: {e}"
 
 
+@_tool(
+    title="ScrapeStart",
+    readOnlyHint=True,
+    openWorldHint=True,
+)
+async def ScrapeStart(url: str) -> str:
+    """Start fetching a URL in the background and return a job ID immediately.
+
+    Poll the job with PollJob to get the page as markdown.
+
+    Args:
+        url: URL to fetch.
+    """
+    job = task_manager.submit("ScrapeStart", Scrape, url)
+    return f"Started job {job.task_id}. Call PollJob(job_id='{job.task_id}') for the result."
+
+
 # ============================== FILE OPERATIONS ============================
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="FileRead",
-        readOnlyHint=True,
-        openWorldHint=False,
-    )
+_FILE_READ_MAX_CHARS = 100_000
+_FILE_READ_MAX_BYTES = 10 * 1024 * 1024  # binary mode
+
+
+@_tool(
+    title="FileRead",
+    readOnlyHint=True,
+    openWorldHint=False,
 )
 def FileRead(path: str, encoding: str = "utf-8") -> str:
     """Read file content. Returns base64 for binary files.
@@ -797,24 +1013,27 @@ def FileRead(path: str, encoding: str = "utf-8") -> str:
         p = Path(path)
         if not p.exists():
             return f"File not found: {path}"
+        size = p.stat().st_size
         if encoding == "binary":
-            data = p.read_bytes()
-            return base64.b64encode(data).decode()
+            _, b64 = _b64encode_file(p, _FILE_READ_MAX_BYTES)
+            if size > _FILE_READ_MAX_BYTES:
+                b64 += f"\n\n[... truncated at 10MB of {size} bytes; use FileDownload for the full file]"
+            return b64
         else:
-            text = p.read_text(encoding=encoding, errors="replace")
-            if len(text) > 100000:
-                text = text[:100000] + "\n\n[... truncated at 100KB]"
+            # Text-mode read(n) counts characters and decodes incrementally
+            with open(p, encoding=encoding, errors="replace") as f:
+                text = f.read(_FILE_READ_MAX_CHARS + 1)
+            if len(text) > _FILE_READ_MAX_CHARS:
+                text = text[:_FILE_READ_MAX_CHARS] + f"\n\n[... truncated at 100KB of {size} bytes]"
             return text
     except Exception as e:
         return f"FileRead error: {e}"
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="FileWrite",
-        destructiveHint=True,
-        openWorldHint=False,
-    )
+@_tool(
+    title="FileWrite",
+    destructiveHint=True,
+    openWorldHint=False,
 )
 def FileWrite(path: str, content: str, encoding: str = "utf-8", append: bool | str = False) -> str:
     """Write content to a file.
@@ -836,12 +1055,21 @@ def FileWrite(path: str, content: str, encoding: str = "utf-8", append: bool | s
         return f"FileWrite error: {e}"
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="FileList",
-        readOnlyHint=True,
-        openWorldHint=False,
-    )
+# (threshold, unit) from largest to smallest; sizes below all thresholds print in bytes
+_SIZE_UNITS = ((1048576, "MB"), (1024, "KB"))
+
+
+def _format_size(size: int) -> str:
+    for threshold, unit in _SIZE_UNITS:
+        if size >= threshold:
+            return f"{size // threshold}{unit}"
+    return f"{size}B"
+
+
+@_tool(
+    title="FileList",
+    readOnlyHint=True,
+    openWorldHint=False,
 )
 def FileList(path: str = ".", show_hidden: bool | str = False) -> str:
     """List directory contents with size and modification date.
@@ -851,49 +1079,87 @@ def FileList(path: str = ".", show_hidden: bool | str = False) -> str:
         show_hidden: Include hidden files/folders.
     """
     try:
-        from tabulate import tabulate
-
-        p = Path(path)
-        if not p.is_dir():
+        if not os.path.isdir(path):
             return f"Not a directory: {path}"
 
+        show_hidden = _tobool(show_hidden)
+        with os.scandir(path) as it:
+            # Drop hidden entries before sorting rather than after
+            entries = sorted(
+                (e for e in it if show_hidden or not e.name.startswith(".")),
+                key=lambda e: os.path.normcase(e.name),
+            )
+
         rows = []
-        for item in sorted(p.iterdir()):
-            name = item.name
-            if not _tobool(show_hidden) and name.startswith("."):
-                continue
+        for entry in entries:
+            name = entry.name
             try:
-                stat = item.stat()
-                size = stat.st_size
+                # DirEntry caches the directory-walk data; no extra syscall on Windows
+                stat = entry.stat(follow_symlinks=False)
+                is_dir = entry.is_dir()
                 mtime = datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M")
-                kind = "DIR" if item.is_dir() else "FILE"
-                if item.is_dir():
-                    size_str = "<DIR>"
-                elif size < 1024:
-                    size_str = f"{size}B"
-                elif size < 1048576:
-                    size_str = f"{size // 1024}KB"
+                if is_dir:
+                    rows.append(("DIR", name, "<DIR>", mtime))
                 else:
-                    size_str = f"{size // 1048576}MB"
-                rows.append([kind, name, size_str, mtime])
+                    rows.append(("FILE", name, _format_size(stat.st_size), mtime))
             except Exception:
-                rows.append(["?", name, "?", "?"])
+                rows.append(("?", name, "?", "?"))
 
         if not rows:
             return "Directory is empty."
-        return tabulate(rows, headers=["Type", "Name", "Size", "Modified"], tablefmt="simple")
+        return _format_table(rows, ("Type", "Name", "Size", "Modified"))
     except Exception as e:
         return f"FileList error: {e}"
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="FileSearch",
-        readOnlyHint=True,
-        openWorldHint=False,
-    )
+def _iter_file_matches(root: str, pattern: str, recursive: bool) -> Iterator[tuple[str, os.DirEntry | None]]:
+    """Yield ``(path, entry)`` for files under *root* whose name matches the glob *pattern*, lazily.
+
+    Plain name patterns walk the tree with os.scandir and one precompiled regex;
+    *entry* is the match's DirEntry, whose stat() reuses the directory listing on
+    Windows. Patterns containing a path separator fall back to pathlib globbing,
+    with *entry* None.
+    """
+    if "/" in pattern or os.sep in pattern:
+        p = Path(root)
+        for path in p.rglob(pattern) if recursive else p.glob(pattern):
+            yield str(path), None
+        return
+    if not os.path.isdir(root):
+        return
+    # normcase keeps Windows matching case-insensitive, like pathlib's glob
+    match = re.compile(fnmatch.translate(os.path.normcase(pattern))).match
+    normcase = os.path.normcase
+    # Depth-first, each directory's matches before its subdirectories (like os.walk);
+    # unreadable directories are skipped and symlinked ones not followed
+    pending = [root]
+    while pending:
+        try:
+            it = os.scandir(pending.pop())
+        except OSError:
+            continue
+        subdirs = []
+        with it:
+            for entry in it:
+                if match(normcase(entry.name)):
+                    yield str(Path(entry.path)), entry
+                if recursive:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                    except OSError:
+                        pass
+        pending.extend(reversed(subdirs))
+
+
+@_tool(
+    title="FileSearch",
+    readOnlyHint=True,
+    openWorldHint=False,
 )
-def FileSearch(pattern: str, path: str = ".", recursive: bool | str = True, limit: int = 50) -> str:
+def FileSearch(
+    pattern: str, path: str = ".", recursive: bool | str = True, limit: int = 50, exact_count: bool | str = False
+) -> str:
     """Search files by name pattern.
 
     Args:
@@ -901,28 +1167,35 @@ def FileSearch(pattern: str, path: str = ".", recursive: bool | str = True, limi
         path: Root directory to search.
         recursive: Search subdirectories.
         limit: Max results.
+        exact_count: Keep walking past the limit to report the total number of matches (slower).
     """
     try:
-        p = Path(path)
-        if _tobool(recursive):
-            matches = list(p.rglob(pattern))
-        else:
-            matches = list(p.glob(pattern))
-
-        if not matches:
+        limit = max(limit, 0)
+        exact_count = _tobool(exact_count)
+        found = _iter_file_matches(path, pattern, _tobool(recursive))
+        matches = list(itertools.islice(found, limit))
+        # Only the first `limit` paths are kept; beyond that, just count. Without
+        # exact_count, stop one past the limit: enough to know the listing was cut short.
+        rest = found if exact_count else itertools.islice(found, 1)
+        extra = sum(1 for _ in rest)
+
+        if not matches and not extra:
             return f"No files matching '{pattern}' in {path}"
 
         lines = []
-        for m in matches[:limit]:
+        for m, entry in matches:
             try:
-                size = m.stat().st_size
+                size = (entry.stat() if entry is not None else os.stat(m)).st_size
                 lines.append(f"  {m} ({size} bytes)")
             except Exception:
                 lines.append(f"  {m}")
 
-        result = f"Found {len(matches)} files"
-        if len(matches) > limit:
-            result += f" (showing first {limit})"
+        if extra and exact_count:
+            result = f"Found {limit + extra} files (showing first {limit})"
+        elif extra:
+            result = f"Found more than {limit} files (showing first {limit})"
+        else:
+            result = f"Found {len(matches)} files"
         result += ":\n" + "\n".join(lines)
         return result
     except Exception as e:
@@ -932,12 +1205,51 @@ def FileSearch(pattern: str, path: str = ".", recursive: bool | str = True, limi
 # ========================== FILE TRANSFER (BINARY) =========================
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="FileDownload",
-        readOnlyHint=True,
-        openWorldHint=False,
-    )
+# Multiples of 3 raw bytes / 4 base64 chars, so chunks encode/decode independently.
+_B64_RAW_CHUNK = 3 * 21845  # ~64 KiB
+_B64_TEXT_CHUNK = 4 * 16384  # 64 KiB of base64 text
+
+
+def _b64encode_file(p: Path, limit: int | None = None) -> tuple[int, str]:
+    """Base64-encode a file (or its first *limit* bytes) chunk by chunk. Returns (raw size, encoded text).
+
+    Regular files are memory-mapped so chunks are encoded straight from the page
+    cache; anything mmap refuses (empty files, pipes) is read instead.
+    """
+    out = bytearray()
+    size = 0
+    with open(p, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            while chunk := f.read(_B64_RAW_CHUNK if limit is None else min(_B64_RAW_CHUNK, limit - size)):
+                size += len(chunk)
+                out += binascii.b2a_base64(chunk, newline=False)
+            return size, out.decode("ascii")
+        with mm, memoryview(mm) as view:
+            size = len(mm) if limit is None else min(len(mm), limit)
+            for i in range(0, size, _B64_RAW_CHUNK):
+                out += binascii.b2a_base64(view[i : min(i + _B64_RAW_CHUNK, size)], newline=False)
+    return size, out.decode("ascii")
+
+
+def _b64decode_to_file(data_base64: str, p: Path) -> int:
+    """Decode base64 text into a file in aligned slices. Returns bytes written."""
+    text = "".join(data_base64.split())  # drop line breaks so slices stay 4-aligned
+    size = 0
+    with open(p, "wb") as f:
+        for i in range(0, len(text), _B64_TEXT_CHUNK):
+            # a2b_base64 takes the str slice directly; b64decode would copy it to bytes first
+            chunk = binascii.a2b_base64(text[i : i + _B64_TEXT_CHUNK])
+            f.write(chunk)
+            size += len(chunk)
+    return size
+
+
+@_tool(
+    title="FileDownload",
+    readOnlyHint=True,
+    openWorldHint=False,
 )
 def FileDownload(path: str) -> str:
     """Download a file as base64-encoded content. Use for binary files.
@@ -949,19 +1261,16 @@ def FileDownload(path: str) -> str:
         p = Path(path)
         if not p.exists():
             return f"File not found: {path}"
-        data = p.read_bytes()
-        b64 = base64.b64encode(data).decode()
-        return f"base64:{len(data)}bytes:{b64}"
+        size, b64 = _b64encode_file(p)
+        return f"base64:{size}bytes:{b64}"
     except Exception as e:
         return f"FileDownload error: {e}"
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="FileUpload",
-        destructiveHint=True,
-        openWorldHint=False,
-    )
+@_tool(
+    title="FileUpload",
+    destructiveHint=True,
+    openWorldHint=False,
 )
 def FileUpload(path: str, data_base64: str) -> str:
     """Upload a file from base64-encoded content. Use for binary files.
@@ -973,9 +1282,8 @@ def FileUpload(path: str, data_base64: str) -> str:
     try:
         p = Path(path)
         p.parent.mkdir(parents=True, exist_ok=True)
-        data = base64.b64decode(data_base64)
-        p.write_bytes(data)
-        return f"Written {len(data)} bytes to {path}"
+        size = _b64decode_to_file(data_base64, p)
+        return f"Written {size} bytes to {path}"
     except Exception as e:
         return f"FileUpload error: {e}"
 
@@ -983,12 +1291,10 @@ def FileUpload(path: str, data_base64: str) -> str:
 # ============================== REGISTRY ===================================
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="RegRead",
-        readOnlyHint=True,
-        openWorldHint=False,
-    )
+@_tool(
+    title="RegRead",
+    readOnlyHint=True,
+    openWorldHint=False,
 )
 def RegRead(key: str, value_name: str) -> str:
     """Read a Windows registry value.
@@ -997,18 +1303,18 @@ def RegRead(key: str, value_name: str) -> str:
         key: Registry key path, e.g. "HKLM\\SOFTWARE\\Microsoft\\Windows\\CurrentVersion".
         value_name: Name of the value to read.
     """
+    from winremote import registry
+
     try:
         return registry.reg_read(key, value_name)
     except Exception as e:
         return f"RegRead error: {e}"
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="RegWrite",
-        destructiveHint=True,
-        openWorldHint=False,
-    )
+@_tool(
+    title="RegWrite",
+    destructiveHint=True,
+    openWorldHint=False,
 )
 def RegWrite(key: str, value_name: str, data: str, reg_type: str = "REG_SZ") -> str:
     """Write a Windows registry value.
@@ -1019,6 +1325,8 @@ def RegWrite(key: str, value_name: str, data: str, reg_type: str = "REG_SZ") ->
         data: Value data. For REG_DWORD/REG_QWORD pass as string number. For REG_MULTI_SZ use | separator.
         reg_type: Registry type: REG_SZ, REG_EXPAND_SZ, REG_DWORD, REG_QWORD, REG_BINARY, REG_MULTI_SZ.
     """
+    from winremote import registry
+
     try:
         return registry.reg_write(key, value_name, data, reg_type)
     except Exception as e:
@@ -1028,12 +1336,10 @@ def RegWrite(key: str, value_name: str, data: str, reg_type: str = "REG_SZ") ->
 # ============================= SERVICES ====================================
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="ServiceList",
-        readOnlyHint=True,
-        openWorldHint=False,
-    )
+@_tool(
+    title="ServiceList",
+    readOnlyHint=True,
+    openWorldHint=False,
 )
 def ServiceList(filter: str = "") -> str:
     """List Windows services.
@@ -1041,18 +1347,18 @@ def ServiceList(filter: str = "") -> str:
     Args:
         filter: Filter by service name or display name (substring match).
     """
+    from winremote import services
+
     try:
         return services.service_list(filter)
     except Exception as e:
         return f"ServiceList error: {e}"
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="ServiceStart",
-        destructiveHint=True,
-        openWorldHint=False,
-    )
+@_tool(
+    title="ServiceStart",
+    destructiveHint=True,
+    openWorldHint=False,
 )
 def ServiceStart(name: str) -> str:
     """Start a Windows service.
@@ -1060,18 +1366,18 @@ def ServiceStart(name: str) -> str:
     Args:
         name: Service name.
     """
+    from winremote import services
+
     try:
         return services.service_start(name)
     except Exception as e:
         return f"ServiceStart error: {e}"
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="ServiceStop",
-        destructiveHint=True,
-        openWorldHint=False,
-    )
+@_tool(
+    title="ServiceStop",
+    destructiveHint=True,
+    openWorldHint=False,
 )
 def ServiceStop(name: str) -> str:
     """Stop a Windows service.
@@ -1079,6 +1385,8 @@ def ServiceStop(name: str) -> str:
     Args:
         name: Service name.
     """
+    from winremote import services
+
     try:
         return services.service_stop(name)
     except Exception as e:
@@ -1088,12 +1396,10 @@ def ServiceStop(name: str) -> str:
 # ========================= SCHEDULED TASKS =================================
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="TaskList",
-        readOnlyHint=True,
-        openWorldHint=False,
-    )
+@_tool(
+    title="TaskList",
+    readOnlyHint=True,
+    openWorldHint=False,
 )
 def TaskList(filter: str = "") -> str:
     """List Windows scheduled tasks.
@@ -1101,18 +1407,18 @@ def TaskList(filter: str = "") -> str:
     Args:
         filter: Filter by task name (substring match).
     """
+    from winremote import services
+
     try:
         return services.task_list(filter)
     except Exception as e:
         return f"TaskList error: {e}"
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="TaskCreate",
-        destructiveHint=True,
-        openWorldHint=False,
-    )
+@_tool(
+    title="TaskCreate",
+    destructiveHint=True,
+    openWorldHint=False,
 )
 def TaskCreate(name: str, command: str, schedule: str) -> str:
     """Create a Windows scheduled task.
@@ -1122,18 +1428,18 @@ def TaskCreate(name: str, command: str, schedule: str) -> str:
         command: Command to execute.
         schedule: Schedule type (ONCE, DAILY, WEEKLY, MONTHLY, ONSTART, ONLOGON, ONIDLE).
     """
+    from winremote import services
+
     try:
         return services.task_create(name, command, schedule)
     except Exception as e:
         return f"TaskCreate error: {e}"
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="TaskDelete",
-        destructiveHint=True,
-        openWorldHint=False,
-    )
+@_tool(
+    title="TaskDelete",
+    destructiveHint=True,
+    openWorldHint=False,
 )
 def TaskDelete(name: str) -> str:
     """Delete a Windows scheduled task.
@@ -1141,6 +1447,8 @@ def TaskDelete(name: str) -> str:
     Args:
         name: Task name.
     """
+    from winremote import services
+
     try:
         return services.task_delete(name)
     except Exception as e:
@@ -1150,34 +1458,32 @@ def TaskDelete(name: str) -> str:
 # ============================= NETWORK =====================================
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="Ping",
-        readOnlyHint=True,
-        openWorldHint=True,
-    )
+@_tool(
+    title="Ping",
+    readOnlyHint=True,
+    openWorldHint=True,
 )
-def Ping(host: str, count: int = 4) -> str:
+async def Ping(host: str, count: int = 4) -> str:
     """Ping a host.
 
     Args:
         host: Hostname or IP address.
         count: Number of ping requests (default 4).
     """
+    from winremote import network
+
     try:
-        return network.ping(host, count)
+        return await network.ping(host, count)
     except Exception as e:
         return f"Ping error: {e}"
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="PortCheck",
-        readOnlyHint=True,
-        openWorldHint=True,
-    )
+@_tool(
+    title="PortCheck",
+    readOnlyHint=True,
+    openWorldHint=True,
 )
-def PortCheck(host: str, port: int, timeout: float = 5.0) -> str:
+async def PortCheck(host: str, port: int, timeout: float = 5.0) -> str:
     """Check if a TCP port is open.
 
     Args:
@@ -1185,18 +1491,18 @@ def PortCheck(host: str, port: int, timeout: float = 5.0) -> str:
         port: Port number.
         timeout: Connection timeout in seconds (default 5).
     """
+    from winremote import network
+
     try:
-        return network.port_check(host, port, timeout)
+        return await network.port_check(host, port, timeout)
     except Exception as e:
         return f"PortCheck error: {e}"
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="NetConnections",
-        readOnlyHint=True,
-        openWorldHint=False,
-    )
+@_tool(
+    title="NetConnections",
+    readOnlyHint=True,
+    openWorldHint=False,
 )
 def NetConnections(filter: str = "", limit: int = 50) -> str:
     """List network connections.
@@ -1205,6 +1511,8 @@ def NetConnections(filter: str = "", limit: int = 50) -> str:
         filter: Filter connections by local/remote address, status, or PID.
         limit: Maximum number of connections to return (default 50).
     """
+    from winremote import network
+
     try:
         return network.net_connections(filter, limit=limit)
     except Exception as e:
@@ -1214,12 +1522,10 @@ def NetConnections(filter: str = "", limit: int = 50) -> str:
 # ============================ EVENT LOG ====================================
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="EventLog",
-        readOnlyHint=True,
-        openWorldHint=False,
-    )
+@_tool(
+    title="EventLog",
+    readOnlyHint=True,
+    openWorldHint=False,
 )
 def EventLog(log_name: str = "System", count: int = 20, level: str = "") -> str:
     """Read Windows Event Log entries.
@@ -1229,6 +1535,8 @@ def EventLog(log_name: str = "System", count: int = 20, level: str = "") -> str:
         count: Number of entries to retrieve (default 20).
         level: Filter by level: critical, error, warning, information, verbose.
     """
+    from winremote import services
+
     try:
         return services.event_log(log_name, count, level)
     except Exception as e:
@@ -1238,12 +1546,10 @@ def EventLog(log_name: str = "System", count: int = 20, level: str = "") -> str:
 # ============================== OCR ========================================
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="OCR",
-        readOnlyHint=True,
-        openWorldHint=False,
-    )
+@_tool(
+    title="OCR",
+    readOnlyHint=True,
+    openWorldHint=False,
 )
 def OCR(
     left: int = 0,
@@ -1254,15 +1560,17 @@ def OCR(
 ) -> str:
     """Extract text from screen using OCR. Captures a region or the full screen.
 
-    Uses pytesseract if available, falls back to Windows built-in OCR engine.
+    Uses tesserocr or pytesseract if available, falls back to Windows built-in OCR engine.
 
     Args:
         left: Left edge of region (0 = full screen).
         top: Top edge of region.
         right: Right edge of region.
         bottom: Bottom edge of region.
-        lang: OCR language for pytesseract (default 'eng').
+        lang: Tesseract OCR language (default 'eng').
     """
+    from winremote import ocr
+
     try:
         region = {}
         if left or top or right or bottom:
@@ -1280,12 +1588,10 @@ def OCR(
 # ========================== SCREEN RECORDING ===============================
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="ScreenRecord",
-        readOnlyHint=True,
-        openWorldHint=False,
-    )
+@_tool(
+    title="ScreenRecord",
+    readOnlyHint=True,
+    openWorldHint=False,
 )
 def ScreenRecord(
     duration: float = 3.0,
@@ -1307,11 +1613,13 @@ def ScreenRecord(
         bottom: Bottom edge of capture region.
         max_width: Max width of output GIF (default 800).
     """
+    from winremote import recording
+
     try:
         region = {}
         if left or top or right or bottom:
             region = {"left": left, "top": top, "right": right, "bottom": bottom}
-        b64 = recording.record_screen(duration=duration, fps=fps, max_width=max_width, **region)
+        b64 = recording.record_screen(duration=duration, fps=fps, max_width=max_width, palette="fixed", **region)
         return [
             ImageContent(type="image", data=b64, mimeType="image/gif"),
             TextContent(
@@ -1326,17 +1634,29 @@ def ScreenRecord(
 # ======================== ANNOTATED SNAPSHOT ===============================
 
 
-@mcp.tool(
-    annotations=ToolAnnotations(
-        title="AnnotatedSnapshot",
-        readOnlyHint=True,
-        openWorldHint=False,
-    )
+_ANNOTATED_MIME_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp"}
+
+
+def _encode_annotated(img, quality: int, fmt: str) -> str:
+    """Base64 of *img* as JPEG or WebP."""
+    if fmt == "webp":
+        buf = io.BytesIO()
+        # WebP's prediction suits the flat boxes and labels; method=4 is libwebp's default speed
+        img.save(buf, format="WEBP", quality=quality, method=4)
+        return desktop.b64_text(buf.getbuffer())
+    return desktop.b64_text(desktop._encode_jpeg(img, quality))
+
+
+@_tool(
+    title="AnnotatedSnapshot",
+    readOnlyHint=True,
+    openWorldHint=False,
 )
 def AnnotatedSnapshot(
     max_elements: int = 30,
     quality: int = 75,
     max_width: int = 0,
+    fmt: str = "jpeg",
 ) -> list:
     """Take a screenshot with numbered labels on interactive UI elements.
 
@@ -1345,23 +1665,27 @@ def AnnotatedSnapshot(
 
     Args:
         max_elements: Maximum number of elements to annotate (default 30).
-        quality: JPEG quality 1-100 (default 75).
+        quality: Image quality 1-100 (default 75).
         max_width: Max image width in pixels. 0=native resolution (default).
+        fmt: 'jpeg' (default) or 'webp' (smaller, if the client accepts it).
     """
+    if fmt not in _ANNOTATED_MIME_TYPES:
+        return [TextContent(type="text", text=f"AnnotatedSnapshot error: unknown fmt '{fmt}' (use jpeg or webp)")]
     try:
-        import io
+        from PIL import Image, ImageDraw
 
-        from PIL import ImageDraw, ImageFont, ImageGrab
+        # Scan the UI on the pool while this thread grabs the screen
+        scan = _snapshot_pool.submit(desktop.get_interactive_elements)
 
-        # Take screenshot (auto-reconnect session if grab fails)
+        # Take screenshot of the primary monitor (auto-reconnect session if grab fails)
         try:
-            img = ImageGrab.grab()
+            img = desktop._grab_screen(1)
         except Exception as screenshot_error:
             reconnect_result = _ensure_session_connected()
             if reconnect_result is not None:
                 return [TextContent(type="text", text=f"AnnotatedSnapshot error: {screenshot_error}")]
             try:
-                img = ImageGrab.grab()
+                img = desktop._grab_screen(1)
             except Exception as retry_error:
                 return [
                     TextContent(
@@ -1369,66 +1693,47 @@ def AnnotatedSnapshot(
                         text=f"AnnotatedSnapshot error (after session reconnect): {retry_error}",
                     )
                 ]
+        scale = 1.0
         if max_width > 0 and img.width > max_width:
-            ratio = max_width / img.width
-            img = img.resize((max_width, int(img.height * ratio)))
+            scale = max_width / img.width
+            # Bilinear is plenty for a labelled overview and cheaper than the bicubic default;
+            # an integer box reduce goes first (4K -> 1920 is just reduce(2))
+            img = desktop._downscale(img, max_width, int(img.height * scale), Image.Resampling.BILINEAR)
 
-        # Get interactive elements
-        elements = desktop.get_interactive_elements()
+        elements = scan.result()
         if not elements:
             # Return screenshot with no annotations
-            buf = io.BytesIO()
-            img.save(buf, format="JPEG", quality=quality)
-            b64 = base64.b64encode(buf.getvalue()).decode()
+            b64 = _encode_annotated(img, quality, fmt)
             return [
-                ImageContent(type="image", data=b64, mimeType="image/jpeg"),
+                ImageContent(type="image", data=b64, mimeType=_ANNOTATED_MIME_TYPES[fmt]),
                 TextContent(type="text", text="No interactive elements found."),
             ]
 
         draw = ImageDraw.Draw(img)
+        # Labels shrink with the image, but stay legible
+        font_size = max(10, round(14 * scale))
+
+        # Boxes in one pass up front (scaled only if the image was resized); the text
+        # lines reuse Snapshot's formatter
+        shown = elements[:max_elements]
+        if scale == 1.0:
+            boxes = [_RECT_EDGES(el["rect"]) for el in shown]
+        else:
+            boxes = [tuple(int(v * scale) for v in _RECT_EDGES(el["rect"])) for el in shown]
+        element_lines = list(map(_element_line, shown))
 
-        # Try to get a font
-        try:
-            font = ImageFont.truetype("arial.ttf", 14)
-        except Exception:
-            font = ImageFont.load_default()
-
-        # Scale factor if image was resized
-        scale = img.width / ImageGrab.grab().width if img.width != ImageGrab.grab().width else 1.0
-
-        element_lines = []
-        for el in elements[:max_elements]:
-            idx = el["index"]
-            r = el["rect"]
-            x1 = int(r["left"] * scale)
-            y1 = int(r["top"] * scale)
-            x2 = int(r["right"] * scale)
-            y2 = int(r["bottom"] * scale)
-
+        for el, (x1, y1, x2, y2) in zip(shown, boxes):
             # Draw red rectangle
-            draw.rectangle([x1, y1, x2, y2], outline="red", width=2)
-
-            # Draw label background + number
-            label = str(idx)
-            bbox = font.getbbox(label)
-            lw = bbox[2] - bbox[0] + 6
-            lh = bbox[3] - bbox[1] + 4
-            draw.rectangle([x1, y1 - lh - 2, x1 + lw, y1 - 2], fill="red")
-            draw.text((x1 + 3, y1 - lh - 1), label, fill="white", font=font)
-
-            # Build text description
-            cx = (r["left"] + r["right"]) // 2
-            cy = (r["top"] + r["bottom"]) // 2
-            name = el["text"] or el["class"]
-            element_lines.append(f"  [{idx}] {name} — center ({cx},{cy})")
+            draw.rectangle([x1, y1, x2, y2], outline=_RED, width=2)
+            # Number label just above its top-left corner
+            tile = _label_tile(str(el["index"]), font_size)
+            img.paste(tile, (x1, y1 - tile.height - 1))
 
-        buf = io.BytesIO()
-        img.save(buf, format="JPEG", quality=quality)
-        b64 = base64.b64encode(buf.getvalue()).decode()
+        b64 = _encode_annotated(img, quality, fmt)
 
-        text_summary = f"**Annotated {len(element_lines)} elements:**\n" + "\n".join(element_lines)
+        text_summary = "\n".join([f"**Annotated {len(element_lines)} elements:**", *element_lines])
         return [
-            ImageContent(type="image", data=b64, mimeType="image/jpeg"),
+            ImageContent(type="image", data=b64, mimeType=_ANNOTATED_MIME_TYPES[fmt]),
             TextContent(type="text", text=text_summary),
         ]
     except Exception as e:
@@ -1438,7 +1743,7 @@ def AnnotatedSnapshot(
 # ================================ Task Management ================================
 
 
-@mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+@_tool(readOnlyHint=True)
 def CancelTask(task_id: str) -> str:
     """Cancel a running or pending task by its task ID.
 
@@ -1451,7 +1756,7 @@ def CancelTask(task_id: str) -> str:
     return f"Cancelled task {task_id} ({result['tool_name']})"
 
 
-@mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+@_tool(readOnlyHint=True)
 def GetTaskStatus(task_id: str = "") -> str:
     """Get status of a specific task or list recent tasks.
 
@@ -1464,7 +1769,7 @@ def GetTaskStatus(task_id: str = "") -> str:
         info = task_manager.get_task(task_id)
         if info is None:
             return f"Task {task_id} not found"
-        return json.dumps(info, indent=2)
+        return json.dumps(info, separators=(",", ":"))
     tasks = task_manager.list_tasks()
     if not tasks:
         return "No tasks in history."
@@ -1476,7 +1781,26 @@ def GetTaskStatus(task_id: str = "") -> str:
     return "\n".join(lines)
 
 
-@mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+@_tool(readOnlyHint=True)
+def PollJob(job_id: str) -> str:
+    """Get the status of a ShellStart/ScrapeStart job, and its output once finished.
+
+    Args:
+        job_id: The job ID returned by ShellStart or ScrapeStart.
+    """
+    job = task_manager.get_job(job_id)
+    if job is None:
+        return f"Job {job_id} not found"
+    dur = f" ({job.duration}s)" if job.duration is not None else ""
+    status = f"Job {job_id} ({job.tool_name}): {job.status.value}{dur}"
+    if job.status == TaskStatus.COMPLETED:
+        return f"{status}\n{job.result}"
+    if job.status == TaskStatus.FAILED:
+        return f"{status}\nError: {job.error}"
+    return status
+
+
+@_tool(readOnlyHint=True)
 def GetRunningTasks() -> str:
     """List all currently running and pending tasks."""
 
@@ -1492,7 +1816,7 @@ def GetRunningTasks() -> str:
     return "\n".join(lines)
 
 
-# ====================== Apply task manager wrapping ========================
+# ============================ Tool registration ============================
 
 
 def _get_registered_tools() -> dict[str, object]:
@@ -1520,65 +1844,55 @@ def _get_registered_tools() -> dict[str, object]:
     raise RuntimeError("Unsupported fastmcp internals: cannot locate registered tools")
 
 
-def _remove_tool(name: str) -> None:
-    """Remove a tool by name across fastmcp 2.x/3.x internals."""
-    # fastmcp 2.x
-    tool_mgr = getattr(mcp, "_tool_manager", None)
-    tools = getattr(tool_mgr, "_tools", None)
-    if isinstance(tools, dict):
-        tools.pop(name, None)
-        return
+# Task management tools and job starters (which track their own job) aren't wrapped
+_UNWRAPPED_TOOLS = frozenset({"CancelTask", "GetTaskStatus", "GetRunningTasks", "PollJob", "ShellStart", "ScrapeStart"})
 
-    # fastmcp 3.x
-    provider = getattr(mcp, "_local_provider", None)
-    components = getattr(provider, "_components", None)
-    if isinstance(components, dict):
-        keys_to_remove = [
-            k
-            for k, v in components.items()
-            if isinstance(k, str)
-            and k.startswith("tool:")
-            and ((getattr(v, "name", None) == name) or k.split(":", 1)[1].split("@", 1)[0] == name)
-        ]
-        for k in keys_to_remove:
-            components.pop(k, None)
-        return
 
+def register_tools(enabled: set[str] | None = None) -> list[str]:
+    """Register tools from _TOOL_SPECS with the server, wrapped by the task manager.
 
-def _wrap_all_tools():
-    """Wrap all registered MCP tools with task manager for error resilience + concurrency."""
-    # Skip wrapping the task management tools themselves
-    skip = {"CancelTask", "GetTaskStatus", "GetRunningTasks"}
-    for name, tool in _get_registered_tools().items():
-        if name in skip:
+    Only names in ``enabled`` are registered (all tools when None); tools that
+    are already registered are left alone. Sync tools are offloaded to worker
+    threads so blocking calls don't stall the event loop; ``async def`` tools
+    run on the loop directly. Returns the names registered by this call.
+    """
+    registered = _get_registered_tools()
+    added = []
+    for fn, ann in _TOOL_SPECS:
+        name = fn.__name__
+        if name in registered or (enabled is not None and name not in enabled):
             continue
-        original_fn = getattr(tool, "fn", None)
-        if callable(original_fn):
-            tool.fn = task_manager.wrap_sync_tool(name, original_fn)
+        mcp.tool(annotations=ToolAnnotations(**ann))(fn)
+        added.append((name, fn))
+
+    # One registry lookup for the whole batch; on fastmcp 3.x it is rebuilt per call
+    registered = _get_registered_tools()
+    for name, fn in added:
+        if name in _UNWRAPPED_TOOLS:
+            continue
+        if inspect.iscoroutinefunction(fn):
+            registered[name].fn = task_manager.wrap_async_tool(name, fn)
+        else:
+            registered[name].fn = task_manager.wrap_threaded_tool(name, fn)
+    return [name for name, _ in added]
 
 
-_wrap_all_tools()
+_EXPLICIT_SOURCES = frozenset({ParameterSource.COMMANDLINE, ParameterSource.ENVIRONMENT})
 
 
-def _param_explicit(ctx: click.Context, name: str) -> bool:
-    src = ctx.get_parameter_source(name)
-    return src in {ParameterSource.COMMANDLINE, ParameterSource.ENVIRONMENT}
+def _explicit_params(ctx: click.Context) -> set[str]:
+    """Names of the parameters set on the command line or via environment."""
+    return {name for name in ctx.params if ctx.get_parameter_source(name) in _EXPLICIT_SOURCES}
 
 
-def _choose_value(ctx: click.Context, name: str, cli_value, config_value, default_value):
-    if _param_explicit(ctx, name):
+def _choose_value(explicit: bool, cli_value, config_value, default_value):
+    if explicit:
         return cli_value
     if config_value is not None:
         return config_value
     return default_value
 
 
-def _apply_tool_filter(enabled_tools: set[str]) -> None:
-    for tool_name in list(_get_registered_tools().keys()):
-        if tool_name not in enabled_tools:
-            _remove_tool(tool_name)
-
-
 # ================================== CLI ====================================
 
 
@@ -1623,20 +1937,21 @@ def cli(
     config_path = discover_config_path(config)
     cfg = load_config(config_path)
 
-    host = _choose_value(ctx, "host", host, cfg.server.host, "127.0.0.1")
-    port = int(_choose_value(ctx, "port", port, cfg.server.port, 8090))
-    auth_key = _choose_value(ctx, "auth_key", auth_key, cfg.server.auth_key, None)
+    explicit = _explicit_params(ctx)
+    host = _choose_value("host" in explicit, host, cfg.server.host, "127.0.0.1")
+    port = int(_choose_value("port" in explicit, port, cfg.server.port, 8090))
+    auth_key = _choose_value("auth_key" in explicit, auth_key, cfg.server.auth_key, None)
 
-    enable_tier3 = bool(_choose_value(ctx, "enable_tier3", enable_tier3, cfg.security.enable_tier3, False))
-    disable_tier2 = bool(_choose_value(ctx, "disable_tier2", disable_tier2, cfg.security.disable_tier2, False))
+    enable_tier3 = bool(_choose_value("enable_tier3" in explicit, enable_tier3, cfg.security.enable_tier3, False))
+    disable_tier2 = bool(_choose_value("disable_tier2" in explicit, disable_tier2, cfg.security.disable_tier2, False))
 
     cli_tools = parse_tool_csv(tools)
     cli_excluded = parse_tool_csv(exclude_tools)
     cli_allowlist = parse_tool_csv(ip_allowlist)
 
-    selected_tools = cli_tools if _param_explicit(ctx, "tools") else cfg.tools.enable
-    excluded_tools = cli_excluded if _param_explicit(ctx, "exclude_tools") else cfg.tools.exclude
-    allowlist_entries = cli_allowlist if _param_explicit(ctx, "ip_allowlist") else cfg.security.ip_allowlist
+    selected_tools = cli_tools if "tools" in explicit else cfg.tools.enable
+    excluded_tools = cli_excluded if "exclude_tools" in explicit else cfg.tools.exclude
+    allowlist_entries = cli_allowlist if "ip_allowlist" in explicit else cfg.security.ip_allowlist
 
     enabled_tools = resolve_enabled_tools(
         enable_tier3=enable_tier3,
@@ -1645,7 +1960,7 @@ def cli(
         explicit_tools=selected_tools,
         exclude_tools=excluded_tools,
     )
-    _apply_tool_filter(enabled_tools)
+    register_tools(enabled_tools)
     enabled_tiers = get_tier_names(enabled_tools)
 
     middleware: list[Middleware] = []
@@ -1661,42 +1976,48 @@ def cli(
 
     import logging
 
+    banner_logger = logging.getLogger("uvicorn.error")
+
     class BannerFilter(logging.Filter):
         """Inject our banner after uvicorn's 'Application startup complete' log."""
 
         _shown = False
 
         def filter(self, record):
-            if not self._shown and "Application startup complete" in record.getMessage():
-                self._shown = True
-                auth_line = "[auth ON]" if auth_key else "[no auth]"
-                bind_line = f"[{host}:{port}]"
-                tiers_line = f"[tiers: {','.join(enabled_tiers)}]"
-                tools_line = f"[tools: {len(enabled_tools)}/{len(ALL_TOOLS)}]"
-                pad = " " * 10  # align with uvicorn log text
-                ver_line = f"winremote-mcp v{__version__}"
-                lines = [
-                    f"{pad}+----------------------------------+",
-                    f"{pad}|  {ver_line:<32s}|",
-                    f"{pad}|  by dddabtc                      |",
-                    f"{pad}|  github.com/dddabtc              |",
-                    f"{pad}|  {auth_line:<32s}|",
-                    f"{pad}|  {bind_line:<32s}|",
-                    f"{pad}|  {tiers_line:<16s}{tools_line:<16s}|",
-                    f"{pad}+----------------------------------+",
-                ]
-                if host == "0.0.0.0" and not auth_key:
-                    lines.append(f"{pad}  WARNING: open to network without auth!")
-                    lines.append(f"{pad}  Use --auth-key for security.")
-                if enable_all:
-                    lines.append(f"{pad}  INFO: High-risk Tier 3 tools enabled!")
-                print("\n" + "\n".join(lines) + "\n", flush=True)
+            if self._shown or "Application startup complete" not in record.getMessage():
+                return True
+            self._shown = True
+            # Detach so later records skip the filter entirely. Rebinding rather than
+            # removeFilter() keeps the list the logger is iterating right now intact.
+            banner_logger.filters = [f for f in banner_logger.filters if f is not self]
+            auth_line = "[auth ON]" if auth_key else "[no auth]"
+            bind_line = f"[{host}:{port}]"
+            tiers_line = f"[tiers: {','.join(enabled_tiers)}]"
+            tools_line = f"[tools: {len(enabled_tools)}/{len(ALL_TOOLS)}]"
+            pad = " " * 10  # align with uvicorn log text
+            ver_line = f"winremote-mcp v{__version__}"
+            lines = [
+                f"{pad}+----------------------------------+",
+                f"{pad}|  {ver_line:<32s}|",
+                f"{pad}|  by dddabtc                      |",
+                f"{pad}|  github.com/dddabtc              |",
+                f"{pad}|  {auth_line:<32s}|",
+                f"{pad}|  {bind_line:<32s}|",
+                f"{pad}|  {tiers_line:<16s}{tools_line:<16s}|",
+                f"{pad}+----------------------------------+",
+            ]
+            if host == "0.0.0.0" and not auth_key:
+                lines.append(f"{pad}  WARNING: open to network without auth!")
+                lines.append(f"{pad}  Use --auth-key for security.")
+            if enable_all:
+                lines.append(f"{pad}  INFO: High-risk Tier 3 tools enabled!")
+            print("\n" + "\n".join(lines) + "\n", flush=True)
             return True
 
     if transport == "stdio":
         mcp.run(transport="stdio")
     else:
-        logging.getLogger("uvicorn.error").addFilter(BannerFilter())
+        banner_logger.addFilter(BannerFilter())
         run_kwargs = dict(transport="streamable-http", host=host, port=port)
         if middleware:
             run_kwargs["middleware"] = middleware
@@ -1712,11 +2033,12 @@ def install():
     """Create a Windows scheduled task for auto-start."""
     import getpass
     import os
+    import sys
 
     username = getpass.getuser()
 
     # Create start_mcp.bat for Chinese Windows compatibility
-    python_exe = subprocess.run(["where", "python"], capture_output=True, text=True).stdout.strip().split("\n")[0]
+    python_exe = sys.executable
     bat_content = f"""@echo off
 rem winremote-mcp startup script with UTF-8 encoding for Chinese Windows
 set PYTHONIOENCODING=utf-8
@@ -0,0 +1,112 @@
+"""Input sequences for the InputBatch tool.
+
+A sequence of moves, clicks, scrolls, key chords and text is validated up
+front, then injected with one SendInput call per run of steps between waits.
+That skips the per-call round trip and pyautogui's PAUSE after every action.
+Without SendInput the same steps replay through pyautogui with the pause off.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from winremote import sendinput
+from winremote.flags import tobool
+
+ACTIONS = ("move", "click", "scroll", "keys", "type", "wait")
+MAX_STEPS = 200
+
+
+def parse_steps(actions: list[dict[str, Any]]) -> list[tuple]:
+    """Validate *actions* into ``(action, *args)`` tuples.
+
+    Raises ValueError naming the first bad step, before anything is sent.
+    """
+    if len(actions) > MAX_STEPS:
+        raise ValueError(f"too many steps ({len(actions)} > {MAX_STEPS})")
+    steps = []
+    for i, step in enumerate(actions, 1):
+        try:
+            action = step["action"]
+            if action == "move":
+                steps.append(("move", int(step["x"]), int(step["y"])))
+            elif action == "click":
+                button = step.get("button", "left")
+                if button not in sendinput.MOUSE_BUTTONS:
+                    raise ValueError(f"unknown button '{button}'")
+                x, y = int(step.get("x", 0)), int(step.get("y", 0))
+                if x and y:
+                    steps.append(("move", x, y))
+                steps.append(("click", button, int(step.get("clicks", 1))))
+            elif action == "scroll":
+                steps.append(("scroll", int(step["amount"]), tobool(step.get("horizontal", False))))
+            elif action == "keys":
+                steps.append(("keys", str(step["keys"])))
+            elif action == "type":
+                steps.append(("type", str(step["text"])))
+            elif action == "wait":
+                seconds = float(step.get("seconds", 0.1))
+                if not seconds >= 0:  # also rejects NaN
+                    raise ValueError(f"wait seconds must be >= 0, got {seconds}")
+                steps.append(("wait", min(seconds, 10.0)))
+            else:
+                raise ValueError(f"unknown action '{action}' (use {', '.join(ACTIONS)})")
+        except (KeyError, TypeError, ValueError) as e:
+            detail = f"missing '{e.args[0]}'" if isinstance(e, KeyError) else str(e)
+            raise ValueError(f"step {i}: {detail}") from None
+    return steps
+
+
+def _inputs(step: tuple) -> list:
+    action = step[0]
+    if action == "move":
+        return [sendinput.move_input(step[1], step[2])]
+    if action == "click":
+        return sendinput.click_inputs(step[1], step[2])
+    if action == "scroll":
+        return [sendinput.scroll_input(step[1], step[2])]
+    if action == "keys":
+        return sendinput.hotkey_inputs(sendinput.parse_hotkey(step[1]))
+    return sendinput.text_inputs(step[1])
+
+
+def _run_sendinput(steps: list[tuple]) -> None:
+    pending: list = []
+    for step in steps:
+        if step[0] == "wait":
+            sendinput.send_inputs(pending)
+            pending = []
+            time.sleep(step[1])
+        else:
+            pending += _inputs(step)
+    sendinput.send_inputs(pending)
+
+
+def _run_pyautogui(steps: list[tuple], pyautogui) -> None:
+    for step in steps:
+        action = step[0]
+        if action == "move":
+            pyautogui.moveTo(step[1], step[2], _pause=False)
+        elif action == "click":
+            pyautogui.click(button=step[1], clicks=step[2], _pause=False)
+        elif action == "scroll":
+            (pyautogui.hscroll if step[2] else pyautogui.scroll)(step[1], _pause=False)
+        elif action == "keys":
+            pyautogui.hotkey(*(k.strip() for k in step[1].lower().split("+")), _pause=False)
+        elif action == "type":
+            pyautogui.write(step[1], _pause=False)
+        else:
+            time.sleep(step[1])
+
+
+def run_steps(steps: list[tuple], pyautogui=None) -> None:
+    """Send parsed *steps*, through SendInput when available."""
+    if sendinput.HAS_SENDINPUT:
+        # Validate key names up front so a typo can't leave half a sequence sent
+        for step in steps:
+            if step[0] == "keys":
+                sendinput.parse_hotkey(step[1])
+        _run_sendinput(steps)
+    else:
+        _run_pyautogui(steps, pyautogui)
@@ -69,10 +69,11 @@ def load_config(path: Path | None) -> WinRemoteConfig:
     if path is None:
         return cfg
 
-    if not path.exists():
-        raise FileNotFoundError(f"Config file not found: {path}")
-
-    data = tomllib.loads(path.read_text(encoding="utf-8"))
+    try:
+        with path.open("rb") as f:
+            data = tomllib.load(f)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Config file not found: {path}") from None
 
     server = data.get("server", {})
     security = data.get("security", {})
@@ -2,14 +2,17 @@
 
 from __future__ import annotations
 
+import atexit
 import base64
 import ctypes
+import functools
 import io
 import locale
+import threading
 from dataclasses import dataclass
 from typing import Optional
 
-import pyautogui
+from winremote.cache import TTLCache
 
 # Win32 imports (will fail on non-Windows — caught at tool level)
 try:
@@ -23,7 +26,40 @@ try:
 except ImportError:
     HAS_WIN32 = False
 
-from PIL import ImageGrab
+# Terminal Services API for session enumeration (part of pywin32, imported separately)
+try:
+    import win32ts
+
+    HAS_WTS = True
+except ImportError:
+    HAS_WTS = False
+
+from PIL import Image, ImageGrab
+
+# Fast capture path: python-mss BitBlts straight into a raw BGRA buffer.
+try:
+    import mss
+
+    HAS_MSS = True
+except ImportError:
+    HAS_MSS = False
+
+# Fast encode path: libjpeg-turbo via simplejpeg (needs numpy for the pixel array).
+try:
+    import numpy as np
+    import simplejpeg
+
+    HAS_SIMPLEJPEG = True
+except ImportError:
+    HAS_SIMPLEJPEG = False
+
+# Fast base64: pybase64's SIMD encoder is a drop-in for the stdlib one
+try:
+    import pybase64
+
+    HAS_PYBASE64 = True
+except ImportError:
+    HAS_PYBASE64 = False
 
 # Enable DPI awareness so screenshots capture native resolution (e.g. 4K)
 try:
@@ -39,15 +75,9 @@ except Exception:
 # ---------------------------------------------------------------------------
 
 
-def _tobool(v: bool | str) -> bool:
-    """Handle MCP's bool-as-string quirk."""
-    if isinstance(v, bool):
-        return v
-    return str(v).lower() in ("true", "1", "yes")
-
-
+@functools.lru_cache(maxsize=1)
 def _get_system_language() -> str:
-    """Return current Windows display language."""
+    """Return current Windows display language (looked up once per process)."""
     try:
         return locale.getdefaultlocale()[0] or "en_US"
     except Exception:
@@ -76,7 +106,7 @@ class WindowInfo:
         return self.rect[3] - self.rect[1]
 
 
-def enumerate_windows() -> list[WindowInfo]:
+def _enumerate_windows() -> list[WindowInfo]:
     """List all visible top-level windows."""
     if not HAS_WIN32:
         raise RuntimeError("pywin32 not installed — run `pip install pywin32`")
@@ -89,6 +119,8 @@ def enumerate_windows() -> list[WindowInfo]:
         if not title:
             return True
         rect = win32gui.GetWindowRect(hwnd)
+        if rect[2] <= rect[0] or rect[3] <= rect[1]:
+            return True  # zero-area helper window; nothing to see or click
         try:
             _, pid = win32process.GetWindowThreadProcessId(hwnd)
         except Exception:
@@ -100,12 +132,16 @@ def enumerate_windows() -> list[WindowInfo]:
     return results
 
 
-def get_interactive_elements() -> list[dict]:
+def _get_interactive_elements() -> list[dict]:
     """Simplified accessibility tree — enumerate child windows with class/text."""
     if not HAS_WIN32:
         raise RuntimeError("pywin32 not installed — run `pip install pywin32`")
-    fg = win32gui.GetForegroundWindow()
-    if not fg:
+    return _child_elements(win32gui.GetForegroundWindow())
+
+
+def _child_elements(parent: int) -> list[dict]:
+    """Enumerate visible child windows of *parent* with class/text/rect."""
+    if not parent:
         return []
     elements: list[dict] = []
     idx = [0]
@@ -131,12 +167,129 @@ def get_interactive_elements() -> list[dict]:
         return True
 
     try:
-        win32gui.EnumChildWindows(fg, _cb, None)
+        win32gui.EnumChildWindows(parent, _cb, None)
     except Exception:
         pass
     return elements
 
 
+# Window/element scans are memoized briefly so rapid Snapshot loops skip the
+# Win32 walk. Input tools call invalidate_ui_cache() to bump the version.
+_UI_CACHE_TTL = 1.5
+_ui_cache = TTLCache(ttl=_UI_CACHE_TTL, maxsize=8)
+_ui_version = 0
+
+
+def invalidate_ui_cache() -> None:
+    """Discard cached window/element scans (call after input that changes the UI)."""
+    global _ui_version
+    _ui_version += 1
+
+
+def _ui_state_key() -> tuple:
+    """Cheap fingerprint of the UI state: cache version + foreground window and rect."""
+    fg = win32gui.GetForegroundWindow()
+    try:
+        rect = tuple(win32gui.GetWindowRect(fg)) if fg else None
+    except Exception:
+        rect = None
+    return (_ui_version, fg, rect)
+
+
+def _ui_cached(name: str, scan, use_cache: bool):
+    if not HAS_WIN32:
+        raise RuntimeError("pywin32 not installed — run `pip install pywin32`")
+    if not use_cache:
+        return scan()
+    key = (name, *_ui_state_key())
+    result = _ui_cache.get(key)
+    if result is None:
+        result = scan()
+        _ui_cache.set(key, result)
+    return result
+
+
+# The latest top-level window list from any scan, for title -> handle lookups
+# (FocusWindow right after a Snapshot). Keyed by _ui_version so input drops it.
+_RECENT_WINDOWS_TTL = 0.25
+_recent_windows = TTLCache(ttl=_RECENT_WINDOWS_TTL, maxsize=1)
+
+
+def _scan_windows() -> list[WindowInfo]:
+    windows = _enumerate_windows()
+    _recent_windows.set(_ui_version, windows)
+    return windows
+
+
+def recent_windows() -> list[WindowInfo]:
+    """Top-level windows from a scan in the last 250 ms, else a fresh scan."""
+    windows = _recent_windows.get(_ui_version)
+    return windows if windows is not None else _scan_windows()
+
+
+def enumerate_windows(use_cache: bool = True) -> list[WindowInfo]:
+    """List all visible top-level windows (briefly cached unless use_cache=False)."""
+    return _ui_cached("windows", _scan_windows, use_cache)
+
+
+def get_interactive_elements(use_cache: bool = True) -> list[dict]:
+    """Simplified accessibility tree of the foreground window (briefly cached)."""
+    return _ui_cached("elements", _get_interactive_elements, use_cache)
+
+
+def _snapshot_tree() -> tuple[list[WindowInfo], list[dict]]:
+    return _scan_windows(), _child_elements(win32gui.GetForegroundWindow())
+
+
+def snapshot_tree(use_cache: bool = True) -> tuple[list[WindowInfo], list[dict]]:
+    """Top-level windows plus the foreground window's elements in one scan.
+
+    Shares a single foreground lookup and cache entry instead of two.
+    """
+    return _ui_cached("tree", _snapshot_tree, use_cache)
+
+
+# ---------------------------------------------------------------------------
+# Sessions
+# ---------------------------------------------------------------------------
+
+
+def find_user_session() -> tuple[int, bool] | None:
+    """Return (session id, is_disconnected) for the interactive user session.
+
+    Prefers a session with a logged-on user, falling back to the console session.
+    """
+    server = win32ts.WTS_CURRENT_SERVER_HANDLE
+    user_session = console_session = None
+    for info in win32ts.WTSEnumerateSessions(server):
+        sid, state = info["SessionId"], info["State"]
+        name = info["WinStationName"].lower()
+        if name == "services" or state == win32ts.WTSListen:
+            continue
+        disconnected = state == win32ts.WTSDisconnected
+        if user_session is None:
+            try:
+                user = win32ts.WTSQuerySessionInformation(server, sid, win32ts.WTSUserName)
+            except Exception:
+                user = ""
+            if user:
+                user_session = (sid, disconnected)
+                continue
+        if name == "console" and console_session is None:
+            console_session = (sid, disconnected)
+    return user_session or console_session
+
+
+def connect_session_to_console(session_id: int) -> None:
+    """Attach a session to the physical console (the API behind `tscon /dest:console`)."""
+    # pywin32 doesn't wrap WTSConnectSession, so call wtsapi32 directly
+    target = win32ts.WTSGetActiveConsoleSessionId()
+    connect = ctypes.windll.wtsapi32.WTSConnectSessionW
+    connect.argtypes = [ctypes.c_ulong, ctypes.c_ulong, ctypes.c_wchar_p, ctypes.c_int]
+    if not connect(session_id, target, "", True):
+        raise ctypes.WinError()
+
+
 # ---------------------------------------------------------------------------
 # Screenshot
 # ---------------------------------------------------------------------------
@@ -159,30 +312,194 @@ def _get_monitor_bbox(monitor: int) -> tuple[int, int, int, int] | None:
         raise
 
 
-def take_screenshot(quality: int = 75, max_width: int = 0, monitor: int = 0) -> str:
-    """Capture screen, return base64 JPEG. Resizes if wider than max_width.
+# One grabber per thread: mss holds GDI device contexts, which belong to the
+# thread that created them. Worker threads are pooled, so this stays small.
+_mss_local = threading.local()
+_mss_all: list = []
+_mss_lock = threading.Lock()
+
+
+def _display_geometry() -> tuple[int, ...] | None:
+    """Virtual desktop origin and size plus monitor count (None off Windows)."""
+    try:
+        metrics = ctypes.windll.user32.GetSystemMetrics
+    except AttributeError:
+        return None
+    # SM_XVIRTUALSCREEN, SM_YVIRTUALSCREEN, SM_CXVIRTUALSCREEN, SM_CYVIRTUALSCREEN, SM_CMONITORS
+    return tuple(metrics(i) for i in (76, 77, 78, 79, 80))
+
+
+def _get_mss():
+    """Return this thread's mss grabber, creating it on first use.
+
+    An mss instance reads the monitor layout once, so the grabber is replaced
+    when displays are added, removed or resized.
+    """
+    sct = getattr(_mss_local, "sct", None)
+    geometry = _display_geometry()
+    if sct is not None and geometry != _mss_local.geometry:
+        _release_mss()
+        sct = None
+    if sct is None:
+        sct = _mss_local.sct = mss.mss()
+        _mss_local.geometry = geometry
+        with _mss_lock:
+            _mss_all.append(sct)
+    return sct
+
+
+def _release_mss() -> None:
+    """Close this thread's grabber; call before a short-lived thread exits."""
+    sct = _mss_local.__dict__.pop("sct", None)
+    if sct is None:
+        return
+    with _mss_lock:
+        _mss_all.remove(sct)
+    sct.close()
+
+
+def _close_mss() -> None:
+    """Release every thread's grabber (device contexts and cached bitmap)."""
+    with _mss_lock:
+        grabbers = _mss_all[:]
+        _mss_all.clear()
+    for sct in grabbers:
+        try:
+            sct.close()
+        except Exception:
+            pass
+
+
+atexit.register(_close_mss)
+
+
+def _grab_screen(monitor: int = 0, bbox: tuple[int, int, int, int] | None = None) -> Image.Image:
+    """Capture a monitor (0=all), or the (left, top, right, bottom) *bbox*, as an RGB image.
+
+    Uses mss when available; its per-thread grabber reuses the capture bitmap.
+    """
+    if not HAS_MSS:
+        if bbox is not None:
+            return ImageGrab.grab(bbox=bbox)
+        if monitor == 0:
+            return ImageGrab.grab(all_screens=True)
+        return ImageGrab.grab(bbox=_get_monitor_bbox(monitor))
+    shot = _grab_mss(monitor, bbox)
+    return Image.frombytes("RGB", shot.size, shot.bgra, "raw", "BGRX")
+
+
+def _grab_mss(monitor: int = 0, bbox: tuple[int, int, int, int] | None = None):
+    """Raw mss grab (BGRA pixels) of a monitor or *bbox*."""
+    sct = _get_mss()
+    if bbox is None:
+        # mss uses the same numbering: 0 is the virtual screen, 1..n are monitors
+        if monitor < 0 or monitor >= len(sct.monitors):
+            raise IndexError(f"Monitor {monitor} not found (have {len(sct.monitors) - 1})")
+        bbox = sct.monitors[monitor]
+    return sct.grab(bbox)
+
+
+def _encode_jpeg(img: Image.Image, quality: int) -> bytes | memoryview:
+    """Encode an RGB or grayscale image as JPEG, preferring simplejpeg over Pillow's encoder.
+
+    The Pillow path returns a view of its buffer rather than a copy; both results
+    can go straight to ``b64_text``.
+    """
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    if HAS_SIMPLEJPEG:
+        if img.mode == "L":
+            return simplejpeg.encode_jpeg(np.asarray(img)[..., None], quality=quality, colorspace="GRAY", fastdct=True)
+        return simplejpeg.encode_jpeg(
+            np.asarray(img), quality=quality, colorspace="RGB", colorsubsampling="420", fastdct=True
+        )
+    buf = io.BytesIO()
+    # optimize=True costs an extra Huffman pass for a few percent; 4:2:0 chroma as above
+    img.save(buf, format="JPEG", quality=quality, optimize=False, subsampling=2)
+    return buf.getbuffer()
+
+
+def b64_text(data: bytes | memoryview) -> str:
+    """Base64 of *data* as text, through pybase64 when it is installed."""
+    if HAS_PYBASE64:
+        return pybase64.b64encode(data).decode("ascii")
+    return base64.b64encode(data).decode("ascii")
+
+
+@dataclass
+class Screenshot:
+    data: str | bytes  # base64 JPEG, or the JPEG bytes themselves when captured with raw=True
+    width: int
+    height: int
+    native_width: int
+    native_height: int
+
+    @property
+    def scale(self) -> float:
+        """Factor from image pixels to screen pixels."""
+        return self.native_width / self.width
+
+
+def capture_screenshot(
+    quality: int = 75, max_width: int = 0, monitor: int = 0, grayscale: bool = False, raw: bool = False
+) -> Screenshot:
+    """Capture screen as a base64 JPEG along with its sent and native dimensions.
 
     Args:
         quality: JPEG quality 1-100.
         max_width: Max width in pixels. 0=no resize (native resolution).
         monitor: 0=all monitors, 1/2/3=specific monitor.
+        grayscale: Encode a single luma plane (much smaller; fine for reading UI state).
+        raw: Return the JPEG bytes instead of base64.
     """
-    if monitor == 0:
-        img = ImageGrab.grab(all_screens=True)
+    if HAS_MSS and HAS_SIMPLEJPEG and not grayscale:
+        shot = _grab_mss(monitor)
+        width, height = shot.size
+        if max_width <= 0 or width <= max_width:
+            # Full-size colour frame: libjpeg-turbo reads the BGRA buffer in place, no RGB image is built
+            pixels = np.frombuffer(shot.raw, np.uint8).reshape(height, width, 4)
+            jpeg = simplejpeg.encode_jpeg(
+                pixels, quality=quality, colorspace="BGRX", colorsubsampling="420", fastdct=True
+            )
+            data = jpeg if raw else b64_text(jpeg)
+            return Screenshot(data, width, height, width, height)
+        img = Image.frombytes("RGB", shot.size, shot.raw, "raw", "BGRX")
     else:
-        bbox = _get_monitor_bbox(monitor)
-        img = ImageGrab.grab(bbox=bbox)
+        img = _grab_screen(monitor)
+    native_width, native_height = img.size
+    if grayscale:
+        img = img.convert("L")
     # Resize if needed
     if max_width > 0 and img.width > max_width:
         ratio = max_width / img.width
-        new_height = int(img.height * ratio)
-        img = img.resize((max_width, new_height), resample=3)  # LANCZOS
-    # Convert to JPEG
-    if img.mode in ("RGBA", "LA"):
-        img = img.convert("RGB")
-    buf = io.BytesIO()
-    img.save(buf, format="JPEG", quality=quality, optimize=True)
-    return base64.b64encode(buf.getvalue()).decode()
+        img = _downscale(img, max_width, int(img.height * ratio), Image.Resampling.LANCZOS)
+    jpeg = _encode_jpeg(img, quality)
+    data = bytes(jpeg) if raw else b64_text(jpeg)
+    return Screenshot(data, img.width, img.height, native_width, native_height)
+
+
+def _downscale(img: Image.Image, width: int, height: int, resample: int) -> Image.Image:
+    """Resize *img* to (width, height), box-reducing by the integer part of the factor first.
+
+    img.reduce(n) is a cheap n x n average, so 4K -> 1920 is one reduce(2) and the
+    filter only covers what is left of the ratio (nothing at an exact 2x).
+    """
+    factor = img.width // width
+    if factor >= 2:
+        img = img.reduce(factor)
+    return img.resize((width, height), resample)
+
+
+def take_screenshot(quality: int = 75, max_width: int = 0, monitor: int = 0, grayscale: bool = False) -> str:
+    """Capture screen, return base64 JPEG. Resizes if wider than max_width.
+
+    Args:
+        quality: JPEG quality 1-100.
+        max_width: Max width in pixels. 0=no resize (native resolution).
+        monitor: 0=all monitors, 1/2/3=specific monitor.
+        grayscale: Encode a single luma plane.
+    """
+    return capture_screenshot(quality, max_width, monitor, grayscale).data
 
 
 # ---------------------------------------------------------------------------
@@ -202,7 +519,7 @@ def focus_window(title: Optional[str] = None, handle: Optional[int] = None) -> s
         from thefuzz import fuzz
 
         best_score = 0
-        for w in enumerate_windows():
+        for w in recent_windows():
             score = fuzz.partial_ratio(title.lower(), w.title.lower())
             if score > best_score:
                 best_score = score
@@ -225,6 +542,8 @@ def focus_window(title: Optional[str] = None, handle: Optional[int] = None) -> s
 
 def minimize_all() -> str:
     """Win+D — show desktop."""
+    import pyautogui
+
     try:
         pyautogui.hotkey("win", "d")
         return "Minimized all windows"
@@ -296,6 +615,50 @@ def set_clipboard(text: str) -> str:
         return f"Error: {e}"
 
 
+def snapshot_clipboard() -> dict[int, bytes | str]:
+    """Capture the clipboard contents so they can be put back with restore_clipboard().
+
+    Raises RuntimeError when the clipboard can't be read or holds data that
+    can't be copied as plain bytes (bitmaps, file lists, metafiles, ...).
+    """
+    if not HAS_WIN32:
+        raise RuntimeError("pywin32 not installed")
+    # Windows derives these from CF_UNICODETEXT on its own
+    synthesized = {win32con.CF_TEXT, win32con.CF_OEMTEXT, win32con.CF_LOCALE}
+    try:
+        win32clipboard.OpenClipboard()
+    except Exception as e:
+        raise RuntimeError(f"clipboard unavailable: {e}") from e
+    try:
+        saved: dict[int, bytes | str] = {}
+        fmt = win32clipboard.EnumClipboardFormats(0)
+        while fmt:
+            if fmt not in synthesized:
+                data = win32clipboard.GetClipboardData(fmt)
+                if not isinstance(data, (bytes, str)):
+                    raise RuntimeError(f"clipboard holds non-copyable data (format {fmt})")
+                saved[fmt] = data
+            fmt = win32clipboard.EnumClipboardFormats(fmt)
+        return saved
+    except RuntimeError:
+        raise
+    except Exception as e:
+        raise RuntimeError(f"clipboard unreadable: {e}") from e
+    finally:
+        win32clipboard.CloseClipboard()
+
+
+def restore_clipboard(saved: dict[int, bytes | str]) -> None:
+    """Put back contents captured by snapshot_clipboard() (an empty snapshot empties it)."""
+    win32clipboard.OpenClipboard()
+    try:
+        win32clipboard.EmptyClipboard()
+        for fmt, data in saved.items():
+            win32clipboard.SetClipboardData(fmt, data)
+    finally:
+        win32clipboard.CloseClipboard()
+
+
 # ---------------------------------------------------------------------------
 # Lock screen
 # ---------------------------------------------------------------------------
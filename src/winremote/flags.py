@@ -0,0 +1,12 @@
+"""Parsing for boolean tool parameters, which clients may send as strings."""
+
+from __future__ import annotations
+
+TRUE_STRINGS = frozenset({"true", "1", "yes"})
+
+
+def tobool(v: bool | str) -> bool:
+    """Return *v* if it is a bool, else whether its lower-cased text is true/1/yes."""
+    if isinstance(v, bool):
+        return v
+    return str(v).lower() in TRUE_STRINGS
@@ -2,41 +2,82 @@
 
 from __future__ import annotations
 
+import asyncio
+import locale
 import socket
-import subprocess
 
+# icmplib sends echo requests from Python, avoiding a ping.exe spawn per call
+try:
+    import icmplib
 
-def ping(host: str, count: int = 4) -> str:
-    """Ping a host."""
+    HAS_ICMPLIB = True
+except ImportError:
+    HAS_ICMPLIB = False
+
+
+def _format_icmplib(host: str, result) -> str:
+    lines = [
+        f"Ping {host} [{result.address}]: sent={result.packets_sent} "
+        f"received={result.packets_received} loss={result.packet_loss:.0%}"
+    ]
+    if result.is_alive:
+        lines.append(f"RTT min/avg/max = {result.min_rtt:.1f}/{result.avg_rtt:.1f}/{result.max_rtt:.1f} ms")
+    return "\n".join(lines)
+
+
+async def ping(host: str, count: int = 4) -> str:
+    """Ping a host without blocking the event loop."""
+    if HAS_ICMPLIB:
+        try:
+            result = await icmplib.async_ping(host, count=count, timeout=1, privileged=False)
+        except icmplib.ICMPLibError as e:
+            return f"Ping error: {e}"
+        return _format_icmplib(host, result)
+    timeout = count * 5 + 10
     try:
-        result = subprocess.run(
-            ["ping", "-n", str(count), host],
-            capture_output=True,
-            text=True,
-            timeout=count * 5 + 10,
+        proc = await asyncio.create_subprocess_exec(
+            "ping",
+            "-n",
+            str(count),
+            host,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
         )
-        return result.stdout.strip() or result.stderr.strip() or "(no output)"
-    except subprocess.TimeoutExpired:
-        return f"Ping timed out after {count * 5 + 10}s"
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            return f"Ping timed out after {timeout}s"
     except Exception as e:
         return f"Ping error: {e}"
+    # ping.exe writes its output in the locale code page, not UTF-8
+    encoding = locale.getpreferredencoding(False)
+    return (
+        stdout.decode(encoding, errors="replace").strip()
+        or stderr.decode(encoding, errors="replace").strip()
+        or "(no output)"
+    )
 
 
-def port_check(host: str, port: int, timeout: float = 5.0) -> str:
-    """Check if a TCP port is open."""
+async def port_check(host: str, port: int, timeout: float = 5.0) -> str:
+    """Check if a TCP port is open without blocking the event loop."""
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
-        result = sock.connect_ex((host, port))
-        sock.close()
-        if result == 0:
-            return f"Port {port} on {host} is OPEN"
-        else:
-            return f"Port {port} on {host} is CLOSED (code {result})"
-    except socket.timeout:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except asyncio.TimeoutError:
         return f"Port {port} on {host} — connection timed out ({timeout}s)"
+    except socket.gaierror as e:
+        return f"PortCheck error: {e}"
+    except OSError as e:
+        return f"Port {port} on {host} is CLOSED (code {e.errno})"
     except Exception as e:
         return f"PortCheck error: {e}"
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return f"Port {port} on {host} is OPEN"
 
 
 def net_connections(filter_str: str = "", limit: int = 50) -> str:
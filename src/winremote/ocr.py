@@ -2,37 +2,99 @@
 
 from __future__ import annotations
 
-import io
+import atexit
+import hashlib
 import subprocess
 import tempfile
+import threading
 from pathlib import Path
 
-from PIL import ImageGrab
+from PIL import Image, ImageGrab, ImageOps
 
+from winremote.cache import TTLCache
 
-def _screenshot_region(
+# Tesseract reads text best at roughly 30px x-height; tiny regions are
+# upscaled to this height and huge captures are scaled down.
+_MIN_OCR_HEIGHT = 130
+_MAX_OCR_HEIGHT = 2000
+
+_tess_apis: dict[str, object] = {}
+_tess_lock = threading.Lock()
+
+# Recognised text by (pixel digest, size, lang): re-reading an unchanged region is free
+_ocr_cache = TTLCache(ttl=300, maxsize=32)
+
+
+def _grab(
     left: int | None = None,
     top: int | None = None,
     right: int | None = None,
     bottom: int | None = None,
-) -> bytes:
-    """Capture a region (or full screen) and return PNG bytes."""
+) -> Image.Image:
     if left is not None and top is not None and right is not None and bottom is not None:
-        img = ImageGrab.grab(bbox=(left, top, right, bottom))
-    else:
-        img = ImageGrab.grab()
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    return buf.getvalue()
+        return ImageGrab.grab(bbox=(left, top, right, bottom))
+    return ImageGrab.grab()
+
+
+def _otsu_threshold(gray: Image.Image) -> int:
+    """Grey level that best separates the histogram into two classes (Otsu's method)."""
+    hist = gray.histogram()
+    total = sum(hist)
+    sum_all = sum(i * h for i, h in enumerate(hist))
+    sum_bg = weight_bg = 0
+    best_var, threshold = 0.0, 127
+    for t, count in enumerate(hist):
+        weight_bg += count
+        if weight_bg == 0:
+            continue
+        weight_fg = total - weight_bg
+        if weight_fg == 0:
+            break
+        sum_bg += t * count
+        diff = sum_bg / weight_bg - (sum_all - sum_bg) / weight_fg
+        between = weight_bg * weight_fg * diff * diff
+        if between > best_var:
+            best_var, threshold = between, t
+    return threshold
+
+
+def prepare_for_ocr(img: Image.Image) -> Image.Image:
+    """Grayscale, normalise the height of, and binarise a capture for Tesseract."""
+    gray = img.convert("L")
+    if gray.height < _MIN_OCR_HEIGHT or gray.height > _MAX_OCR_HEIGHT:
+        target = _MIN_OCR_HEIGHT if gray.height < _MIN_OCR_HEIGHT else _MAX_OCR_HEIGHT
+        size = (max(round(gray.width * target / gray.height), 1), target)
+        gray = gray.resize(size, Image.Resampling.BICUBIC)
+    gray = ImageOps.autocontrast(gray)
+    threshold = _otsu_threshold(gray)
+    return gray.point([0] * (threshold + 1) + [255] * (255 - threshold))
+
+
+def _close_tess_apis() -> None:
+    with _tess_lock:
+        for api in _tess_apis.values():
+            api.End()
+        _tess_apis.clear()
+
+
+atexit.register(_close_tess_apis)
+
+
+def ocr_tesserocr(img: Image.Image, lang: str = "eng") -> str:
+    """Run OCR on a warm in-process Tesseract engine (one per language)."""
+    import tesserocr
+
+    img = prepare_for_ocr(img)
+    with _tess_lock:
+        api = _tess_apis.get(lang)
+        if api is None:
+            api = _tess_apis[lang] = tesserocr.PyTessBaseAPI(lang=lang)
+        api.SetImage(img)
+        text: str = api.GetUTF8Text()
+    return text.strip()
 
 
-def ocr_pytesseract(
-    left: int | None = None,
-    top: int | None = None,
-    right: int | None = None,
-    bottom: int | None = None,
-    lang: str = "eng",
-) -> str:
+def ocr_pytesseract(img: Image.Image, lang: str = "eng") -> str:
     """Run OCR using pytesseract."""
     try:
         import pytesseract
@@ -45,26 +107,15 @@ def ocr_pytesseract(
             "  Then set TESSERACT_CMD or add to PATH."
         )
 
-    if left is not None and top is not None and right is not None and bottom is not None:
-        img = ImageGrab.grab(bbox=(left, top, right, bottom))
-    else:
-        img = ImageGrab.grab()
-
-    text: str = pytesseract.image_to_string(img, lang=lang)
+    text: str = pytesseract.image_to_string(prepare_for_ocr(img), lang=lang)
     return text.strip()
 
 
-def ocr_windows_builtin(
-    left: int | None = None,
-    top: int | None = None,
-    right: int | None = None,
-    bottom: int | None = None,
-) -> str:
+def ocr_windows_builtin(img: Image.Image) -> str:
     """Run OCR using Windows built-in OCR engine via PowerShell."""
-    png_bytes = _screenshot_region(left, top, right, bottom)
-
+    # Encode straight into the temp file the OCR script reads
     with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
-        tmp.write(png_bytes)
+        img.save(tmp, format="PNG")
         tmp_path = tmp.name
 
     ps_script = f"""
@@ -123,11 +174,34 @@ def run_ocr(
     bottom: int | None = None,
     lang: str = "eng",
 ) -> str:
-    """Run OCR, trying pytesseract first, then Windows built-in."""
+    """Run OCR, trying tesserocr, then pytesseract, then Windows built-in.
+
+    Results are cached by a digest of the captured pixels, so asking again about
+    a region that hasn't changed skips recognition.
+    """
+    img = _grab(left, top, right, bottom)
+    key = (hashlib.blake2b(img.tobytes(), digest_size=16).digest(), img.size, lang)
+    text = _ocr_cache.get(key)
+    if text is None:
+        text, ok = _recognise(img, lang)
+        if ok:
+            _ocr_cache.set(key, text)
+    return text
+
+
+def _recognise(img: Image.Image, lang: str) -> tuple[str, bool]:
+    """Returns (text, True) from the first engine that works, else (error report, False)."""
     errors = []
-    # Try pytesseract first
+    # In-process engine first: no tesseract process spawn or model load per call
+    try:
+        return ocr_tesserocr(img, lang=lang), True
+    except ImportError:
+        pass
+    except Exception as e:
+        errors.append(f"tesserocr error: {e}")
+
     try:
-        return ocr_pytesseract(left, top, right, bottom, lang=lang)
+        return ocr_pytesseract(img, lang=lang), True
     except ImportError as e:
         errors.append(f"pytesseract: {e}")
     except Exception as e:
@@ -135,13 +209,13 @@ def run_ocr(
 
     # Fallback to Windows built-in OCR
     try:
-        result = ocr_windows_builtin(left, top, right, bottom)
+        result = ocr_windows_builtin(img)
         if result and "error" not in result.lower()[:20]:
-            return result
+            return result, True
         if result:
             errors.append(f"Windows OCR: {result}")
     except Exception as e:
         errors.append(f"Windows OCR error: {e}")
 
     # Both failed
-    return "OCR failed. Errors:\n" + "\n".join(errors)
+    return "OCR failed. Errors:\n" + "\n".join(errors), False
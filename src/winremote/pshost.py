@@ -0,0 +1,193 @@
+"""Persistent PowerShell hosts — reuse warm processes instead of spawning one per command."""
+
+from __future__ import annotations
+
+import atexit
+import base64
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+POOL_SIZE = 3  # matches the SHELL category concurrency limit
+MAX_USES = 100  # recycle a host after this many commands
+
+_CREATE_NO_WINDOW = 0x08000000 if sys.platform == "win32" else 0
+
+# Everything must fit on one line: `-Command -` executes stdin line by line.
+# The command (and cwd) travel base64-encoded so no quoting can break out.
+# Every call starts in its cwd (or the server's) and restores the location and
+# the _INIT env snapshot afterwards; `$global:` variables and imported modules
+# persist for the host's lifetime. The sentinel gets its own line so output
+# without a trailing newline can't swallow it.
+_WRAPPER = (
+    "& {{ $Error.Clear(); $global:LASTEXITCODE = 0; $__rc = 0; $__loc = Get-Location; "
+    "try {{ Set-Location -ErrorAction Stop -LiteralPath "
+    "([Text.Encoding]::UTF8.GetString([Convert]::FromBase64String('{cwd}'))); "
+    "Invoke-Expression ([Text.Encoding]::UTF8.GetString([Convert]::FromBase64String('{cmd}'))) | Out-Default }} "
+    "catch {{ [Console]::Error.WriteLine(($_ | Out-String)); $__rc = 1 }} "
+    "finally {{ Set-Location -LiteralPath $__loc.Path; "
+    "foreach ($__e in @(Get-ChildItem env:)) {{ if (-not $global:__winremote_env.ContainsKey($__e.Name)) "
+    "{{ [Environment]::SetEnvironmentVariable($__e.Name, $null) }} }}; "
+    "foreach ($__k in $global:__winremote_env.Keys) "
+    "{{ [Environment]::SetEnvironmentVariable($__k, $global:__winremote_env[$__k]) }} }}; "
+    "if ($LASTEXITCODE) {{ $__rc = $LASTEXITCODE }} elseif ($Error.Count) {{ $__rc = 1 }}; "
+    '[Console]::Out.WriteLine("`n{sentinel}" + $__rc); [Console]::Error.WriteLine("`n{sentinel}") }}\n'
+)
+_INIT = (
+    "[Console]::OutputEncoding = New-Object Text.UTF8Encoding $false; $ProgressPreference = 'SilentlyContinue'; "
+    "$global:__winremote_env = @{}; "
+    "foreach ($__e in @(Get-ChildItem env:)) { $global:__winremote_env[$__e.Name] = $__e.Value }\n"
+)
+
+
+def _b64(text: str) -> str:
+    return base64.b64encode(text.encode("utf-8")).decode("ascii")
+
+
+def _pump(stream, q: queue.Queue) -> None:
+    """Forward lines from a pipe into a queue; None marks EOF."""
+    try:
+        for line in stream:
+            q.put(line)
+    except (OSError, ValueError):
+        pass
+    q.put(None)
+
+
+class PowerShellHost:
+    """One long-lived `powershell -Command -` process fed commands over stdin."""
+
+    def __init__(self, exe: str = "powershell"):
+        self.proc = subprocess.Popen(
+            [exe, "-NoLogo", "-NoProfile", "-NonInteractive", "-Command", "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1,
+            creationflags=_CREATE_NO_WINDOW,
+        )
+        self.sentinel = f"__winremote_{uuid.uuid4().hex}__"
+        self.uses = 0
+        self._out: queue.Queue = queue.Queue()
+        self._err: queue.Queue = queue.Queue()
+        for stream, q in ((self.proc.stdout, self._out), (self.proc.stderr, self._err)):
+            threading.Thread(target=_pump, args=(stream, q), daemon=True).start()
+        self._send(_INIT)
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def _send(self, line: str) -> None:
+        self.proc.stdin.write(line)
+        self.proc.stdin.flush()
+
+    def _collect(self, q: queue.Queue, deadline: float, command: str, timeout: float) -> tuple[str, int | None]:
+        """Read lines until the sentinel (or EOF). Returns (text, exit code if reported)."""
+        lines: list[str] = []
+        while True:
+            try:
+                line = q.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                raise subprocess.TimeoutExpired(command, timeout) from None
+            if line is None:  # host exited (e.g. the command called `exit`)
+                return "".join(lines), None
+            idx = line.find(self.sentinel)
+            if idx >= 0:
+                text = "".join(lines) + line[:idx]
+                if idx == 0 and text.endswith("\n"):
+                    text = text[:-1]  # the newline the wrapper writes before the sentinel
+                code = line[idx + len(self.sentinel) :].strip()
+                return text, int(code) if code.lstrip("-").isdigit() else None
+            lines.append(line)
+
+    def run(self, command: str, timeout: float = 30, cwd: str = "") -> subprocess.CompletedProcess:
+        """Execute *command*; raises subprocess.TimeoutExpired like subprocess.run."""
+        self.uses += 1
+        self._send(_WRAPPER.format(cwd=_b64(cwd or os.getcwd()), cmd=_b64(command), sentinel=self.sentinel))
+        deadline = time.monotonic() + timeout
+        stdout, rc = self._collect(self._out, deadline, command, timeout)
+        stderr, _ = self._collect(self._err, deadline, command, timeout)
+        if rc is None:
+            try:
+                rc = self.proc.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                rc = 1
+        return subprocess.CompletedProcess(command, rc, stdout, stderr)
+
+    def close(self) -> None:
+        try:
+            self.proc.kill()
+            self.proc.wait(timeout=5)
+        except Exception:
+            pass
+
+
+def _run_once(command: str, timeout: float, cwd: str) -> subprocess.CompletedProcess:
+    """Fallback: one process per command."""
+    return subprocess.run(
+        ["powershell", "-NoLogo", "-NoProfile", "-NonInteractive", "-Command", command],
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+        cwd=cwd or None,
+        creationflags=_CREATE_NO_WINDOW,
+    )
+
+
+class PowerShellPool:
+    """Small pool of warm hosts; a host that times out or errors is discarded."""
+
+    def __init__(self, size: int = POOL_SIZE, max_uses: int = MAX_USES):
+        self.size = size
+        self.max_uses = max_uses
+        self._idle: list[PowerShellHost] = []
+        self._lock = threading.Lock()
+        self._unavailable = False
+
+    def run(self, command: str, timeout: float = 30, cwd: str = "") -> subprocess.CompletedProcess:
+        if self._unavailable:
+            return _run_once(command, timeout, cwd)
+        with self._lock:
+            host = self._idle.pop() if self._idle else None
+        if host is None:
+            try:
+                host = PowerShellHost()
+            except OSError:
+                # No powershell executable to keep warm — stop trying
+                self._unavailable = True
+                return _run_once(command, timeout, cwd)
+        try:
+            result = host.run(command, timeout, cwd)
+        except BaseException:
+            host.close()
+            raise
+        if host.alive and host.uses < self.max_uses:
+            with self._lock:
+                if len(self._idle) < self.size:
+                    self._idle.append(host)
+                    return result
+        host.close()
+        return result
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for host in idle:
+            host.close()
+
+
+pool = PowerShellPool()
+atexit.register(pool.close)
+
+
+def run(command: str, timeout: float = 30, cwd: str = "") -> subprocess.CompletedProcess:
+    """Run a PowerShell command on a pooled host (falls back to one-shot processes)."""
+    return pool.run(command, timeout=timeout, cwd=cwd)
@@ -2,11 +2,66 @@
 
 from __future__ import annotations
 
-import base64
+import hashlib
 import io
+import queue
+import threading
 import time
 
-from PIL import ImageGrab
+from PIL import Image
+
+from winremote import desktop
+
+PALETTE_COLORS = 128
+_QUEUE_SIZE = 4  # full-size grabs in flight between the capture thread and the encoder
+_DONE = object()
+
+
+def _shared_palette(frame: Image.Image, colors: int = PALETTE_COLORS) -> Image.Image:
+    """Build the palette every frame of the clip is mapped onto.
+
+    Screen content barely changes colour between frames, so one palette taken
+    from the first frame replaces per-frame palette generation with a cheap remap.
+    """
+    return frame.convert("RGB").quantize(colors=colors, method=Image.Quantize.FASTOCTREE)
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    """Queue *item* unless the consumer has stopped. Returns False once stopped."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _capture_frames(
+    q: queue.Queue, stop: threading.Event, total_frames: int, interval: float, bbox: tuple | None
+) -> None:
+    """Producer: grab frames on schedule. A frame identical to the last one is sent as None."""
+    try:
+        last_digest = None
+        start = time.monotonic()
+        for i in range(total_frames):
+            target_time = start + i * interval
+            now = time.monotonic()
+            if now < target_time:
+                time.sleep(target_time - now)
+
+            img = desktop._grab_screen(1, bbox)  # primary monitor unless a region is given
+            # An idle screen yields identical frames: the encoder holds the previous one longer
+            digest = hashlib.blake2b(img.tobytes(), digest_size=16).digest()
+            repeat = digest == last_digest
+            last_digest = digest
+            if not _put(q, None if repeat else img, stop):
+                return
+    except Exception as e:
+        _put(q, e, stop)
+    finally:
+        desktop._release_mss()
+    _put(q, _DONE, stop)
 
 
 def record_screen(
@@ -17,14 +72,20 @@ def record_screen(
     right: int | None = None,
     bottom: int | None = None,
     max_width: int = 800,
+    palette: str = "adaptive",
 ) -> str:
     """Record the screen for *duration* seconds at *fps* and return a base64 GIF.
 
+    Frames are captured on a background thread and resized (and quantized) as
+    they arrive, so only a few full-size grabs are ever held at once.
+
     Args:
         duration: Recording length in seconds (max 10).
         fps: Frames per second (max 10).
         left/top/right/bottom: Optional region to capture.
         max_width: Resize frames to this max width.
+        palette: "fixed" to map every frame onto one palette taken from the first
+            frame, or "adaptive" to let the GIF encoder build one per frame.
 
     Returns:
         Base64-encoded GIF data.
@@ -38,35 +99,49 @@ def record_screen(
     if left is not None and top is not None and right is not None and bottom is not None:
         bbox = (left, top, right, bottom)
 
+    frame_duration_ms = int(1000 / fps)
     frames = []
-    start = time.monotonic()
-    for i in range(total_frames):
-        target_time = start + i * interval
-        now = time.monotonic()
-        if now < target_time:
-            time.sleep(target_time - now)
-
-        img = ImageGrab.grab(bbox=bbox)
-        # Resize if needed
-        if img.width > max_width:
-            ratio = max_width / img.width
-            new_size = (max_width, int(img.height * ratio))
-            img = img.resize(new_size)
-        frames.append(img)
+    durations: list[int] = []  # per-frame GIF delay; repeats extend the previous frame
+    pal = None
+
+    q: queue.Queue = queue.Queue(maxsize=_QUEUE_SIZE)
+    stop = threading.Event()
+    threading.Thread(target=_capture_frames, args=(q, stop, total_frames, interval, bbox), daemon=True).start()
+    try:
+        while (img := q.get()) is not _DONE:
+            if isinstance(img, Exception):
+                raise img
+            if img is None:
+                durations[-1] += frame_duration_ms
+                continue
+            # Resize if needed
+            if img.width > max_width:
+                ratio = max_width / img.width
+                new_size = (max_width, int(img.height * ratio))
+                img = img.resize(new_size)
+            if palette == "fixed":
+                if pal is None:
+                    pal = _shared_palette(img)
+                img = img.quantize(palette=pal, dither=Image.Dither.FLOYDSTEINBERG)
+            frames.append(img)
+            durations.append(frame_duration_ms)
+    finally:
+        stop.set()
 
     if not frames:
         raise RuntimeError("No frames captured")
 
     # Create GIF
     buf = io.BytesIO()
-    frame_duration_ms = int(1000 / fps)
     frames[0].save(
         buf,
         format="GIF",
         save_all=True,
         append_images=frames[1:],
-        duration=frame_duration_ms,
+        duration=durations,
         loop=0,
-        optimize=True,
+        # Palette optimization rescans every frame; pointless once they share one palette
+        optimize=palette != "fixed",
     )
-    return base64.b64encode(buf.getvalue()).decode()
+    # getbuffer() hands the encoder the GIF in place instead of copying it out first
+    return desktop.b64_text(buf.getbuffer())
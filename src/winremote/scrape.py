@@ -0,0 +1,112 @@
+"""Web page fetching for the Scrape tool — pooled async HTTP + markdown conversion."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+
+import httpx
+
+from winremote.cache import TTLCache
+
+# HTTP/2 needs the optional h2 package
+try:
+    import h2  # noqa: F401
+
+    HAS_H2 = True
+except ImportError:
+    HAS_H2 = False
+
+USER_AGENT = "winremote-mcp/0.3"
+MAX_MARKDOWN_CHARS = 50000
+# Stop reading the body here; well past what fits in MAX_MARKDOWN_CHARS even on
+# pages that front-load inline scripts and styles
+MAX_HTML_BYTES = 1_000_000
+# Elements whose text never belongs in the markdown
+_DROP_TAGS = ["script", "style", "noscript", "template"]
+
+# Recent fetches by URL (absorbs agent retries), and conversions by content
+# digest so the same page under another URL skips markdownify.
+_url_cache = TTLCache(ttl=30, maxsize=32)
+_markdown_cache = TTLCache(ttl=3600, maxsize=64)
+
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the shared client, keeping connections and TLS sessions warm across calls.
+
+    A client is bound to the event loop it was first used on, so a new one is
+    created if the running loop changes.
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            http2=HAS_H2,
+            timeout=15,
+            follow_redirects=True,
+            headers={"User-Agent": USER_AGENT},
+        )
+        _client_loop = loop
+    return _client
+
+
+def html_to_markdown(html: str) -> str:
+    """Convert HTML to markdown, truncated to MAX_MARKDOWN_CHARS."""
+    from bs4 import BeautifulSoup
+    from markdownify import MarkdownConverter
+
+    soup = BeautifulSoup(html, "html.parser")
+    # Remove these outright; markdownify's strip= drops the tags but keeps their text
+    for tag in soup(_DROP_TAGS):
+        tag.decompose()
+    md = MarkdownConverter(heading_style="ATX").convert_soup(soup)
+    if len(md) > MAX_MARKDOWN_CHARS:
+        md = md[:MAX_MARKDOWN_CHARS] + "\n\n[... truncated]"
+    return md
+
+
+async def _read_capped(resp: httpx.Response, limit: int) -> tuple[bytes, bool]:
+    """Read at most *limit* body bytes. Returns (body, whether it was cut short)."""
+    body = bytearray()
+    async for chunk in resp.aiter_bytes():
+        body += chunk
+        if len(body) >= limit:
+            del body[limit:]
+            return bytes(body), True
+    return bytes(body), False
+
+
+def _decode(body: bytes, encoding: str | None) -> str:
+    try:
+        return body.decode(encoding or "utf-8", errors="replace")
+    except LookupError:  # unknown charset in Content-Type
+        return body.decode("utf-8", errors="replace")
+
+
+async def fetch_markdown(url: str) -> str:
+    """Fetch *url* and return its content as markdown."""
+    md = _url_cache.get(url)
+    if md is not None:
+        return md
+    async with _get_client().stream("GET", url) as resp:
+        resp.raise_for_status()
+        body, cut = await _read_capped(resp, MAX_HTML_BYTES)
+        encoding = resp.charset_encoding
+    digest = hashlib.blake2b(body, digest_size=16).digest()
+    md = _markdown_cache.get(digest)
+    if md is None:
+        # markdownify is CPU-bound; keep it off the event loop
+        md = await asyncio.to_thread(html_to_markdown, _decode(body, encoding))
+        if cut and not md.endswith("[... truncated]"):
+            md += f"\n\n[... page truncated at {MAX_HTML_BYTES // 1000}KB]"
+        _markdown_cache.set(digest, md)
+    _url_cache.set(url, md)
+    return md
+
+
+def clear_cache() -> None:
+    _url_cache.clear()
+    _markdown_cache.clear()
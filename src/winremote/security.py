@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import bisect
 import ipaddress
 
 from starlette.middleware.base import BaseHTTPMiddleware
@@ -33,12 +34,44 @@ def parse_ip_allowlist(raw_entries: list[str]) -> list[ipaddress._BaseNetwork]:
     return parsed
 
 
+def compile_ip_ranges(networks: list[ipaddress._BaseNetwork]) -> dict[int, tuple[list[int], list[int]]]:
+    """Merge networks into sorted, non-overlapping integer ranges per IP version.
+
+    Returns ``{version: (starts, ends)}`` for binary-search membership checks.
+    """
+    spans: dict[int, list[tuple[int, int]]] = {4: [], 6: []}
+    for net in networks:
+        spans[net.version].append((int(net.network_address), int(net.broadcast_address)))
+
+    compiled: dict[int, tuple[list[int], list[int]]] = {}
+    for version, ranges in spans.items():
+        starts: list[int] = []
+        ends: list[int] = []
+        for start, end in sorted(ranges):
+            if ends and start <= ends[-1] + 1:
+                ends[-1] = max(ends[-1], end)
+            else:
+                starts.append(start)
+                ends.append(end)
+        compiled[version] = (starts, ends)
+    return compiled
+
+
+def ip_in_ranges(ip: ipaddress._BaseAddress, ranges: dict[int, tuple[list[int], list[int]]]) -> bool:
+    """Check *ip* against ranges from :func:`compile_ip_ranges` in O(log n)."""
+    starts, ends = ranges[ip.version]
+    value = int(ip)
+    i = bisect.bisect_right(starts, value) - 1
+    return i >= 0 and value <= ends[i]
+
+
 class IPAllowlistMiddleware(BaseHTTPMiddleware):
     """Restrict access to configured client IP networks."""
 
     def __init__(self, app, allowlist: list[ipaddress._BaseNetwork]):
         super().__init__(app)
         self.allowlist = allowlist
+        self._ranges = compile_ip_ranges(allowlist)
 
     async def dispatch(self, request, call_next):
         if request.url.path == "/health":
@@ -53,7 +86,7 @@ class IPAllowlistMiddleware(BaseHTTPMiddleware):
         except ValueError:
             return JSONResponse({"error": f"Forbidden: invalid client address {client.host}"}, status_code=403)
 
-        if not any(client_ip in net for net in self.allowlist):
+        if not ip_in_ranges(client_ip, self._ranges):
             return JSONResponse(
                 {
                     "error": f"Forbidden: client IP {client_ip} is not in allowlist",
@@ -0,0 +1,253 @@
+"""Direct Win32 SendInput keyboard and mouse injection via ctypes.
+
+pyautogui sends each key as a separate call and sleeps between them; here a
+whole chord, string or input sequence is injected atomically with a single
+SendInput call.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import functools
+import sys
+import time
+from ctypes import wintypes
+
+HAS_SENDINPUT = sys.platform == "win32"
+
+INPUT_MOUSE = 0
+INPUT_KEYBOARD = 1
+KEYEVENTF_EXTENDEDKEY = 0x0001
+KEYEVENTF_KEYUP = 0x0002
+KEYEVENTF_UNICODE = 0x0004
+MOUSEEVENTF_MOVE = 0x0001
+MOUSEEVENTF_WHEEL = 0x0800
+MOUSEEVENTF_HWHEEL = 0x1000
+MOUSEEVENTF_VIRTUALDESK = 0x4000
+MOUSEEVENTF_ABSOLUTE = 0x8000
+# (down, up) flags per button
+MOUSE_BUTTONS = {"left": (0x0002, 0x0004), "right": (0x0008, 0x0010), "middle": (0x0020, 0x0040)}
+
+ULONG_PTR = ctypes.c_size_t
+
+
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [
+        ("dx", wintypes.LONG),
+        ("dy", wintypes.LONG),
+        ("mouseData", wintypes.DWORD),
+        ("dwFlags", wintypes.DWORD),
+        ("time", wintypes.DWORD),
+        ("dwExtraInfo", ULONG_PTR),
+    ]
+
+
+class KEYBDINPUT(ctypes.Structure):
+    _fields_ = [
+        ("wVk", wintypes.WORD),
+        ("wScan", wintypes.WORD),
+        ("dwFlags", wintypes.DWORD),
+        ("time", wintypes.DWORD),
+        ("dwExtraInfo", ULONG_PTR),
+    ]
+
+
+class HARDWAREINPUT(ctypes.Structure):
+    _fields_ = [
+        ("uMsg", wintypes.DWORD),
+        ("wParamL", wintypes.WORD),
+        ("wParamH", wintypes.WORD),
+    ]
+
+
+class _INPUTUNION(ctypes.Union):
+    _fields_ = [("mi", MOUSEINPUT), ("ki", KEYBDINPUT), ("hi", HARDWAREINPUT)]
+
+
+class INPUT(ctypes.Structure):
+    _anonymous_ = ("u",)
+    _fields_ = [("type", wintypes.DWORD), ("u", _INPUTUNION)]
+
+
+# ---------------------------------------------------------------------------
+# Virtual-key codes (names follow pyautogui's key names)
+# ---------------------------------------------------------------------------
+
+VK_CODES: dict[str, int] = {
+    "ctrl": 0x11,
+    "control": 0x11,
+    "ctrlleft": 0xA2,
+    "ctrlright": 0xA3,
+    "alt": 0x12,
+    "altleft": 0xA4,
+    "altright": 0xA5,
+    "shift": 0x10,
+    "shiftleft": 0xA0,
+    "shiftright": 0xA1,
+    "win": 0x5B,
+    "winleft": 0x5B,
+    "winright": 0x5C,
+    "apps": 0x5D,
+    "enter": 0x0D,
+    "return": 0x0D,
+    "tab": 0x09,
+    "esc": 0x1B,
+    "escape": 0x1B,
+    "space": 0x20,
+    "backspace": 0x08,
+    "delete": 0x2E,
+    "del": 0x2E,
+    "insert": 0x2D,
+    "home": 0x24,
+    "end": 0x23,
+    "pageup": 0x21,
+    "pgup": 0x21,
+    "pagedown": 0x22,
+    "pgdn": 0x22,
+    "left": 0x25,
+    "up": 0x26,
+    "right": 0x27,
+    "down": 0x28,
+    "capslock": 0x14,
+    "numlock": 0x90,
+    "scrolllock": 0x91,
+    "pause": 0x13,
+    "printscreen": 0x2C,
+    "prtsc": 0x2C,
+    "volumemute": 0xAD,
+    "volumedown": 0xAE,
+    "volumeup": 0xAF,
+    "add": 0x6B,
+    "subtract": 0x6D,
+    "multiply": 0x6A,
+    "divide": 0x6F,
+    "decimal": 0x6E,
+    ";": 0xBA,
+    "=": 0xBB,
+    ",": 0xBC,
+    "-": 0xBD,
+    ".": 0xBE,
+    "/": 0xBF,
+    "`": 0xC0,
+    "[": 0xDB,
+    "\\": 0xDC,
+    "]": 0xDD,
+    "'": 0xDE,
+}
+VK_CODES.update({chr(c): ord(chr(c).upper()) for c in range(ord("a"), ord("z") + 1)})
+VK_CODES.update({str(d): 0x30 + d for d in range(10)})
+VK_CODES.update({f"f{n}": 0x6F + n for n in range(1, 25)})
+VK_CODES.update({f"num{d}": 0x60 + d for d in range(10)})
+
+# Keys that need KEYEVENTF_EXTENDEDKEY to avoid being read as their numpad twins
+_EXTENDED_VKS = frozenset(
+    {0x21, 0x22, 0x23, 0x24, 0x25, 0x26, 0x27, 0x28, 0x2D, 0x2E, 0x5B, 0x5C, 0x5D, 0x6F, 0xA3, 0xA5}
+)
+
+
+@functools.lru_cache(maxsize=256)
+def parse_hotkey(keys: str) -> tuple[int, ...]:
+    """Map a shortcut string like 'ctrl+shift+s' to virtual-key codes.
+
+    Raises KeyError for keys without a known virtual-key code.
+    """
+    return tuple(VK_CODES[k.strip()] for k in keys.lower().split("+") if k.strip())
+
+
+def _key_input(vk: int, up: bool) -> INPUT:
+    flags = KEYEVENTF_KEYUP if up else 0
+    if vk in _EXTENDED_VKS:
+        flags |= KEYEVENTF_EXTENDEDKEY
+    inp = INPUT(type=INPUT_KEYBOARD)
+    inp.ki = KEYBDINPUT(wVk=vk, wScan=0, dwFlags=flags, time=0, dwExtraInfo=0)
+    return inp
+
+
+def send_inputs(inputs: list[INPUT]) -> None:
+    """Inject a batch of INPUT events with one SendInput call."""
+    if not inputs:
+        return
+    array = (INPUT * len(inputs))(*inputs)
+    sent = ctypes.windll.user32.SendInput(len(inputs), array, ctypes.sizeof(INPUT))
+    if sent != len(inputs):
+        raise ctypes.WinError()
+
+
+def hotkey_inputs(vks: tuple[int, ...]) -> list[INPUT]:
+    """Press all keys in order, then release them in reverse."""
+    return [_key_input(vk, False) for vk in vks] + [_key_input(vk, True) for vk in reversed(vks)]
+
+
+def send_hotkey(vks: tuple[int, ...]) -> None:
+    """Send a chord from :func:`hotkey_inputs` as one batch."""
+    send_inputs(hotkey_inputs(vks))
+
+
+def _unicode_input(unit: int, up: bool) -> INPUT:
+    inp = INPUT(type=INPUT_KEYBOARD)
+    flags = KEYEVENTF_UNICODE | (KEYEVENTF_KEYUP if up else 0)
+    inp.ki = KEYBDINPUT(wVk=0, wScan=unit, dwFlags=flags, time=0, dwExtraInfo=0)
+    return inp
+
+
+# Control characters apps expect as real key presses rather than unicode packets
+_TEXT_VKS = {"\n": 0x0D, "\t": 0x09}
+
+
+def text_inputs(text: str) -> list[INPUT]:
+    """Key down/up events that type *text*, including characters outside the BMP."""
+    inputs: list[INPUT] = []
+    for ch in text.replace("\r\n", "\n"):
+        vk = _TEXT_VKS.get(ch)
+        if vk is not None:
+            inputs += (_key_input(vk, False), _key_input(vk, True))
+            continue
+        # KEYEVENTF_UNICODE takes UTF-16 code units; astral chars become surrogate pairs
+        data = ch.encode("utf-16-le")
+        for i in range(0, len(data), 2):
+            unit = data[i] | data[i + 1] << 8
+            inputs += (_unicode_input(unit, False), _unicode_input(unit, True))
+    return inputs
+
+
+def type_text(text: str, interval: float = 0.0) -> None:
+    """Type *text* with a single SendInput call, or a character at a time every *interval* seconds."""
+    if not interval:
+        send_inputs(text_inputs(text))
+        return
+    for ch in text.replace("\r\n", "\n"):
+        send_inputs(text_inputs(ch))
+        time.sleep(interval)
+
+
+def _mouse_input(flags: int, dx: int = 0, dy: int = 0, data: int = 0) -> INPUT:
+    inp = INPUT(type=INPUT_MOUSE)
+    inp.mi = MOUSEINPUT(dx=dx, dy=dy, mouseData=data & 0xFFFFFFFF, dwFlags=flags, time=0, dwExtraInfo=0)
+    return inp
+
+
+def move_input(x: int, y: int) -> INPUT:
+    """Absolute cursor move to screen pixel (x, y) on the virtual desktop."""
+    metrics = ctypes.windll.user32.GetSystemMetrics
+    # SM_XVIRTUALSCREEN/SM_YVIRTUALSCREEN/SM_CXVIRTUALSCREEN/SM_CYVIRTUALSCREEN
+    left, top, width, height = metrics(76), metrics(77), metrics(78), metrics(79)
+    # Absolute coordinates are normalized to 0..65535 across the virtual desktop
+    dx = (x - left) * 65535 // max(width - 1, 1)
+    dy = (y - top) * 65535 // max(height - 1, 1)
+    return _mouse_input(MOUSEEVENTF_MOVE | MOUSEEVENTF_ABSOLUTE | MOUSEEVENTF_VIRTUALDESK, dx, dy)
+
+
+def click_inputs(button: str = "left", clicks: int = 1) -> list[INPUT]:
+    """Button down/up events at the current cursor position."""
+    down, up = MOUSE_BUTTONS[button]
+    return [_mouse_input(flag) for _ in range(clicks) for flag in (down, up)]
+
+
+def click_at(x: int, y: int, button: str = "left", clicks: int = 1) -> None:
+    """Move to (x, y) and click *clicks* times (0 = just move) with a single SendInput call."""
+    send_inputs([move_input(x, y), *click_inputs(button, clicks)])
+
+
+def scroll_input(amount: int, horizontal: bool = False) -> INPUT:
+    """Wheel event; *amount* is in the same raw wheel units pyautogui.scroll uses."""
+    return _mouse_input(MOUSEEVENTF_HWHEEL if horizontal else MOUSEEVENTF_WHEEL, data=amount)
@@ -4,15 +4,33 @@ from __future__ import annotations
 
 import subprocess
 
+from winremote.cache import TTLCache
 
-def _ps(command: str, timeout: int = 30) -> str:
-    """Run a PowerShell command and return output."""
-    result = subprocess.run(
+# Native event log API (part of pywin32)
+try:
+    import win32evtlog
+
+    HAS_EVTLOG = True
+except ImportError:
+    HAS_EVTLOG = False
+
+
+# Full service / scheduled task listings, shared by calls with different filters
+_listings = TTLCache(ttl=5, maxsize=2)
+
+
+def _run_ps(command: str, timeout: int = 30) -> subprocess.CompletedProcess:
+    return subprocess.run(
         ["powershell", "-NoProfile", "-Command", command],
         capture_output=True,
         text=True,
         timeout=timeout,
     )
+
+
+def _ps(command: str, timeout: int = 30) -> str:
+    """Run a PowerShell command and return output."""
+    result = _run_ps(command, timeout)
     output = result.stdout
     if result.stderr:
         output += f"\n[STDERR] {result.stderr}"
@@ -21,19 +39,45 @@ def _ps(command: str, timeout: int = 30) -> str:
     return output.strip() or "(no output)"
 
 
+def _listing(command: str) -> list[list[str]]:
+    """Tab-separated rows printed by *command*, reused for a few seconds."""
+    rows = _listings.get(command)
+    if rows is None:
+        result = _run_ps(command)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"exit code {result.returncode}")
+        rows = [line.split("\t") for line in result.stdout.splitlines() if line.strip()]
+        _listings.set(command, rows)
+    return rows
+
+
+def _format_listing(rows: list[list[str]], headers: list[str], empty: str) -> str:
+    from tabulate import tabulate
+
+    if not rows:
+        return empty
+    return tabulate(rows, headers=headers, tablefmt="simple")
+
+
+def clear_cache() -> None:
+    _listings.clear()
+
+
 # ---------------------------------------------------------------------------
 # Services
 # ---------------------------------------------------------------------------
 
+_SERVICES_CMD = 'Get-Service | ForEach-Object { "$($_.Name)`t$($_.DisplayName)`t$($_.Status)" }'
+
 
 def service_list(filter_str: str = "") -> str:
-    """List Windows services."""
+    """List Windows services, filtered by a substring of the name or display name."""
     try:
-        cmd = "Get-Service"
-        if filter_str:
-            cmd += f" | Where-Object {{ $_.DisplayName -like '*{filter_str}*' -or $_.Name -like '*{filter_str}*' }}"
-        cmd += " | Format-Table Name, DisplayName, Status -AutoSize"
-        return _ps(cmd)
+        rows = _listing(_SERVICES_CMD)
+        needle = filter_str.lower()
+        if needle:
+            rows = [r for r in rows if needle in r[0].lower() or needle in r[1].lower()]
+        return _format_listing(rows, ["Name", "DisplayName", "Status"], "No services found.")
     except Exception as e:
         return f"ServiceList error: {e}"
 
@@ -44,6 +88,8 @@ def service_start(name: str) -> str:
         return _ps(f'Start-Service -Name "{name}" -PassThru | Format-Table Name, Status -AutoSize')
     except Exception as e:
         return f"ServiceStart error: {e}"
+    finally:
+        _listings.clear()
 
 
 def service_stop(name: str) -> str:
@@ -52,21 +98,25 @@ def service_stop(name: str) -> str:
         return _ps(f'Stop-Service -Name "{name}" -Force -PassThru | Format-Table Name, Status -AutoSize')
     except Exception as e:
         return f"ServiceStop error: {e}"
+    finally:
+        _listings.clear()
 
 
 # ---------------------------------------------------------------------------
 # Scheduled Tasks
 # ---------------------------------------------------------------------------
 
+_TASKS_CMD = 'Get-ScheduledTask | ForEach-Object { "$($_.TaskName)`t$($_.State)`t$($_.TaskPath)" }'
+
 
 def task_list(filter_str: str = "") -> str:
-    """List scheduled tasks."""
+    """List scheduled tasks, filtered by a substring of the task name."""
     try:
-        cmd = "Get-ScheduledTask"
-        if filter_str:
-            cmd += f" | Where-Object {{ $_.TaskName -like '*{filter_str}*' }}"
-        cmd += " | Format-Table TaskName, State, TaskPath -AutoSize"
-        return _ps(cmd)
+        rows = _listing(_TASKS_CMD)
+        needle = filter_str.lower()
+        if needle:
+            rows = [r for r in rows if needle in r[0].lower()]
+        return _format_listing(rows, ["TaskName", "State", "TaskPath"], "No scheduled tasks found.")
     except Exception as e:
         return f"TaskList error: {e}"
 
@@ -78,6 +128,8 @@ def task_create(name: str, command: str, schedule: str) -> str:
         return _ps(cmd)
     except Exception as e:
         return f"TaskCreate error: {e}"
+    finally:
+        _listings.clear()
 
 
 def task_delete(name: str) -> str:
@@ -86,6 +138,8 @@ def task_delete(name: str) -> str:
         return _ps(f'schtasks /Delete /TN "{name}" /F')
     except Exception as e:
         return f"TaskDelete error: {e}"
+    finally:
+        _listings.clear()
 
 
 # ---------------------------------------------------------------------------
@@ -93,21 +147,66 @@ def task_delete(name: str) -> str:
 # ---------------------------------------------------------------------------
 
 
+_EVENT_LEVELS = {
+    "critical": 1,
+    "error": 2,
+    "warning": 3,
+    "information": 4,
+    "verbose": 5,
+}
+_LEVEL_NAMES = {0: "Information", 1: "Critical", 2: "Error", 3: "Warning", 4: "Information", 5: "Verbose"}
+_EVT_BATCH = 256
+
+
+def _event_message(evt, provider: str, publishers: dict) -> str:
+    """Formatted message text for an event ("" if the provider can't render it)."""
+    try:
+        if provider not in publishers:
+            publishers[provider] = win32evtlog.EvtOpenPublisherMetadata(provider)
+        msg = win32evtlog.EvtFormatMessage(publishers[provider], evt, win32evtlog.EvtFormatMessageEvent)
+    except Exception:
+        publishers.setdefault(provider, None)
+        return ""
+    return " ".join(msg.split())
+
+
+def _query_events(log_name: str, count: int, level: int | None) -> str:
+    """Newest *count* events via EvtQuery; the level filter runs inside the event log service.
+
+    Only the System properties shown are rendered (no per-event XML), and
+    messages are formatted just for the events returned.
+    """
+    query = f"*[System[Level={level}]]" if level else "*"
+    flags = win32evtlog.EvtQueryChannelPath | win32evtlog.EvtQueryReverseDirection
+    handle = win32evtlog.EvtQuery(log_name, flags, query)
+    context = win32evtlog.EvtCreateRenderContext(win32evtlog.EvtRenderContextSystem)
+    publishers: dict = {}
+    lines = []
+    while len(lines) < count:
+        events = win32evtlog.EvtNext(handle, min(count - len(lines), _EVT_BATCH))
+        if not events:
+            break
+        for evt in events:
+            values = win32evtlog.EvtRender(evt, win32evtlog.EvtRenderEventValues, Context=context)
+            provider = values[win32evtlog.EvtSystemProviderName][0] or ""
+            created = values[win32evtlog.EvtSystemTimeCreated][0]
+            created = created.strftime("%Y-%m-%d %H:%M:%S") if created else ""
+            event_id = values[win32evtlog.EvtSystemEventID][0]
+            lvl = _LEVEL_NAMES.get(values[win32evtlog.EvtSystemLevel][0] or 0, "")
+            message = _event_message(evt, provider, publishers)
+            lines.append(f"{created}  {event_id:>5}  {lvl:<11}  {provider}: {message}")
+    return "\n".join(lines) or "(no events)"
+
+
 def event_log(log_name: str = "System", count: int = 20, level: str = "") -> str:
     """Read Windows Event Log entries."""
     try:
+        lvl_num = _EVENT_LEVELS.get(level.lower()) if level else None
+        if HAS_EVTLOG:
+            return _query_events(log_name, count, lvl_num)
         cmd = f"Get-WinEvent -LogName '{log_name}' -MaxEvents {count}"
-        if level:
-            level_map = {
-                "critical": 1,
-                "error": 2,
-                "warning": 3,
-                "information": 4,
-                "verbose": 5,
-            }
-            lvl_num = level_map.get(level.lower())
-            if lvl_num:
-                cmd = f"Get-WinEvent -FilterHashtable @{{LogName='{log_name}';Level={lvl_num}}} -MaxEvents {count}"
+        if lvl_num:
+            cmd = f"Get-WinEvent -FilterHashtable @{{LogName='{log_name}';Level={lvl_num}}} -MaxEvents {count}"
         cmd += " | Format-Table TimeCreated, Id, LevelDisplayName, Message -AutoSize -Wrap"
         return _ps(cmd, timeout=30)
     except Exception as e:
@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 import asyncio
+import collections
 import functools
+import inspect
 import logging
 import threading
 import time
@@ -49,6 +51,7 @@ TOOL_CATEGORIES: dict[str, ToolCategory] = {
     "Scroll": ToolCategory.DESKTOP,
     "Move": ToolCategory.DESKTOP,
     "Shortcut": ToolCategory.DESKTOP,
+    "InputBatch": ToolCategory.DESKTOP,
     "FocusWindow": ToolCategory.DESKTOP,
     "MinimizeAll": ToolCategory.DESKTOP,
     "App": ToolCategory.DESKTOP,
@@ -82,6 +85,8 @@ TOOL_CATEGORIES: dict[str, ToolCategory] = {
     # Shell
     "Shell": ToolCategory.SHELL,
     "Scrape": ToolCategory.SHELL,
+    "ShellStart": ToolCategory.SHELL,
+    "ScrapeStart": ToolCategory.SHELL,
     # Network
     "Ping": ToolCategory.NETWORK,
     "PortCheck": ToolCategory.NETWORK,
@@ -112,6 +117,8 @@ class TaskInfo:
     result: Any = None
     error: str | None = None
     _cancel_event: threading.Event = field(default_factory=threading.Event)
+    # Set once the task is recorded in TaskManager's finished history
+    _finished: bool = False
 
     @property
     def duration(self) -> float | None:
@@ -156,8 +163,11 @@ class TaskManager:
             cat: threading.Semaphore(limit) for cat, limit in CATEGORY_LIMITS.items()
         }
         self._lock = threading.Lock()
-        # Keep max N completed tasks in history
+        # Keep max N completed tasks in history, oldest-finished first out
         self._max_history = 100
+        self._finished: collections.deque[str] = collections.deque()
+        # Strong refs to background jobs so the loop doesn't drop them mid-run
+        self._jobs: set[asyncio.Task] = set()
 
     def _get_semaphore(self, category: ToolCategory) -> asyncio.Semaphore:
         """Get or create async semaphore for a category."""
@@ -176,7 +186,6 @@ class TaskManager:
         )
         with self._lock:
             self._tasks[task.task_id] = task
-            self._cleanup_old()
         return task
 
     def cancel_task(self, task_id: str) -> dict:
@@ -186,6 +195,7 @@ class TaskManager:
         if task is None:
             return {"error": f"Task {task_id} not found"}
         if task.cancel():
+            self._finish(task)
             return {"status": "cancelled", "task_id": task_id, "tool_name": task.tool_name}
         return {"error": f"Task {task_id} is already {task.status.value}"}
 
@@ -205,22 +215,110 @@ class TaskManager:
             task = self._tasks.get(task_id)
         return task.to_dict() if task else None
 
-    def _cleanup_old(self) -> None:
-        """Remove old completed tasks beyond max_history."""
-        completed = [
-            t
-            for t in self._tasks.values()
-            if t.status in (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED)
-        ]
-        if len(completed) > self._max_history:
-            completed.sort(key=lambda t: t.created_at)
-            for t in completed[: len(completed) - self._max_history]:
-                self._tasks.pop(t.task_id, None)
-
-    def wrap_sync_tool(self, tool_name: str, func: Callable) -> Callable:
-        """Wrap a synchronous tool function with error handling + concurrency control."""
+    def get_job(self, task_id: str) -> TaskInfo | None:
+        """Get the task itself (including its result) by ID."""
+        with self._lock:
+            return self._tasks.get(task_id)
+
+    def submit(self, tool_name: str, func: Callable, *args, **kwargs) -> TaskInfo:
+        """Start *func* as a background job on the running loop and return its task at once.
+
+        The result is stored on the task for later polling. Sync functions run in a
+        worker thread. The category limit applies as for wrapped tools, but a job
+        waits for its slot instead of timing out.
+        """
+        task = self.create_task(tool_name)
+        sem = self._get_semaphore(task.category)
+
+        async def run():
+            async with sem:
+                if task.is_cancelled:
+                    return
+                task.status = TaskStatus.RUNNING
+                task.started_at = time.time()
+                try:
+                    if inspect.iscoroutinefunction(func):
+                        result = await func(*args, **kwargs)
+                    else:
+                        result = await asyncio.to_thread(func, *args, **kwargs)
+                except Exception as e:
+                    if not task.is_cancelled:
+                        self._fail(task, e)
+                    return
+                if not task.is_cancelled:
+                    task.result = result
+                    task.status = TaskStatus.COMPLETED
+                    task.completed_at = time.time()
+                    self._finish(task)
+
+        job = asyncio.get_running_loop().create_task(run())
+        self._jobs.add(job)
+        job.add_done_callback(self._jobs.discard)
+        return task
+
+    def _finish(self, task: TaskInfo) -> None:
+        """Record that *task* reached a terminal state, dropping the oldest beyond max_history.
+
+        Idempotent: a task cancelled mid-run may reach here again when its function returns or raises.
+        """
+        with self._lock:
+            if task._finished:
+                return
+            task._finished = True
+            self._finished.append(task.task_id)
+            while len(self._finished) > self._max_history:
+                self._tasks.pop(self._finished.popleft(), None)
+
+    def _fail_lock_timeout(self, task: TaskInfo) -> str:
+        """Mark *task* failed because its category lock could not be acquired."""
+        category = task.category.value
+        task.status = TaskStatus.FAILED
+        task.error = f"Timeout waiting for {category} lock (another {category} task is running)"
+        task.completed_at = time.time()
+        self._finish(task)
+        return f"[task:{task.task_id}] Error: {task.error}"
+
+    def _complete(self, task: TaskInfo, result: Any) -> Any:
+        """Mark *task* completed and tag the result with its task id."""
+        task.status = TaskStatus.COMPLETED
+        task.completed_at = time.time()
+        self._finish(task)
+
+        # Prepend task_id to text results
+        if isinstance(result, str):
+            return f"[task:{task.task_id}] {result}"
+        if isinstance(result, list):
+            # For multi-content results (images + text), prepend task_id to first text
+            injected = False
+            for item in result:
+                if hasattr(item, "text") and not injected:
+                    item.text = f"[task:{task.task_id}] {item.text}"
+                    injected = True
+            if not injected:
+                # Add task_id as first element
+                from mcp.types import TextContent
+
+                result.insert(0, TextContent(type="text", text=f"[task:{task.task_id}]"))
+            return result
+        return result
+
+    def _fail(self, task: TaskInfo, exc: Exception) -> str:
+        """Mark *task* failed with *exc* and return the error string for the client."""
+        task.status = TaskStatus.FAILED
+        task.error = str(exc)
+        task.completed_at = time.time()
+        self._finish(task)
+        logger.error("Tool %s failed: %s\n%s", task.tool_name, exc, traceback.format_exc())
+        return f"[task:{task.task_id}] Error in {task.tool_name}: {exc}"
+
+    def wrap_sync_tool(self, tool_name: str, func: Callable, thread_limit: bool = True) -> Callable:
+        """Wrap a synchronous tool function with error handling + concurrency control.
+
+        With ``thread_limit=False`` the category's threading semaphore is skipped, for
+        callers that already enforce the limit (see wrap_threaded_tool).
+        """
         category = TOOL_CATEGORIES.get(tool_name, ToolCategory.QUERY)
-        sem = self._thread_semaphores.get(category)
+        sem = self._thread_semaphores.get(category) if thread_limit else None
 
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
@@ -228,10 +326,7 @@ class TaskManager:
 
             # Try to acquire semaphore
             if sem and not sem.acquire(timeout=30):
-                task.status = TaskStatus.FAILED
-                task.error = f"Timeout waiting for {category.value} lock (another {category.value} task is running)"
-                task.completed_at = time.time()
-                return f"[task:{task.task_id}] Error: {task.error}"
+                return self._fail_lock_timeout(task)
 
             try:
                 if task.is_cancelled:
@@ -245,33 +340,12 @@ class TaskManager:
                 if task.is_cancelled:
                     return f"[task:{task.task_id}] Cancelled during execution"
 
-                task.status = TaskStatus.COMPLETED
-                task.completed_at = time.time()
-
-                # Prepend task_id to text results
-                if isinstance(result, str):
-                    return f"[task:{task.task_id}] {result}"
-                if isinstance(result, list):
-                    # For multi-content results (images + text), prepend task_id to first text
-                    injected = False
-                    for item in result:
-                        if hasattr(item, "text") and not injected:
-                            item.text = f"[task:{task.task_id}] {item.text}"
-                            injected = True
-                    if not injected:
-                        # Add task_id as first element
-                        from mcp.types import TextContent
-
-                        result.insert(0, TextContent(type="text", text=f"[task:{task.task_id}]"))
-                    return result
-                return result
+                return self._complete(task, result)
 
             except Exception as e:
-                task.status = TaskStatus.FAILED
-                task.error = str(e)
-                task.completed_at = time.time()
-                logger.error("Tool %s failed: %s\n%s", tool_name, e, traceback.format_exc())
-                return f"[task:{task.task_id}] Error in {tool_name}: {e}"
+                if task.is_cancelled:
+                    return f"[task:{task.task_id}] Cancelled during execution"
+                return self._fail(task, e)
 
             finally:
                 if sem:
@@ -279,6 +353,64 @@ class TaskManager:
 
         return wrapper
 
+    def wrap_threaded_tool(self, tool_name: str, func: Callable) -> Callable:
+        """Wrap a synchronous tool so it runs in a worker thread instead of on the event loop.
+
+        FastMCP calls plain ``def`` tools directly on the asyncio loop, so one slow
+        ``Shell`` or ``Scrape`` would stall every other request. The category limit is
+        enforced with an asyncio semaphore before a thread is taken, so queued calls
+        wait on the loop rather than parking worker threads. The threading semaphore
+        only guards direct wrap_sync_tool calls, so the limit isn't applied twice.
+        """
+        category = TOOL_CATEGORIES.get(tool_name, ToolCategory.QUERY)
+        sync_wrapper = self.wrap_sync_tool(tool_name, func, thread_limit=False)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            sem = self._get_semaphore(category)
+            try:
+                await asyncio.wait_for(sem.acquire(), timeout=30)
+            except asyncio.TimeoutError:
+                return self._fail_lock_timeout(self.create_task(tool_name))
+            try:
+                return await asyncio.to_thread(sync_wrapper, *args, **kwargs)
+            finally:
+                sem.release()
+
+        return wrapper
+
+    def wrap_async_tool(self, tool_name: str, func: Callable) -> Callable:
+        """Wrap a native ``async def`` tool with task tracking + concurrency control."""
+        category = TOOL_CATEGORIES.get(tool_name, ToolCategory.QUERY)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            task = self.create_task(tool_name)
+            sem = self._get_semaphore(category)
+            try:
+                await asyncio.wait_for(sem.acquire(), timeout=30)
+            except asyncio.TimeoutError:
+                return self._fail_lock_timeout(task)
+            try:
+                if task.is_cancelled:
+                    return f"[task:{task.task_id}] Cancelled before execution"
+                task.status = TaskStatus.RUNNING
+                task.started_at = time.time()
+
+                result = await func(*args, **kwargs)
+
+                if task.is_cancelled:
+                    return f"[task:{task.task_id}] Cancelled during execution"
+                return self._complete(task, result)
+            except Exception as e:
+                if task.is_cancelled:
+                    return f"[task:{task.task_id}] Cancelled during execution"
+                return self._fail(task, e)
+            finally:
+                sem.release()
+
+        return wrapper
+
 
 # Global task manager instance
 manager = TaskManager()
@@ -24,6 +24,7 @@ TOOL_TIERS = {
         "Wait",
         "GetTaskStatus",
         "GetRunningTasks",
+        "PollJob",
     },
     "tier2": {
         "Click",
@@ -31,15 +32,18 @@ TOOL_TIERS = {
         "Move",
         "Scroll",
         "Shortcut",
+        "InputBatch",
         "FocusWindow",
         "MinimizeAll",
         "App",
         "Scrape",
+        "ScrapeStart",
         "CancelTask",
         "ReconnectSession",
     },
     "tier3": {
         "Shell",
+        "ShellStart",
         "FileRead",
         "FileWrite",
         "FileDownload",
@@ -171,9 +175,13 @@ def _remove_tool(mcp, name: str) -> None:
 
 
 def filter_tools(mcp, enabled_tools: set[str]) -> dict[str, int]:
-    all_tools = list(_get_registered_tools(mcp).keys())
-    total_count = len(all_tools)
-    for name in all_tools:
-        if name not in enabled_tools:
+    registered = _get_registered_tools(mcp)
+    total_count = len(registered)
+    tool_mgr = getattr(mcp, "_tool_manager", None)
+    if isinstance(getattr(tool_mgr, "_tools", None), dict):
+        # fastmcp 2.x: rebuild the tool dict once instead of popping each excluded tool
+        tool_mgr._tools = {name: tool for name, tool in registered.items() if name in enabled_tools}
+    else:
+        for name in [name for name in registered if name not in enabled_tools]:
             _remove_tool(mcp, name)
     return {"enabled": len(enabled_tools), "disabled": total_count - len(enabled_tools), "total": total_count}
@@ -73,3 +73,11 @@ def _reset_pyautogui(monkeypatch):
     monkeypatch.setattr(pyautogui, "typewrite", MagicMock())
     monkeypatch.setattr(pyautogui, "write", MagicMock())
     monkeypatch.setattr(pyautogui, "position", MagicMock(return_value=(500, 500)))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _register_all_tools():
+    """Tools are registered by the CLI after tier filtering; tests want them all."""
+    from winremote.__main__ import register_tools
+
+    register_tools()
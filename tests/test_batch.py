@@ -0,0 +1,99 @@
+"""Unit tests for InputBatch sequences."""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+from unittest.mock import patch
+
+import pyautogui
+import pytest
+
+from winremote import batch, sendinput
+
+
+def _call_tool(tool_name, **kwargs):
+    from winremote.__main__ import mcp
+
+    tool = mcp._tool_manager._tools[tool_name]
+    result = tool.fn(**kwargs)
+    if inspect.isawaitable(result):
+        result = asyncio.run(result)
+    return result
+
+
+class TestParseSteps:
+    def test_click_with_coords_moves_first(self):
+        steps = batch.parse_steps([{"action": "click", "x": 10, "y": 20, "clicks": 2}, {"action": "keys", "keys": "a"}])
+        assert steps == [("move", 10, 20), ("click", "left", 2), ("keys", "a")]
+
+    def test_wait_is_capped(self):
+        assert batch.parse_steps([{"action": "wait", "seconds": 60}]) == [("wait", 10.0)]
+
+    @pytest.mark.parametrize("flag, expected", [("false", False), ("0", False), ("True", True), (True, True)])
+    def test_horizontal_string_flag(self, flag, expected):
+        steps = batch.parse_steps([{"action": "scroll", "amount": 2, "horizontal": flag}])
+        assert steps == [("scroll", 2, expected)]
+
+    @pytest.mark.parametrize(
+        "actions, message",
+        [
+            ([{"action": "jump"}], "step 1: unknown action 'jump'"),
+            ([{"action": "type", "text": "a"}, {"action": "move", "x": 1}], "step 2: missing 'y'"),
+            ([{"action": "click", "button": "side"}], "unknown button 'side'"),
+            ([{"action": "wait"}] * (batch.MAX_STEPS + 1), "too many steps"),
+            ([{"action": "keys", "keys": "a"}, {"action": "wait", "seconds": -1}], "step 2: wait seconds must be >= 0"),
+        ],
+    )
+    def test_invalid(self, actions, message):
+        with pytest.raises(ValueError, match=message):
+            batch.parse_steps(actions)
+
+
+class TestRunSteps:
+    def test_single_sendinput_call_between_waits(self):
+        steps = batch.parse_steps(
+            [
+                {"action": "click", "x": 5, "y": 5},
+                {"action": "type", "text": "hi"},
+                {"action": "wait", "seconds": 0.2},
+                {"action": "keys", "keys": "ctrl+s"},
+            ]
+        )
+        with (
+            patch.object(sendinput, "HAS_SENDINPUT", True),
+            patch.object(sendinput, "move_input", return_value="move") as move,
+            patch.object(sendinput, "send_inputs") as send,
+            patch("winremote.batch.time.sleep") as sleep,
+        ):
+            batch.run_steps(steps)
+        move.assert_called_once_with(5, 5)
+        sleep.assert_called_once_with(0.2)
+        assert send.call_count == 2
+        first, second = (c.args[0] for c in send.call_args_list)
+        # move + click down/up + two chars down/up
+        assert len(first) == 7 and first[0] == "move"
+        assert [i.ki.wVk for i in second] == [0x11, ord("S"), ord("S"), 0x11]
+
+    def test_unknown_key_sends_nothing(self):
+        steps = batch.parse_steps([{"action": "type", "text": "a"}, {"action": "keys", "keys": "ctrl+nosuchkey"}])
+        with patch.object(sendinput, "HAS_SENDINPUT", True), patch.object(sendinput, "send_inputs") as send:
+            with pytest.raises(KeyError):
+                batch.run_steps(steps)
+        send.assert_not_called()
+
+
+class TestInputBatchTool:
+    def test_pyautogui_fallback_without_pause(self):
+        with patch.object(sendinput, "HAS_SENDINPUT", False):
+            result = _call_tool(
+                "InputBatch",
+                actions=[{"action": "move", "x": 1, "y": 2}, {"action": "scroll", "amount": -3}],
+            )
+        assert result.endswith("Ran 2 actions")
+        pyautogui.moveTo.assert_called_with(1, 2, _pause=False)
+        pyautogui.scroll.assert_called_with(-3, _pause=False)
+
+    def test_invalid_step_reported(self):
+        result = _call_tool("InputBatch", actions=[{"action": "fly"}])
+        assert "InputBatch error: step 1: unknown action 'fly'" in result
@@ -0,0 +1,80 @@
+"""Unit tests for the TTL cache and the desktop UI-scan cache."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+from winremote import desktop
+from winremote.cache import TTLCache
+
+
+class TestTTLCache:
+    def test_get_set(self):
+        c = TTLCache(ttl=10)
+        c.set("a", 1)
+        assert c.get("a") == 1
+        assert c.get("b", "dflt") == "dflt"
+
+    def test_expiry(self):
+        c = TTLCache(ttl=5)
+        with patch("winremote.cache.time.monotonic", return_value=100.0):
+            c.set("a", 1)
+        with patch("winremote.cache.time.monotonic", return_value=104.9):
+            assert c.get("a") == 1
+        with patch("winremote.cache.time.monotonic", return_value=105.0):
+            assert c.get("a") is None
+        assert len(c) == 0
+
+    def test_lru_eviction(self):
+        c = TTLCache(ttl=10, maxsize=2)
+        c.set("a", 1)
+        c.set("b", 2)
+        c.get("a")
+        c.set("c", 3)
+        assert c.get("a") == 1
+        assert c.get("b") is None
+        assert c.get("c") == 3
+
+
+class TestUICache:
+    def setup_method(self):
+        desktop._ui_cache.clear()
+        desktop._recent_windows.clear()
+
+    def test_repeated_scans_hit_cache(self):
+        with patch.object(desktop, "_enumerate_windows", return_value=["w"]) as scan:
+            assert desktop.enumerate_windows() == ["w"]
+            assert desktop.enumerate_windows() == ["w"]
+        assert scan.call_count == 1
+
+    def test_invalidate_forces_rescan(self):
+        with patch.object(desktop, "_get_interactive_elements", return_value=[]) as scan:
+            desktop.get_interactive_elements()
+            desktop.invalidate_ui_cache()
+            desktop.get_interactive_elements()
+        assert scan.call_count == 2
+
+    def test_use_cache_false_bypasses(self):
+        with patch.object(desktop, "_enumerate_windows", return_value=[]) as scan:
+            desktop.enumerate_windows(use_cache=False)
+            desktop.enumerate_windows(use_cache=False)
+        assert scan.call_count == 2
+        assert len(desktop._ui_cache) == 0
+
+    def test_snapshot_tree_single_cache_entry(self):
+        with (
+            patch.object(desktop, "_enumerate_windows", return_value=["w"]) as windows,
+            patch.object(desktop, "_child_elements", return_value=["e"]) as elements,
+        ):
+            assert desktop.snapshot_tree() == (["w"], ["e"])
+            assert desktop.snapshot_tree() == (["w"], ["e"])
+        assert windows.call_count == elements.call_count == 1
+        assert len(desktop._ui_cache) == 1
+
+    def test_recent_windows_reuse_last_scan(self):
+        with patch.object(desktop, "_enumerate_windows", return_value=["w"]) as scan:
+            desktop.enumerate_windows(use_cache=False)
+            assert desktop.recent_windows() == ["w"]
+            desktop.invalidate_ui_cache()
+            desktop.recent_windows()
+        assert scan.call_count == 2
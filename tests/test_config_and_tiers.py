@@ -38,6 +38,11 @@ exclude = ["Type"]
     assert cfg.tools.exclude == ["Type"]
 
 
+def test_config_loader_missing_file(tmp_path: Path):
+    with pytest.raises(FileNotFoundError, match="Config file not found"):
+        load_config(tmp_path / "missing.toml")
+
+
 def test_discover_config_path_prefers_cwd(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
     cfg = tmp_path / "winremote.toml"
     cfg.write_text("", encoding="utf-8")
@@ -80,6 +85,42 @@ def test_invalid_tool_rejected():
         resolve_enabled_tools(explicit_tools=["NopeTool"])
 
 
+def test_filter_tools_keeps_enabled():
+    from fastmcp import FastMCP
+
+    from winremote.tiers import filter_tools
+
+    server = FastMCP("test")
+    for name in ("Snapshot", "Click", "Shell"):
+        server.tool(name=name)(lambda: "ok")
+    counts = filter_tools(server, {"Snapshot", "Click"})
+    assert sorted(server._tool_manager._tools) == ["Click", "Snapshot"]
+    assert counts == {"enabled": 2, "disabled": 1, "total": 3}
+
+
+def test_explicit_params_from_cli_and_env():
+    import click
+    from click.testing import CliRunner
+
+    from winremote.__main__ import _choose_value, _explicit_params
+
+    seen = {}
+
+    @click.command()
+    @click.option("--host", default="127.0.0.1")
+    @click.option("--port", default=8090, envvar="WINREMOTE_TEST_PORT")
+    @click.option("--tools", default="")
+    @click.pass_context
+    def cmd(ctx, host, port, tools):
+        seen["explicit"] = _explicit_params(ctx)
+
+    result = CliRunner().invoke(cmd, ["--host", "0.0.0.0"], env={"WINREMOTE_TEST_PORT": "9000"})
+    assert result.exit_code == 0
+    assert seen["explicit"] == {"host", "port"}
+    assert _choose_value(False, "cli", "cfg", "dflt") == "cfg"
+    assert _choose_value(True, "cli", "cfg", "dflt") == "cli"
+
+
 def test_ip_allowlist_parsing():
     nets = parse_ip_allowlist(["127.0.0.1", "192.168.1.0/24", "::1"])
     assert len(nets) == 3
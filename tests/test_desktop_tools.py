@@ -2,9 +2,14 @@
 
 from __future__ import annotations
 
-from unittest.mock import patch
+import asyncio
+import base64
+import inspect
+import io
+from unittest.mock import MagicMock, patch
 
 import pyautogui
+import pytest
 
 # The MCP tools are wrapped by task_manager; access the original functions
 # via the module-level function objects before they're decorated, or call .fn
@@ -17,7 +22,10 @@ def _call_tool(tool_name, **kwargs):
     from winremote.__main__ import mcp
 
     tool = mcp._tool_manager._tools[tool_name]
-    return tool.fn(**kwargs)
+    result = tool.fn(**kwargs)
+    if inspect.isawaitable(result):
+        result = asyncio.run(result)
+    return result
 
 
 class TestClick:
@@ -65,6 +73,116 @@ class TestType:
         result = _call_tool("Type", text="你好")
         assert "Typed 2 chars" in result
 
+    def test_long_text_pastes_and_restores_clipboard(self):
+        text = "x" * 100
+        saved = {13: "old", 49161: b"<html>old</html>"}
+        with (
+            patch("winremote.__main__.desktop.HAS_WIN32", True),
+            patch("winremote.__main__.desktop.snapshot_clipboard", return_value=saved),
+            patch("winremote.__main__.desktop.set_clipboard", return_value="Clipboard set") as set_clip,
+            patch("winremote.__main__.desktop.restore_clipboard") as restore,
+            patch("winremote.__main__.time.sleep"),
+        ):
+            result = _call_tool("Type", text=text)
+        assert result.endswith("Pasted 100 chars")
+        set_clip.assert_called_once_with(text)
+        restore.assert_called_once_with(saved)
+        pyautogui.hotkey.assert_called_with("ctrl", "v")
+
+    def test_previous_text_starting_with_error_is_restored(self):
+        saved = {13: "Error: this is the user's text"}
+        with (
+            patch("winremote.__main__.desktop.HAS_WIN32", True),
+            patch("winremote.__main__.desktop.snapshot_clipboard", return_value=saved),
+            patch("winremote.__main__.desktop.set_clipboard", return_value="Clipboard set"),
+            patch("winremote.__main__.desktop.restore_clipboard") as restore,
+            patch("winremote.__main__.time.sleep"),
+        ):
+            _call_tool("Type", text="z" * 50)
+        restore.assert_called_once_with(saved)
+
+    def test_clipboard_restored_when_setting_it_fails(self):
+        saved = {13: "old"}
+        with (
+            patch("winremote.__main__.desktop.HAS_WIN32", True),
+            patch("winremote.__main__.desktop.snapshot_clipboard", return_value=saved),
+            patch("winremote.__main__.desktop.set_clipboard", return_value="Error: access denied"),
+            patch("winremote.__main__.desktop.restore_clipboard") as restore,
+        ):
+            result = _call_tool("Type", text="q" * 50)
+        assert "clipboard unavailable" in result
+        restore.assert_called_once_with(saved)
+        pyautogui.hotkey.assert_not_called()
+
+    def test_auto_falls_back_to_keystrokes_for_non_text_clipboard(self):
+        with (
+            patch("winremote.__main__.desktop.HAS_WIN32", True),
+            patch(
+                "winremote.__main__.desktop.snapshot_clipboard",
+                side_effect=RuntimeError("clipboard holds non-copyable data (format 2)"),
+            ),
+            patch("winremote.__main__.desktop.set_clipboard") as set_clip,
+        ):
+            result = _call_tool("Type", text="w" * 100)
+        assert result.endswith("Typed 100 chars")
+        set_clip.assert_not_called()
+
+    def test_explicit_paste_refuses_to_overwrite_non_text_clipboard(self):
+        with (
+            patch("winremote.__main__.desktop.snapshot_clipboard", side_effect=RuntimeError("format 15")),
+            patch("winremote.__main__.desktop.set_clipboard") as set_clip,
+        ):
+            result = _call_tool("Type", text="v", mode="paste")
+        assert "cannot paste without losing the clipboard" in result
+        set_clip.assert_not_called()
+
+    def test_keystroke_mode_never_pastes(self):
+        with patch("winremote.__main__.desktop.set_clipboard") as set_clip:
+            result = _call_tool("Type", text="y" * 100, mode="keystroke")
+        assert "Typed 100 chars" in result
+        set_clip.assert_not_called()
+
+    def test_unknown_mode(self):
+        assert "unknown mode" in _call_tool("Type", text="a", mode="fast")
+
+
+class TestClipboardSnapshot:
+    def _clipboard(self, contents):
+        from winremote import desktop
+
+        clip = MagicMock()
+        order = list(contents)
+        clip.EnumClipboardFormats.side_effect = lambda fmt: (order + [0])[order.index(fmt) + 1 if fmt else 0]
+        clip.GetClipboardData.side_effect = contents.__getitem__
+        con = MagicMock(CF_TEXT=1, CF_OEMTEXT=7, CF_LOCALE=16)
+        return clip, patch.multiple(desktop, HAS_WIN32=True, win32clipboard=clip, win32con=con)
+
+    def test_text_and_html_captured_without_synthesized_formats(self):
+        from winremote import desktop
+
+        clip, patched = self._clipboard({13: "hi", 1: b"hi", 49161: b"<b>hi</b>"})
+        with patched:
+            assert desktop.snapshot_clipboard() == {13: "hi", 49161: b"<b>hi</b>"}
+        clip.CloseClipboard.assert_called_once()
+
+    def test_image_cannot_be_captured(self):
+        from winremote import desktop
+
+        clip, patched = self._clipboard({8: b"DIB", 2: 0x1234})
+        with patched, pytest.raises(RuntimeError, match="non-copyable"):
+            desktop.snapshot_clipboard()
+        clip.CloseClipboard.assert_called_once()
+
+    def test_restore_replaces_contents(self):
+        from winremote import desktop
+
+        clip, patched = self._clipboard({})
+        with patched:
+            assert desktop.snapshot_clipboard() == {}
+            desktop.restore_clipboard({13: "Error: kept"})
+        clip.EmptyClipboard.assert_called_once()
+        clip.SetClipboardData.assert_called_once_with(13, "Error: kept")
+
 
 class TestScroll:
     def test_vertical_scroll(self):
@@ -75,6 +193,11 @@ class TestScroll:
         result = _call_tool("Scroll", amount=-2, horizontal=True)
         assert "horizontally" in result
 
+    def test_horizontal_scroll_string_flag(self):
+        result = _call_tool("Scroll", amount=3, horizontal="false")
+        pyautogui.scroll.assert_called_with(3)
+        assert "vertically" in result
+
     def test_scroll_at_position(self):
         _call_tool("Scroll", amount=5, x=100, y=200)
         pyautogui.moveTo.assert_called_with(100, 200)
@@ -88,6 +211,14 @@ class TestMove:
     def test_drag(self):
         result = _call_tool("Move", x=700, y=800, drag=True, start_x=100, start_y=100)
         assert "Dragged" in result
+        pyautogui.position.assert_called_once()
+        pyautogui.drag.assert_called_once_with(200, 300, duration=0.3)
+
+    def test_move_and_drag_invalidate_ui_cache(self):
+        with patch("winremote.__main__.desktop.invalidate_ui_cache") as invalidate:
+            _call_tool("Move", x=1, y=2)
+            _call_tool("Move", x=3, y=4, drag=True)
+        assert invalidate.call_count == 2
 
 
 class TestShortcut:
@@ -183,13 +314,293 @@ class TestReconnectSession:
             assert "reconnected session" in result[0].text.lower()
 
 
+class TestEnsureSessionConnected:
+    def setup_method(self):
+        import winremote.__main__ as m
+
+        m._session_ok_at = 0.0
+
+    teardown_method = setup_method
+
+    def _run(self, stdout, force=False, tscon_rc=0):
+        from winremote.__main__ import _ensure_session_connected
+
+        query = MagicMock(returncode=0, stdout=stdout, stderr="")
+        tscon = MagicMock(returncode=tscon_rc, stdout="", stderr="denied")
+        with patch("winremote.__main__.subprocess.run", side_effect=[query, tscon]) as run:
+            with patch("winremote.__main__.time.sleep"):
+                err = _ensure_session_connected(force=force)
+        return err, run
+
+    def test_disconnected_session_without_name(self):
+        err, run = self._run(
+            " SESSIONNAME       USERNAME                 ID  STATE   TYPE        DEVICE\n"
+            " services                                    0  Disc\n"
+            "                   alice                     2  Disc\n"
+            " console                                     1  Conn\n"
+            " rdp-tcp                                 65536  Listen\n"
+        )
+        assert err is None
+        assert run.call_args_list[1].args[0] == ["tscon", "2", "/dest:console"]
+
+    def test_active_session_skips_tscon(self):
+        err, run = self._run(
+            " SESSIONNAME       USERNAME                 ID  STATE\n"
+            ">console           alice                     1  Active\n"
+        )
+        assert err is None
+        assert run.call_count == 1
+
+    def test_chinese_disconnected_state(self):
+        err, run = self._run(" 会话名   用户名   ID  状态\n>console  alice    1  已断开\n")
+        assert err is None
+        assert run.call_count == 2
+
+    def test_recent_success_skips_query(self):
+        self._run(">console           alice                     1  Active\n")
+        with patch("winremote.__main__.subprocess.run") as run:
+            from winremote.__main__ import _ensure_session_connected
+
+            assert _ensure_session_connected() is None
+        run.assert_not_called()
+
+    def test_tscon_failure(self):
+        err, _ = self._run("                   alice                     2  Disc\n", tscon_rc=1)
+        assert "tscon failed" in err
+
+    def test_wts_path_skips_subprocess(self):
+        from winremote.__main__ import _ensure_session_connected
+
+        with (
+            patch("winremote.__main__.desktop.HAS_WTS", True),
+            patch("winremote.__main__.desktop.find_user_session", return_value=(2, True)),
+            patch("winremote.__main__.desktop.connect_session_to_console") as connect,
+            patch("winremote.__main__.subprocess.run") as run,
+            patch("winremote.__main__.time.sleep"),
+        ):
+            assert _ensure_session_connected() is None
+        connect.assert_called_once_with(2)
+        run.assert_not_called()
+
+    def test_find_user_session_wts(self):
+        from winremote import desktop
+
+        ts = MagicMock(WTSListen=6, WTSDisconnected=4, WTSActive=0)
+        ts.WTSEnumerateSessions.return_value = [
+            {"SessionId": 0, "WinStationName": "Services", "State": 4},
+            {"SessionId": 1, "WinStationName": "Console", "State": 1},
+            {"SessionId": 2, "WinStationName": "", "State": 4},
+            {"SessionId": 65536, "WinStationName": "RDP-Tcp", "State": 6},
+        ]
+        ts.WTSQuerySessionInformation.side_effect = lambda _srv, sid, _cls: "alice" if sid == 2 else ""
+        with patch.object(desktop, "win32ts", ts, create=True):
+            assert desktop.find_user_session() == (2, True)
+
+
+class TestSnapshot:
+    def test_text_summary(self):
+        from winremote.desktop import WindowInfo
+
+        windows = [WindowInfo(handle=42, title="Notepad", rect=(10, 20, 810, 620), visible=True)]
+        elements = [
+            {"index": 1, "class": "Edit", "text": "", "rect": {"left": 0, "top": 0, "right": 100, "bottom": 50}},
+            {"index": 2, "class": "Button", "text": "OK", "rect": {"left": 10, "top": 10, "right": 30, "bottom": 30}},
+        ]
+        with patch("winremote.__main__.desktop") as mock_desktop:
+            mock_desktop.snapshot_tree.return_value = (windows, elements)
+            mock_desktop._get_system_language.return_value = "en_US"
+            result = _call_tool("Snapshot", use_vision=False)
+        text = result[-1].text
+        mock_desktop.capture_screenshot.assert_not_called()
+        assert "**System Language:** en_US" in text
+        assert "[42] Notepad (800x600 at 10,20)" in text
+        assert "[1] Edit — center (50,25)" in text
+        assert "[2] OK — center (20,20)" in text
+
+    def test_window_list_capped(self):
+        from winremote.__main__ import _SNAPSHOT_MAX_WINDOWS
+        from winremote.desktop import WindowInfo
+
+        windows = [WindowInfo(handle=i, title=f"w{i}", rect=(0, 0, 10, 10), visible=True) for i in range(100)]
+        with patch("winremote.__main__.desktop") as mock_desktop:
+            mock_desktop.snapshot_tree.return_value = (windows, [])
+            result = _call_tool("Snapshot", use_vision=False)
+        text = result[-1].text
+        assert f"[{_SNAPSHOT_MAX_WINDOWS - 1}] w{_SNAPSHOT_MAX_WINDOWS - 1}" in text
+        assert f"[{_SNAPSHOT_MAX_WINDOWS}] " not in text
+        assert f"[... {100 - _SNAPSHOT_MAX_WINDOWS} more]" in text
+
+    def test_resolution_metadata(self):
+        from winremote.desktop import Screenshot
+
+        with patch("winremote.__main__.desktop") as mock_desktop:
+            mock_desktop.capture_screenshot.return_value = Screenshot("b64", 1280, 720, 2560, 1440)
+            mock_desktop.snapshot_tree.return_value = ([], [])
+            result = _call_tool("Snapshot", max_width=1280, grayscale="true")
+        mock_desktop.capture_screenshot.assert_called_once_with(75, 1280, 0, True, raw=False)
+        assert result[0].data == "b64"
+        assert "1280x720 of a 2560x1440 screen — multiply image coordinates by 2.000" in result[-1].text
+
+    def test_return_ref_keeps_image_server_side(self):
+        from starlette.testclient import TestClient
+
+        from winremote.__main__ import mcp
+        from winremote.desktop import Screenshot
+
+        with patch("winremote.__main__.desktop") as mock_desktop:
+            mock_desktop.capture_screenshot.return_value = Screenshot(b"\xff\xd8jpeg", 100, 50, 100, 50)
+            mock_desktop.snapshot_tree.return_value = ([], [])
+            result = _call_tool("Snapshot", return_ref=True)
+        assert len(result) == 1
+        ref = result[0].text.split("winremote://snapshot/")[1].split()[0]
+
+        client = TestClient(mcp.http_app())
+        resp = client.get(f"/snapshot/{ref}")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "image/jpeg"
+        assert resp.content == b"\xff\xd8jpeg"
+        assert client.get("/snapshot/nope").status_code == 404
+
+    def test_tree_scan_overlaps_screen_grab(self):
+        import threading
+
+        from winremote.desktop import Screenshot
+
+        scanning = threading.Event()
+
+        def grab(*args, **kwargs):
+            # Only returns once the tree scan has started on another thread
+            assert scanning.wait(2)
+            return Screenshot("b64", 100, 50, 100, 50)
+
+        def scan():
+            scanning.set()
+            return [], []
+
+        with patch("winremote.__main__.desktop") as mock_desktop:
+            mock_desktop.capture_screenshot.side_effect = grab
+            mock_desktop.snapshot_tree.side_effect = scan
+            result = _call_tool("Snapshot")
+        assert result[0].data == "b64"
+
+
+class TestAnnotatedSnapshot:
+    def test_grabs_once_and_scales_boxes(self):
+        from PIL import Image
+
+        elements = [
+            {"index": 1, "class": "Button", "text": "OK", "rect": {"left": 40, "top": 40, "right": 80, "bottom": 60}}
+        ]
+        with (
+            patch(
+                "winremote.__main__.desktop._grab_screen", return_value=Image.new("RGB", (200, 100), "white")
+            ) as grab,
+            patch("winremote.__main__.desktop.get_interactive_elements", return_value=elements),
+        ):
+            result = _call_tool("AnnotatedSnapshot", max_width=100)
+        grab.assert_called_once_with(1)
+        assert result[0].mimeType == "image/jpeg"
+        assert "[1] OK — center (60,50)" in result[1].text
+
+    def test_two_x_downscale_box_reduces(self):
+        from PIL import Image
+
+        reduce = Image.Image.reduce
+        with (
+            patch("winremote.__main__.desktop._grab_screen", return_value=Image.new("RGB", (400, 200), "white")),
+            patch("winremote.__main__.desktop.get_interactive_elements", return_value=[]),
+            patch.object(Image.Image, "reduce", autospec=True, side_effect=reduce) as spy,
+        ):
+            result = _call_tool("AnnotatedSnapshot", max_width=200)
+        assert spy.call_args.args[1] == 2
+        assert Image.open(io.BytesIO(base64.b64decode(result[0].data))).size == (200, 100)
+
+    def test_labels_scaled_and_reused(self):
+        from PIL import Image
+
+        from winremote.__main__ import _label_tile
+
+        elements = [
+            {"index": 7, "class": "Button", "text": "OK", "rect": {"left": 40, "top": 40, "right": 80, "bottom": 60}}
+        ]
+        _label_tile.cache_clear()
+        with (
+            patch("winremote.__main__.desktop._grab_screen", side_effect=lambda m: Image.new("RGB", (200, 100))),
+            patch("winremote.__main__.desktop.get_interactive_elements", return_value=elements),
+            patch("winremote.__main__._label_tile", wraps=_label_tile) as tile,
+        ):
+            _call_tool("AnnotatedSnapshot", max_width=100)
+            _call_tool("AnnotatedSnapshot", max_width=100)
+        tile.assert_called_with("7", 10)
+        assert _label_tile.cache_info().hits == 1
+        assert _label_tile("7", 10).getpixel((0, 0)) == (255, 0, 0)
+
+    def test_scan_overlaps_grab(self):
+        import threading
+
+        from PIL import Image
+
+        scanned = threading.Event()
+
+        def grab(monitor):
+            # The element scan runs on another thread, so it can finish while the grab is held up here
+            assert scanned.wait(2)
+            return Image.new("RGB", (200, 100), "white")
+
+        def scan():
+            scanned.set()
+            return []
+
+        with (
+            patch("winremote.__main__.desktop._grab_screen", side_effect=grab),
+            patch("winremote.__main__.desktop.get_interactive_elements", side_effect=scan),
+        ):
+            result = _call_tool("AnnotatedSnapshot")
+        assert result[1].text.endswith("No interactive elements found.")
+
+    def test_webp_output(self):
+        from PIL import Image
+
+        with (
+            patch("winremote.__main__.desktop._grab_screen", return_value=Image.new("RGB", (200, 100), "white")),
+            patch("winremote.__main__.desktop.get_interactive_elements", return_value=[]),
+        ):
+            result = _call_tool("AnnotatedSnapshot", fmt="webp")
+        assert result[0].mimeType == "image/webp"
+        assert base64.b64decode(result[0].data)[8:12] == b"WEBP"
+
+    def test_unknown_fmt(self):
+        result = _call_tool("AnnotatedSnapshot", fmt="bmp")
+        assert "unknown fmt 'bmp'" in result[0].text
+
+    def test_font_loaded_once(self):
+        from winremote.__main__ import _digit_metrics, _get_font
+
+        _get_font.cache_clear()
+        _digit_metrics.cache_clear()
+        with patch("PIL.ImageFont.truetype") as truetype:
+            truetype.return_value.getbbox.return_value = (0, 2, 80, 12)
+            font = _get_font(14)
+            assert _get_font(14) is font
+            assert _digit_metrics(14) == (8.0, 10)
+            assert _digit_metrics(14) == (8.0, 10)
+        truetype.assert_called_once_with("arial.ttf", 14)
+        font.getbbox.assert_called_once()
+        _get_font.cache_clear()
+        _digit_metrics.cache_clear()
+
+
 class TestSnapshotAutoReconnect:
     def test_snapshot_screenshot_fails_then_succeeds_after_reconnect(self):
+        from winremote.desktop import Screenshot
+
         with patch("winremote.__main__.desktop") as mock_desktop:
             # First call fails, second succeeds
-            mock_desktop.take_screenshot.side_effect = [Exception("screen grab failed"), "base64data"]
-            mock_desktop.enumerate_windows.return_value = []
-            mock_desktop.get_interactive_elements.return_value = []
+            mock_desktop.capture_screenshot.side_effect = [
+                Exception("screen grab failed"),
+                Screenshot("base64data", 100, 50, 100, 50),
+            ]
+            mock_desktop.snapshot_tree.return_value = ([], [])
             mock_desktop._get_system_language.return_value = "en-US"
 
             with patch("winremote.__main__._ensure_session_connected") as mock_ensure:
@@ -203,12 +614,12 @@ class TestSnapshotAutoReconnect:
                     # Should have called ensure_session_connected
                     mock_ensure.assert_called_once()
                     # Should have retried screenshot
-                    assert mock_desktop.take_screenshot.call_count == 2
+                    assert mock_desktop.capture_screenshot.call_count == 2
 
     def test_snapshot_non_screen_error_not_retried(self):
         with patch("winremote.__main__.desktop") as mock_desktop:
             # Non-screen-related error should not trigger reconnect
-            mock_desktop.take_screenshot.side_effect = Exception("some other error")
+            mock_desktop.capture_screenshot.side_effect = Exception("some other error")
 
             result = _call_tool("Snapshot")
 
@@ -218,7 +629,7 @@ class TestSnapshotAutoReconnect:
 
     def test_snapshot_reconnect_fails(self):
         with patch("winremote.__main__.desktop") as mock_desktop:
-            mock_desktop.take_screenshot.side_effect = Exception("screen grab failed")
+            mock_desktop.capture_screenshot.side_effect = Exception("screen grab failed")
 
             with patch("winremote.__main__._ensure_session_connected") as mock_ensure:
                 mock_ensure.return_value = "Failed to reconnect"
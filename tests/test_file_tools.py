@@ -0,0 +1,167 @@
+"""Unit tests for file transfer and listing tools."""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import inspect
+import os
+from unittest.mock import patch
+
+
+def _call_tool(tool_name, **kwargs):
+    from winremote.__main__ import mcp
+
+    tool = mcp._tool_manager._tools[tool_name]
+    result = tool.fn(**kwargs)
+    if inspect.isawaitable(result):
+        result = asyncio.run(result)
+    return result
+
+
+class TestFileRead:
+    def test_small_text(self, tmp_path):
+        f = tmp_path / "a.txt"
+        f.write_bytes(b"line1\r\nline2")
+        result = _call_tool("FileRead", path=str(f))
+        assert result.endswith("line1\nline2")
+
+    def test_truncates_large_text(self, tmp_path):
+        f = tmp_path / "big.log"
+        f.write_text("é" * 150_000, encoding="utf-8")
+        result = _call_tool("FileRead", path=str(f))
+        body, note = result.rsplit("\n\n", 1)
+        assert body.endswith("é" * 100_000)
+        assert "é" * 100_001 not in body
+        assert note == "[... truncated at 100KB of 300000 bytes]"
+
+    def test_binary(self, tmp_path):
+        f = tmp_path / "b.bin"
+        f.write_bytes(b"\x00\x01\x02")
+        result = _call_tool("FileRead", path=str(f), encoding="binary")
+        assert result.endswith(base64.b64encode(b"\x00\x01\x02").decode())
+
+    def test_binary_empty_file(self, tmp_path):
+        # mmap rejects empty files; the read loop takes over
+        from winremote.__main__ import _b64encode_file
+
+        f = tmp_path / "empty.bin"
+        f.write_bytes(b"")
+        assert _b64encode_file(f) == (0, "")
+
+    def test_binary_truncated_across_chunks(self, tmp_path):
+        data = os.urandom(200_000)
+        f = tmp_path / "big.bin"
+        f.write_bytes(data)
+        with patch("winremote.__main__._FILE_READ_MAX_BYTES", 100_000):
+            result = _call_tool("FileRead", path=str(f), encoding="binary")
+        b64, note = result.split("] ", 1)[1].split("\n\n", 1)
+        assert base64.b64decode(b64) == data[:100_000]
+        assert "of 200000 bytes" in note
+
+
+class TestFileTransfer:
+    def test_download_multi_chunk(self, tmp_path):
+        data = os.urandom(200_000)  # spans several encode chunks
+        f = tmp_path / "blob.bin"
+        f.write_bytes(data)
+        result = _call_tool("FileDownload", path=str(f))
+        prefix, b64 = result.split("bytes:", 1)
+        assert prefix.endswith(f"base64:{len(data)}")
+        assert base64.b64decode(b64) == data
+
+    def test_download_missing(self, tmp_path):
+        result = _call_tool("FileDownload", path=str(tmp_path / "nope"))
+        assert "File not found" in result
+
+    def test_upload_multi_chunk_with_newlines(self, tmp_path):
+        data = os.urandom(150_001)
+        b64 = base64.encodebytes(data).decode()  # wrapped at 76 chars
+        dest = tmp_path / "sub" / "out.bin"
+        result = _call_tool("FileUpload", path=str(dest), data_base64=b64)
+        assert f"Written {len(data)} bytes" in result
+        assert dest.read_bytes() == data
+
+    def test_upload_invalid(self, tmp_path):
+        result = _call_tool("FileUpload", path=str(tmp_path / "x.bin"), data_base64="abc")
+        assert "FileUpload error" in result
+
+
+class TestFileList:
+    def test_lists_sorted_with_types(self, tmp_path):
+        (tmp_path / "b.txt").write_bytes(b"x" * 2048)
+        (tmp_path / "a_dir").mkdir()
+        (tmp_path / ".hidden").write_text("h")
+        result = _call_tool("FileList", path=str(tmp_path))
+        lines = result.split("\n")
+        header = next(i for i, line in enumerate(lines) if "Type" in line and "Modified" in line)
+        assert lines[header + 1].startswith("------  ")
+        body = lines[header + 2 :]
+        assert body[0].startswith("DIR") and "a_dir" in body[0] and "<DIR>" in body[0]
+        assert body[1].startswith("FILE") and "b.txt" in body[1] and "2KB" in body[1]
+        assert ".hidden" not in result
+
+    def test_show_hidden(self, tmp_path):
+        (tmp_path / ".hidden").write_text("h")
+        result = _call_tool("FileList", path=str(tmp_path), show_hidden="true")
+        assert ".hidden" in result
+
+    def test_empty_and_missing(self, tmp_path):
+        assert "Directory is empty." in _call_tool("FileList", path=str(tmp_path))
+        assert "Not a directory" in _call_tool("FileList", path=str(tmp_path / "nope"))
+
+
+class TestFileSearch:
+    def _tree(self, root):
+        (root / "a.py").write_text("x")
+        (root / "b.txt").write_text("x")
+        (root / "sub").mkdir()
+        (root / "sub" / "c.py").write_text("xy")
+        (root / "sub" / "deep").mkdir()
+        (root / "sub" / "deep" / "d.py").write_text("x")
+
+    def test_recursive(self, tmp_path):
+        self._tree(tmp_path)
+        result = _call_tool("FileSearch", pattern="*.py", path=str(tmp_path))
+        assert "Found 3 files" in result
+        assert f"{tmp_path / 'sub' / 'c.py'} (2 bytes)" in result
+        assert "b.txt" not in result
+
+    def test_sizes_come_from_dir_entries(self, tmp_path):
+        self._tree(tmp_path)
+        real_stat = os.stat
+
+        def stat(path, *args, **kwargs):
+            assert not str(path).endswith(".py"), "matched file stat'ed again"
+            return real_stat(path, *args, **kwargs)
+
+        with patch("os.stat", side_effect=stat):
+            result = _call_tool("FileSearch", pattern="*.py", path=str(tmp_path))
+        assert f"{tmp_path / 'sub' / 'deep' / 'd.py'} (1 bytes)" in result
+
+    def test_non_recursive(self, tmp_path):
+        self._tree(tmp_path)
+        result = _call_tool("FileSearch", pattern="*.py", path=str(tmp_path), recursive="false")
+        assert "Found 1 files" in result
+        assert "c.py" not in result
+
+    def test_limit_stops_early(self, tmp_path):
+        self._tree(tmp_path)
+        result = _call_tool("FileSearch", pattern="*", path=str(tmp_path), limit=2)
+        assert "Found more than 2 files (showing first 2)" in result
+        assert len([line for line in result.split("\n") if line.startswith("  ")]) == 2
+
+    def test_exact_count_reports_total(self, tmp_path):
+        self._tree(tmp_path)
+        result = _call_tool("FileSearch", pattern="*", path=str(tmp_path), limit=2, exact_count=True)
+        assert "Found 6 files (showing first 2)" in result
+        assert len([line for line in result.split("\n") if line.startswith("  ")]) == 2
+
+    def test_pattern_with_separator_uses_glob(self, tmp_path):
+        self._tree(tmp_path)
+        result = _call_tool("FileSearch", pattern="deep/*.py", path=str(tmp_path))
+        assert "d.py" in result
+
+    def test_no_matches(self, tmp_path):
+        result = _call_tool("FileSearch", pattern="*.zzz", path=str(tmp_path))
+        assert "No files matching" in result
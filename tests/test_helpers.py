@@ -22,6 +22,16 @@ class TestTobool:
         assert _tobool("no") is False
 
 
+class TestFormatSize:
+    def test_units(self):
+        from winremote.__main__ import _format_size
+
+        assert _format_size(0) == "0B"
+        assert _format_size(1023) == "1023B"
+        assert _format_size(1024) == "1KB"
+        assert _format_size(5 * 1048576 + 1) == "5MB"
+
+
 class TestCheckWin32:
     def test_no_win32(self):
         from unittest.mock import patch
@@ -45,6 +55,22 @@ class TestCheckWin32:
             assert result is None
 
 
+class TestElementLine:
+    def _el(self, text, cls="Edit"):
+        return {"index": 3, "class": cls, "text": text, "rect": {"left": 0, "top": 0, "right": 10, "bottom": 20}}
+
+    def test_falls_back_to_class(self):
+        from winremote.__main__ import _element_line
+
+        assert _element_line(self._el("")) == "  [3] Edit — center (5,10)"
+
+    def test_long_text_truncated(self):
+        from winremote.__main__ import _ELEMENT_TEXT_MAX, _element_line
+
+        line = _element_line(self._el("x" * 500))
+        assert f"[3] {'x' * (_ELEMENT_TEXT_MAX - 1)}… — center" in line
+
+
 class TestVersion:
     def test_version_string(self):
         from winremote import __version__
@@ -44,6 +44,7 @@ class TestMCPToolRegistration:
             "Scroll",
             "Move",
             "Shortcut",
+            "InputBatch",
             "Wait",
             "FocusWindow",
             "MinimizeAll",
@@ -92,3 +93,52 @@ class TestMCPToolRegistration:
         tools = mcp._tool_manager._tools
         # Should have a substantial number of tools
         assert len(tools) >= 30
+
+
+class TestLazyImports:
+    """Tool-specific dependencies should load on first use, not at startup."""
+
+    def test_heavy_modules_not_imported_at_startup(self):
+        import os
+        import subprocess
+        import sys
+        from pathlib import Path
+
+        src = str(Path(__file__).resolve().parent.parent / "src")
+        code = (
+            "import sys, winremote.__main__; "
+            "print(','.join(m for m in ('pyautogui', 'psutil', 'winremote.process_mgr', 'winremote.ocr') "
+            "if m in sys.modules))"
+        )
+        env = {**os.environ, "PYTHONPATH": src}
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, timeout=60)
+        if result.returncode != 0:
+            pytest.skip(f"winremote cannot be imported outside the test mocks: {result.stderr[-200:]}")
+        assert result.stdout.strip() == ""
+
+
+class TestRegisterTools:
+    """Only enabled tools from the spec table are registered."""
+
+    def test_spec_table_covers_all_tools(self):
+        from winremote.__main__ import _TOOL_SPECS
+        from winremote.tiers import ALL_TOOLS
+
+        assert {fn.__name__ for fn, _ in _TOOL_SPECS} == ALL_TOOLS
+
+    def test_registers_enabled_subset(self):
+        from unittest.mock import patch
+
+        from fastmcp import FastMCP
+
+        import winremote.__main__ as main
+
+        server = FastMCP("test")
+        with patch.object(main, "mcp", server):
+            added = main.register_tools({"Wait", "CancelTask"})
+            assert main.register_tools({"Wait"}) == []
+        tools = server._tool_manager._tools
+        assert sorted(added) == sorted(tools) == ["CancelTask", "Wait"]
+        assert tools["Wait"].annotations.title == "Wait"
+        assert tools["Wait"].fn is not main.Wait  # wrapped by the task manager
+        assert tools["CancelTask"].fn is main.CancelTask
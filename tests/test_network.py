@@ -2,61 +2,108 @@
 
 from __future__ import annotations
 
+import asyncio
 import socket
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 
-class TestPing:
-    @patch("winremote.network.subprocess.run")
-    def test_ping_success(self, mock_run):
-        mock_run.return_value = MagicMock(stdout="Reply from 8.8.8.8: bytes=32", stderr="", returncode=0)
-        from winremote.network import ping
-
-        result = ping("8.8.8.8", count=2)
-        assert "Reply" in result
+def _fake_proc(stdout=b"", stderr=b"", hang=False):
+    async def communicate():
+        if hang:
+            await asyncio.sleep(10)
+        return stdout, stderr
 
-    @patch("winremote.network.subprocess.run")
-    def test_ping_timeout(self, mock_run):
-        import subprocess
+    return MagicMock(communicate=communicate, wait=AsyncMock(), kill=MagicMock())
 
-        mock_run.side_effect = subprocess.TimeoutExpired("ping", 20)
-        from winremote.network import ping
 
-        result = ping("unreachable.host")
+class TestPing:
+    @patch("winremote.network.HAS_ICMPLIB", False)
+    def test_ping_success(self):
+        proc = _fake_proc(stdout=b"Reply from 8.8.8.8: bytes=32\r\n")
+        with patch("asyncio.create_subprocess_exec", AsyncMock(return_value=proc)) as spawn:
+            from winremote.network import ping
+
+            result = asyncio.run(ping("8.8.8.8", count=2))
+        assert spawn.call_args.args == ("ping", "-n", "2", "8.8.8.8")
+        assert result == "Reply from 8.8.8.8: bytes=32"
+
+    @patch("winremote.network.HAS_ICMPLIB", False)
+    def test_ping_timeout(self):
+        async def expire(aw, timeout):
+            aw.close()
+            raise asyncio.TimeoutError
+
+        proc = _fake_proc(hang=True)
+        with (
+            patch("asyncio.create_subprocess_exec", AsyncMock(return_value=proc)),
+            patch("asyncio.wait_for", expire),
+        ):
+            from winremote.network import ping
+
+            result = asyncio.run(ping("unreachable.host"))
         assert "timed out" in result.lower()
+        proc.kill.assert_called_once()
+
+    def test_ping_icmplib_skips_subprocess(self):
+        from winremote import network
+
+        host = MagicMock(
+            address="8.8.8.8",
+            packets_sent=2,
+            packets_received=2,
+            packet_loss=0.0,
+            is_alive=True,
+            min_rtt=9.5,
+            avg_rtt=10.25,
+            max_rtt=11.0,
+        )
+        fake = MagicMock(async_ping=AsyncMock(return_value=host), ICMPLibError=Exception)
+        with (
+            patch.object(network, "HAS_ICMPLIB", True),
+            patch.object(network, "icmplib", fake, create=True),
+            patch("asyncio.create_subprocess_exec") as spawn,
+        ):
+            result = asyncio.run(network.ping("dns.google", count=2))
+        fake.async_ping.assert_awaited_once_with("dns.google", count=2, timeout=1, privileged=False)
+        spawn.assert_not_called()
+        assert "received=2 loss=0%" in result
+        assert "10.2" in result
 
 
 class TestPortCheck:
-    @patch("socket.socket")
-    def test_port_open(self, mock_socket_cls):
-        mock_sock = MagicMock()
-        mock_sock.connect_ex.return_value = 0
-        mock_socket_cls.return_value = mock_sock
-        from winremote.network import port_check
-
-        result = port_check("localhost", 80)
+    def test_port_open(self):
+        writer = MagicMock(wait_closed=AsyncMock())
+        with patch("asyncio.open_connection", AsyncMock(return_value=(MagicMock(), writer))):
+            from winremote.network import port_check
+
+            result = asyncio.run(port_check("localhost", 80))
         assert "OPEN" in result
+        writer.close.assert_called_once()
 
-    @patch("socket.socket")
-    def test_port_closed(self, mock_socket_cls):
-        mock_sock = MagicMock()
-        mock_sock.connect_ex.return_value = 111
-        mock_socket_cls.return_value = mock_sock
-        from winremote.network import port_check
+    def test_port_closed(self):
+        with patch("asyncio.open_connection", AsyncMock(side_effect=ConnectionRefusedError(111, "refused"))):
+            from winremote.network import port_check
 
-        result = port_check("localhost", 9999)
-        assert "CLOSED" in result
+            result = asyncio.run(port_check("localhost", 9999))
+        assert result == "Port 9999 on localhost is CLOSED (code 111)"
 
-    @patch("socket.socket")
-    def test_port_timeout(self, mock_socket_cls):
-        mock_sock = MagicMock()
-        mock_sock.connect_ex.side_effect = socket.timeout("timed out")
-        mock_socket_cls.return_value = mock_sock
-        from winremote.network import port_check
+    def test_port_timeout(self):
+        async def never_connects(*args):
+            await asyncio.sleep(10)
 
-        result = port_check("slow.host", 80)
+        with patch("asyncio.open_connection", never_connects):
+            from winremote.network import port_check
+
+            result = asyncio.run(port_check("slow.host", 80, timeout=0.01))
         assert "timed out" in result
 
+    def test_unresolvable_host(self):
+        with patch("asyncio.open_connection", AsyncMock(side_effect=socket.gaierror(11001, "getaddrinfo failed"))):
+            from winremote.network import port_check
+
+            result = asyncio.run(port_check("no.such.host", 80))
+        assert result.startswith("PortCheck error:")
+
 
 class TestNetConnections:
     @patch("psutil.net_connections")
@@ -0,0 +1,94 @@
+"""Unit tests for OCR preprocessing and engine selection in ocr.py."""
+
+from __future__ import annotations
+
+import sys
+from unittest.mock import MagicMock, patch
+
+from PIL import Image, ImageDraw
+
+from winremote import ocr
+
+
+def _text_like(size=(200, 40)):
+    img = Image.new("RGB", size, (230, 230, 230))
+    ImageDraw.Draw(img).rectangle([20, 10, 120, 25], fill=(40, 40, 40))
+    return img
+
+
+class TestPrepareForOcr:
+    def test_small_region_upscaled_and_binarised(self):
+        out = ocr.prepare_for_ocr(_text_like())
+        assert out.mode == "L"
+        assert out.size == (650, 130)
+        assert {c for _, c in out.getcolors()} == {0, 255}
+
+    def test_huge_capture_downscaled(self):
+        out = ocr.prepare_for_ocr(Image.new("RGB", (100, 4000)))
+        assert out.height == 2000
+
+    def test_otsu_splits_two_levels(self):
+        img = Image.new("L", (10, 10), 50)
+        img.paste(200, (0, 0, 5, 10))
+        assert 50 <= ocr._otsu_threshold(img) < 200
+
+
+class TestTesserocr:
+    def setup_method(self):
+        ocr._ocr_cache.clear()
+
+    def teardown_method(self):
+        ocr._tess_apis.clear()
+        ocr._ocr_cache.clear()
+
+    def test_engine_reused_per_language(self):
+        fake = MagicMock()
+        fake.PyTessBaseAPI.return_value.GetUTF8Text.return_value = " hello \n"
+        with (
+            patch.dict(sys.modules, {"tesserocr": fake}),
+            patch.object(ocr.ImageGrab, "grab", side_effect=[_text_like(), _text_like((300, 40))]),
+        ):
+            assert ocr.run_ocr(lang="eng") == "hello"
+            assert ocr.run_ocr(lang="eng") == "hello"
+        fake.PyTessBaseAPI.assert_called_once_with(lang="eng")
+        assert fake.PyTessBaseAPI.return_value.SetImage.call_count == 2
+
+    def test_falls_back_to_pytesseract(self):
+        fake = MagicMock()
+        fake.image_to_string.return_value = "fallback"
+        with (
+            patch.dict(sys.modules, {"tesserocr": None, "pytesseract": fake}),
+            patch.object(ocr.ImageGrab, "grab", return_value=_text_like()),
+        ):
+            assert ocr.run_ocr() == "fallback"
+        assert fake.image_to_string.call_args[0][0].mode == "L"
+
+
+class TestOcrCache:
+    def setup_method(self):
+        ocr._ocr_cache.clear()
+
+    def teardown_method(self):
+        ocr._ocr_cache.clear()
+
+    def test_unchanged_region_skips_recognition(self):
+        fake = MagicMock()
+        fake.image_to_string.return_value = "static"
+        with (
+            patch.dict(sys.modules, {"tesserocr": None, "pytesseract": fake}),
+            patch.object(ocr.ImageGrab, "grab", side_effect=lambda **kw: _text_like()),
+        ):
+            assert ocr.run_ocr() == "static"
+            assert ocr.run_ocr() == "static"
+            ocr.run_ocr(lang="deu")
+        assert fake.image_to_string.call_count == 2
+
+    def test_failures_not_cached(self):
+        with (
+            patch.dict(sys.modules, {"tesserocr": None, "pytesseract": None}),
+            patch.object(ocr.ImageGrab, "grab", side_effect=lambda **kw: _text_like()),
+            patch.object(ocr, "ocr_windows_builtin", return_value="") as windows,
+        ):
+            assert ocr.run_ocr().startswith("OCR failed")
+            ocr.run_ocr()
+        assert windows.call_count == 2
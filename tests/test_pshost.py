@@ -0,0 +1,154 @@
+"""Unit tests for the persistent PowerShell host pool."""
+
+from __future__ import annotations
+
+import base64
+import os
+import queue
+import subprocess
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from winremote import pshost
+
+
+class _FakeHost:
+    instances = 0
+
+    def __init__(self):
+        _FakeHost.instances += 1
+        self.uses = 0
+        self.alive = True
+        self.closed = False
+
+    def run(self, command, timeout=30, cwd=""):
+        self.uses += 1
+        if command == "hang":
+            raise subprocess.TimeoutExpired(command, timeout)
+        return subprocess.CompletedProcess(command, 0, f"{command}@{cwd}", "")
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_hosts():
+    _FakeHost.instances = 0
+    with patch.object(pshost, "PowerShellHost", _FakeHost):
+        yield
+
+
+class TestPowerShellPool:
+    def test_host_is_reused(self, fake_hosts):
+        pool = pshost.PowerShellPool(size=2)
+        assert pool.run("a", cwd="C:\\").stdout == "a@C:\\"
+        pool.run("b")
+        assert _FakeHost.instances == 1
+
+    def test_timeout_discards_host(self, fake_hosts):
+        pool = pshost.PowerShellPool()
+        with pytest.raises(subprocess.TimeoutExpired):
+            pool.run("hang", timeout=1)
+        assert pool._idle == []
+        pool.run("ok")
+        assert _FakeHost.instances == 2
+
+    def test_recycled_after_max_uses(self, fake_hosts):
+        pool = pshost.PowerShellPool(max_uses=2)
+        for _ in range(3):
+            pool.run("x")
+        assert _FakeHost.instances == 2
+
+    def test_falls_back_when_powershell_missing(self):
+        pool = pshost.PowerShellPool()
+        with (
+            patch.object(pshost, "PowerShellHost", side_effect=FileNotFoundError),
+            patch("subprocess.run") as mock_run,
+        ):
+            mock_run.return_value = MagicMock(stdout="hi", stderr="", returncode=0)
+            assert pool.run("echo hi").stdout == "hi"
+            pool.run("echo again")
+        assert pool._unavailable
+        assert mock_run.call_count == 2
+
+    def test_fallback_runs_in_cwd_without_splicing_command(self):
+        with patch("subprocess.run") as mock_run:
+            pshost._run_once("Get-ChildItem", 30, "C:\\My Dir")
+        args, kwargs = mock_run.call_args
+        assert args[0][-1] == "Get-ChildItem"
+        assert kwargs["cwd"] == "C:\\My Dir"
+
+
+class TestPowerShellHostCollect:
+    def _host(self):
+        host = object.__new__(pshost.PowerShellHost)
+        host.sentinel = "__S__"
+        return host
+
+    def test_reads_until_sentinel(self):
+        q = queue.Queue()
+        for line in ("one\n", "two\n", "\n", "__S__3\n", "stale\n"):
+            q.put(line)
+        text, rc = self._host()._collect(q, float("inf"), "cmd", 30)
+        assert text == "one\ntwo\n"
+        assert rc == 3
+
+    def test_output_without_trailing_newline(self):
+        # Wrapper writes "`n" + sentinel, so unterminated output ends up on its own line
+        q = queue.Queue()
+        for line in ("x\n", "__S__0\n"):
+            q.put(line)
+        assert self._host()._collect(q, float("inf"), "cmd", 30) == ("x", 0)
+
+    def test_extra_newline_dropped(self):
+        q = queue.Queue()
+        for line in ("a\n", "\n", "__S__0\n"):
+            q.put(line)
+        assert self._host()._collect(q, float("inf"), "cmd", 30) == ("a\n", 0)
+
+    def test_sentinel_mid_line(self):
+        q = queue.Queue()
+        q.put("partial__S__2\n")
+        assert self._host()._collect(q, float("inf"), "cmd", 30) == ("partial", 2)
+
+    def test_eof_without_sentinel(self):
+        q = queue.Queue()
+        q.put("bye\n")
+        q.put(None)
+        assert self._host()._collect(q, float("inf"), "cmd", 30) == ("bye\n", None)
+
+    def test_timeout(self):
+        with pytest.raises(subprocess.TimeoutExpired):
+            self._host()._collect(queue.Queue(), 0, "cmd", 5)
+
+
+class TestPowerShellHostRun:
+    def _run(self, cwd):
+        host = object.__new__(pshost.PowerShellHost)
+        host.sentinel = "__S__"
+        host.uses = 0
+        host.proc = MagicMock()
+        host._out, host._err = queue.Queue(), queue.Queue()
+        host._out.put("\n")
+        host._out.put("__S__0\n")
+        host._err.put("\n")
+        host._err.put("__S__\n")
+        result = host.run("cd C:\\Windows", cwd=cwd)
+        assert (result.returncode, result.stdout, result.stderr) == (0, "", "")
+        return host.proc.stdin.write.call_args[0][0]
+
+    def test_location_set_and_restored_without_cwd(self):
+        sent = self._run("")
+        assert sent.count("\n") == 1
+        assert f"FromBase64String('{base64.b64encode(os.getcwd().encode()).decode()}')" in sent
+        assert "$__loc = Get-Location" in sent
+        assert "finally { Set-Location -LiteralPath $__loc.Path;" in sent
+        assert "Push-Location" not in sent and "Pop-Location" not in sent
+
+    def test_explicit_cwd_and_env_restore(self):
+        sent = self._run("C:/Temp")
+        assert f"FromBase64String('{pshost._b64('C:/Temp')}')" in sent
+        assert "SetEnvironmentVariable($__k, $global:__winremote_env[$__k])" in sent
+        assert "__winremote_env" in pshost._INIT
+        assert '"`n__S__"' in sent
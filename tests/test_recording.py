@@ -0,0 +1,60 @@
+"""Unit tests for ScreenRecord's GIF pipeline in recording.py."""
+
+from __future__ import annotations
+
+import base64
+import io
+from unittest.mock import patch
+
+from PIL import Image
+
+from winremote import recording
+
+
+def _frames(*colors, size=(40, 20)):
+    return [Image.new("RGB", size, c) for c in colors]
+
+
+def _record(frames, **kwargs):
+    with (
+        patch.object(recording.desktop, "_grab_screen", side_effect=frames),
+        patch.object(recording.time, "sleep"),
+    ):
+        b64 = recording.record_screen(duration=len(frames), fps=1, **kwargs)
+    return Image.open(io.BytesIO(base64.b64decode(b64)))
+
+
+class TestFixedPalette:
+    def test_shared_palette_is_p_mode(self):
+        pal = recording._shared_palette(_frames("red")[0])
+        assert pal.mode == "P"
+
+    def test_fixed_palette_gif(self):
+        first = Image.new("RGB", (40, 20), "red")
+        first.paste(Image.new("RGB", (10, 20), "blue"), (0, 0))
+        first.paste(Image.new("RGB", (10, 20), "green"), (10, 0))
+        gif = _record([first, *_frames("blue", "green")], palette="fixed")
+        assert gif.format == "GIF"
+        assert gif.n_frames == 3
+        gif.seek(1)
+        assert gif.convert("RGB").getpixel((0, 0)) == (0, 0, 255)
+
+
+class TestDuplicateFrames:
+    def test_repeats_extend_previous_frame(self):
+        gif = _record(_frames("red", "red", "red", "blue"))
+        assert gif.n_frames == 2
+        assert gif.info["duration"] == 3000
+        gif.seek(1)
+        assert gif.info["duration"] == 1000
+
+
+class TestCaptureThread:
+    def test_capture_error_is_raised(self):
+        import pytest
+
+        with (
+            patch.object(recording.desktop, "_grab_screen", side_effect=OSError("screen grab failed")),
+            pytest.raises(OSError, match="screen grab failed"),
+        ):
+            recording.record_screen(duration=1, fps=1)
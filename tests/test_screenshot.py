@@ -0,0 +1,176 @@
+"""Unit tests for the screenshot capture/encode pipeline in desktop.py."""
+
+from __future__ import annotations
+
+import base64
+import io
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from PIL import Image
+
+from winremote import desktop
+
+
+def _fake_mss(width=200, height=100):
+    sct = MagicMock()
+    sct.monitors = [
+        {"left": 0, "top": 0, "width": width, "height": height},
+        {"left": 0, "top": 0, "width": width, "height": height},
+    ]
+    # BGRA buffer: pure blue pixels
+    sct.grab.return_value = SimpleNamespace(size=(width, height), bgra=b"\xff\x00\x00\xff" * (width * height))
+    return sct
+
+
+class TestGrabScreen:
+    def test_mss_path_converts_bgra(self):
+        sct = _fake_mss()
+        with patch.object(desktop, "HAS_MSS", True), patch.object(desktop, "_get_mss", return_value=sct):
+            img = desktop._grab_screen(1)
+        sct.grab.assert_called_once_with(sct.monitors[1])
+        assert img.size == (200, 100)
+        assert img.getpixel((0, 0)) == (0, 0, 255)
+
+    def test_mss_path_bad_monitor(self):
+        with patch.object(desktop, "HAS_MSS", True), patch.object(desktop, "_get_mss", return_value=_fake_mss()):
+            with pytest.raises(IndexError, match="Monitor 5 not found"):
+                desktop._grab_screen(5)
+
+    def test_mss_path_region(self):
+        sct = _fake_mss()
+        with patch.object(desktop, "HAS_MSS", True), patch.object(desktop, "_get_mss", return_value=sct):
+            desktop._grab_screen(1, (10, 20, 110, 70))
+        sct.grab.assert_called_once_with((10, 20, 110, 70))
+
+    def test_imagegrab_fallback(self):
+        fake = Image.new("RGB", (10, 10))
+        with patch.object(desktop, "HAS_MSS", False), patch.object(desktop.ImageGrab, "grab", return_value=fake) as g:
+            assert desktop._grab_screen(0) is fake
+        g.assert_called_once_with(all_screens=True)
+
+
+class TestGrabberReuse:
+    def teardown_method(self):
+        desktop._mss_local.__dict__.pop("sct", None)
+        desktop._mss_all.clear()
+
+    def test_one_grabber_per_thread(self):
+        import threading
+
+        fake_mss = MagicMock()
+        fake_mss.mss.side_effect = lambda: MagicMock()
+        with patch.object(desktop, "mss", fake_mss, create=True):
+            main = desktop._get_mss()
+            assert desktop._get_mss() is main
+            other = []
+            t = threading.Thread(target=lambda: other.append(desktop._get_mss()))
+            t.start()
+            t.join()
+        assert other[0] is not main
+        assert fake_mss.mss.call_count == 2
+
+    def test_new_grabber_after_display_change(self):
+        fake_mss = MagicMock()
+        fake_mss.mss.side_effect = lambda: MagicMock()
+        layouts = [(0, 0, 1920, 1080, 1), (0, 0, 1920, 1080, 1), (0, 0, 3840, 1080, 2)]
+        with (
+            patch.object(desktop, "mss", fake_mss, create=True),
+            patch.object(desktop, "_display_geometry", side_effect=layouts),
+        ):
+            first = desktop._get_mss()
+            assert desktop._get_mss() is first
+            second = desktop._get_mss()
+        assert second is not first
+        first.close.assert_called_once()
+        assert desktop._mss_all == [second]
+
+    def test_close_releases_all(self):
+        fake_mss = MagicMock()
+        with patch.object(desktop, "mss", fake_mss, create=True):
+            sct = desktop._get_mss()
+        desktop._close_mss()
+        sct.close.assert_called_once()
+        assert desktop._mss_all == []
+
+    def test_release_current_thread(self):
+        fake_mss = MagicMock()
+        fake_mss.mss.side_effect = lambda: MagicMock()
+        with patch.object(desktop, "mss", fake_mss, create=True):
+            sct = desktop._get_mss()
+            desktop._release_mss()
+            assert desktop._get_mss() is not sct
+        sct.close.assert_called_once()
+        assert len(desktop._mss_all) == 1
+
+
+class TestTakeScreenshot:
+    def test_resizes_and_encodes_jpeg(self):
+        with patch.object(desktop, "HAS_MSS", True), patch.object(desktop, "_get_mss", return_value=_fake_mss()):
+            b64 = desktop.take_screenshot(quality=60, max_width=100, monitor=0)
+        img = Image.open(io.BytesIO(base64.b64decode(b64)))
+        assert img.format == "JPEG"
+        assert img.size == (100, 50)
+
+    @pytest.mark.parametrize("src, factor", [((3840, 2160), 2), ((3840, 1080), 3), ((2000, 100), None)])
+    def test_large_downscale_box_reduces_first(self, src, factor):
+        max_width = {2: 1920, 3: 1280, None: 1280}[factor]
+        reduce = Image.Image.reduce
+        with (
+            patch.object(desktop, "HAS_MSS", True),
+            patch.object(desktop, "_get_mss", return_value=_fake_mss(*src)),
+            patch.object(Image.Image, "reduce", autospec=True, side_effect=reduce) as spy,
+        ):
+            shot = desktop.capture_screenshot(max_width=max_width)
+        if factor:
+            assert spy.call_args.args[1] == factor
+        else:
+            spy.assert_not_called()
+        assert (shot.width, shot.height) == (max_width, int(src[1] * max_width / src[0]))
+        assert shot.scale == src[0] / max_width
+
+    def test_grayscale_reports_sizes(self):
+        with patch.object(desktop, "HAS_MSS", True), patch.object(desktop, "_get_mss", return_value=_fake_mss()):
+            shot = desktop.capture_screenshot(quality=60, max_width=100, grayscale=True)
+        img = Image.open(io.BytesIO(base64.b64decode(shot.data)))
+        assert img.mode == "L"
+        assert (shot.width, shot.height, shot.native_width, shot.native_height) == (100, 50, 200, 100)
+        assert shot.scale == 2.0
+
+    def test_native_size_encodes_bgra_directly(self):
+        sct = _fake_mss()
+        sct.grab.return_value.raw = bytearray(sct.grab.return_value.bgra)
+        fake_np, fake_jpeg = MagicMock(), MagicMock()
+        fake_jpeg.encode_jpeg.return_value = b"\xff\xd8jpeg"
+        with (
+            patch.object(desktop, "HAS_MSS", True),
+            patch.object(desktop, "HAS_SIMPLEJPEG", True),
+            patch.object(desktop, "_get_mss", return_value=sct),
+            patch.object(desktop, "np", fake_np, create=True),
+            patch.object(desktop, "simplejpeg", fake_jpeg, create=True),
+        ):
+            shot = desktop.capture_screenshot(quality=70, raw=True)
+        fake_np.frombuffer.assert_called_once_with(sct.grab.return_value.raw, fake_np.uint8)
+        fake_np.frombuffer.return_value.reshape.assert_called_once_with(100, 200, 4)
+        assert fake_jpeg.encode_jpeg.call_args.kwargs["colorspace"] == "BGRX"
+        assert shot == desktop.Screenshot(b"\xff\xd8jpeg", 200, 100, 200, 100)
+
+    def test_pil_encoder_fallback(self):
+        img = Image.new("RGBA", (8, 8), (255, 0, 0, 255))
+        with patch.object(desktop, "HAS_SIMPLEJPEG", False):
+            data = desktop._encode_jpeg(img, 75)
+        assert data[:2] == b"\xff\xd8"
+
+
+class TestB64Text:
+    def test_stdlib_fallback(self):
+        with patch.object(desktop, "HAS_PYBASE64", False):
+            assert desktop.b64_text(memoryview(b"\xff\xd8jpeg")) == "/9hqcGVn"
+
+    def test_prefers_pybase64(self):
+        fake = MagicMock()
+        fake.b64encode.return_value = b"/9hqcGVn"
+        with patch.object(desktop, "HAS_PYBASE64", True), patch.object(desktop, "pybase64", fake, create=True):
+            assert desktop.b64_text(b"\xff\xd8jpeg") == "/9hqcGVn"
+        fake.b64encode.assert_called_once_with(b"\xff\xd8jpeg")
@@ -9,7 +9,7 @@ from starlette.responses import JSONResponse
 from starlette.routing import Route
 from starlette.testclient import TestClient
 
-from winremote.security import IPAllowlistMiddleware, parse_ip_allowlist
+from winremote.security import IPAllowlistMiddleware, compile_ip_ranges, ip_in_ranges, parse_ip_allowlist
 
 
 def _make_app(allowlist: list[str]):
@@ -43,6 +43,28 @@ class TestParseIPAllowlist:
             assert "bad-ip" in str(exc)
 
 
+class TestCompileIPRanges:
+    def test_overlapping_and_adjacent_ranges_merge(self):
+        ranges = compile_ip_ranges(parse_ip_allowlist(["10.0.0.0/25", "10.0.0.128/25", "10.0.0.5", "192.168.1.1"]))
+        starts, ends = ranges[4]
+        assert len(starts) == 2
+        assert ranges[6] == ([], [])
+
+    def test_lookup(self):
+        ranges = compile_ip_ranges(parse_ip_allowlist(["192.168.1.0/24", "10.0.0.1", "::1"]))
+        for ip, expected in [
+            ("192.168.1.0", True),
+            ("192.168.1.255", True),
+            ("192.168.2.0", False),
+            ("10.0.0.1", True),
+            ("10.0.0.2", False),
+            ("1.1.1.1", False),
+            ("::1", True),
+            ("::2", False),
+        ]:
+            assert ip_in_ranges(ipaddress.ip_address(ip), ranges) is expected, ip
+
+
 class TestIPAllowlistMiddleware:
     def test_health_is_public(self):
         app = _make_app(["127.0.0.1/32"])
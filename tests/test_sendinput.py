@@ -0,0 +1,154 @@
+"""Unit tests for the SendInput keyboard and mouse helpers."""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+from unittest.mock import patch
+
+import pyautogui
+import pytest
+
+from winremote import sendinput
+
+
+def _call_tool(tool_name, **kwargs):
+    from winremote.__main__ import mcp
+
+    tool = mcp._tool_manager._tools[tool_name]
+    result = tool.fn(**kwargs)
+    if inspect.isawaitable(result):
+        result = asyncio.run(result)
+    return result
+
+
+class TestParseHotkey:
+    def test_chord(self):
+        assert sendinput.parse_hotkey("Ctrl+Shift+S") == (0x11, 0x10, ord("S"))
+
+    def test_function_and_named_keys(self):
+        assert sendinput.parse_hotkey("alt + f4") == (0x12, 0x73)
+        assert sendinput.parse_hotkey("win+e") == (0x5B, ord("E"))
+
+    def test_unknown_key(self):
+        with pytest.raises(KeyError):
+            sendinput.parse_hotkey("ctrl+nosuchkey")
+
+
+class TestSendHotkey:
+    def test_press_then_release_reversed(self):
+        with patch.object(sendinput, "send_inputs") as send:
+            sendinput.send_hotkey((0x11, 0x25))
+        events = [(i.ki.wVk, i.ki.dwFlags) for i in send.call_args.args[0]]
+        assert events == [
+            (0x11, 0),
+            (0x25, sendinput.KEYEVENTF_EXTENDEDKEY),
+            (0x25, sendinput.KEYEVENTF_EXTENDEDKEY | sendinput.KEYEVENTF_KEYUP),
+            (0x11, sendinput.KEYEVENTF_KEYUP),
+        ]
+
+
+class TestTextInputs:
+    def test_bmp_and_astral_chars(self):
+        events = [(i.ki.wVk, i.ki.wScan, i.ki.dwFlags) for i in sendinput.text_inputs("a😀")]
+        down, up = sendinput.KEYEVENTF_UNICODE, sendinput.KEYEVENTF_UNICODE | sendinput.KEYEVENTF_KEYUP
+        assert events == [
+            (0, ord("a"), down),
+            (0, ord("a"), up),
+            (0, 0xD83D, down),
+            (0, 0xD83D, up),
+            (0, 0xDE00, down),
+            (0, 0xDE00, up),
+        ]
+
+    def test_newlines_become_enter(self):
+        events = [(i.ki.wVk, i.ki.dwFlags) for i in sendinput.text_inputs("x\r\ny")]
+        assert events[2:4] == [(0x0D, 0), (0x0D, sendinput.KEYEVENTF_KEYUP)]
+        assert len(events) == 6
+
+
+class TestShortcutSendInput:
+    def test_uses_sendinput(self):
+        with patch.object(sendinput, "HAS_SENDINPUT", True), patch.object(sendinput, "send_hotkey") as send:
+            result = _call_tool("Shortcut", keys="ctrl+c")
+        send.assert_called_once_with((0x11, ord("C")))
+        pyautogui.hotkey.assert_not_called()
+        assert "Executed shortcut" in result
+
+    def test_unknown_key_falls_back(self):
+        with patch.object(sendinput, "HAS_SENDINPUT", True), patch.object(sendinput, "send_hotkey") as send:
+            _call_tool("Shortcut", keys="ctrl+browserback")
+        send.assert_not_called()
+        pyautogui.hotkey.assert_called_with("ctrl", "browserback")
+
+
+class TestTypeSendInput:
+    def test_type_uses_single_batch(self):
+        with patch.object(sendinput, "HAS_SENDINPUT", True), patch.object(sendinput, "send_inputs") as send:
+            result = _call_tool("Type", text="héllo")
+        send.assert_called_once()
+        assert len(send.call_args.args[0]) == 10
+        pyautogui.typewrite.assert_not_called()
+        assert "Typed 5 chars" in result
+
+    def test_slow_mode_sends_one_char_at_a_time(self):
+        with (
+            patch.object(sendinput, "HAS_SENDINPUT", True),
+            patch.object(sendinput, "send_inputs") as send,
+            patch("winremote.sendinput.time.sleep") as sleep,
+        ):
+            result = _call_tool("Type", text="a\r\nb", mode="slow")
+        assert [len(c.args[0]) for c in send.call_args_list] == [2, 2, 2]
+        assert sleep.call_count == 3
+        sleep.assert_called_with(0.02)
+        assert "Typed 4 chars" in result
+
+    def test_clear_and_enter_skip_pyautogui(self):
+        with (
+            patch.object(sendinput, "HAS_SENDINPUT", True),
+            patch.object(sendinput, "send_inputs"),
+            patch.object(sendinput, "send_hotkey") as hotkey,
+        ):
+            _call_tool("Type", text="hi", clear=True, press_enter=True)
+        assert [c.args[0] for c in hotkey.call_args_list] == [(0x11, ord("A")), (0x2E,), (0x0D,)]
+        pyautogui.hotkey.assert_not_called()
+        pyautogui.press.assert_not_called()
+
+
+class TestMouseSendInput:
+    def test_double_click_is_one_burst(self):
+        with (
+            patch.object(sendinput, "HAS_SENDINPUT", True),
+            patch.object(sendinput, "move_input", return_value="move") as move,
+            patch.object(sendinput, "send_inputs") as send,
+        ):
+            result = _call_tool("Click", x=10, y=20, button="right", action="double")
+        move.assert_called_once_with(10, 20)
+        send.assert_called_once()
+        events = send.call_args.args[0]
+        assert events[0] == "move"
+        assert [i.mi.dwFlags for i in events[1:]] == [*sendinput.MOUSE_BUTTONS["right"]] * 2
+        pyautogui.doubleClick.assert_not_called()
+        assert "Double-clicked right at (10,20)" in result
+
+    def test_hover_only_moves(self):
+        with (
+            patch.object(sendinput, "HAS_SENDINPUT", True),
+            patch.object(sendinput, "move_input", return_value="move"),
+            patch.object(sendinput, "send_inputs") as send,
+        ):
+            _call_tool("Click", x=1, y=2, action="hover")
+        assert send.call_args.args[0] == ["move"]
+
+    def test_scroll_at_position(self):
+        with (
+            patch.object(sendinput, "HAS_SENDINPUT", True),
+            patch.object(sendinput, "move_input", return_value="move"),
+            patch.object(sendinput, "send_inputs") as send,
+        ):
+            result = _call_tool("Scroll", amount=-3, x=5, y=6, horizontal=True)
+        move, wheel = send.call_args.args[0]
+        assert move == "move"
+        assert wheel.mi.dwFlags == sendinput.MOUSEEVENTF_HWHEEL
+        pyautogui.hscroll.assert_not_called()
+        assert "Scrolled -3 horizontally" in result
@@ -6,9 +6,14 @@ from unittest.mock import MagicMock, patch
 
 
 class TestServiceList:
+    def setup_method(self):
+        from winremote import services
+
+        services.clear_cache()
+
     @patch("winremote.services.subprocess.run")
     def test_service_list(self, mock_run):
-        mock_run.return_value = MagicMock(stdout="sshd  OpenSSH  Running", stderr="", returncode=0)
+        mock_run.return_value = MagicMock(stdout="sshd\tOpenSSH\tRunning\n", stderr="", returncode=0)
         from winremote.services import service_list
 
         result = service_list()
@@ -16,11 +21,37 @@ class TestServiceList:
 
     @patch("winremote.services.subprocess.run")
     def test_service_list_filter(self, mock_run):
-        mock_run.return_value = MagicMock(stdout="sshd  OpenSSH  Running", stderr="", returncode=0)
+        mock_run.return_value = MagicMock(
+            stdout="sshd\tOpenSSH Server\tRunning\nSpooler\tPrint Spooler\tRunning\n", stderr="", returncode=0
+        )
         from winremote.services import service_list
 
         result = service_list("ssh")
         assert "sshd" in result
+        assert "Spooler" not in result
+        # Display names match too, case-insensitively
+        assert "Spooler" in service_list("print")
+        assert service_list("nothing") == "No services found."
+        mock_run.assert_called_once()
+
+    @patch("winremote.services.subprocess.run")
+    def test_service_stop_refreshes_listing(self, mock_run):
+        mock_run.return_value = MagicMock(stdout="sshd\tOpenSSH\tRunning\n", stderr="", returncode=0)
+        from winremote.services import service_list, service_stop
+
+        service_list()
+        service_stop("sshd")
+        service_list()
+        assert mock_run.call_count == 3
+
+    @patch("winremote.services.subprocess.run")
+    def test_failure_not_cached(self, mock_run):
+        mock_run.return_value = MagicMock(stdout="", stderr="Access denied", returncode=1)
+        from winremote.services import service_list
+
+        assert service_list() == "ServiceList error: Access denied"
+        service_list()
+        assert mock_run.call_count == 2
 
 
 class TestServiceStartStop:
@@ -42,9 +73,14 @@ class TestServiceStartStop:
 
 
 class TestTaskManagement:
+    def setup_method(self):
+        from winremote import services
+
+        services.clear_cache()
+
     @patch("winremote.services.subprocess.run")
     def test_task_list(self, mock_run):
-        mock_run.return_value = MagicMock(stdout="MyTask  Ready  \\", stderr="", returncode=0)
+        mock_run.return_value = MagicMock(stdout="MyTask\tReady\t\\\n", stderr="", returncode=0)
         from winremote.services import task_list
 
         result = task_list()
@@ -83,3 +119,47 @@ class TestEventLog:
 
         result = event_log("System", 10, "error")
         assert "error" in result
+
+
+class TestEventLogNative:
+    def _fake_evtlog(self, ids):
+        from datetime import datetime
+
+        evt = MagicMock()
+        evt.EvtSystemProviderName, evt.EvtSystemEventID, evt.EvtSystemLevel, evt.EvtSystemTimeCreated = 0, 2, 3, 8
+        batches = [ids, []]
+        evt.EvtNext.side_effect = lambda handle, n: batches.pop(0)[:n]
+        evt.EvtRender.side_effect = lambda e, flags, Context: [
+            ("Service Control Manager", 1),
+            (None, 0),
+            (e, 6),
+            (2, 2),
+            *[(None, 0)] * 4,
+            (datetime(2024, 5, 1, 10, 20, 30), 17),
+        ]
+        evt.EvtFormatMessage.return_value = "The service\r\n entered the stopped state."
+        return evt
+
+    def test_query_pushes_level_filter(self):
+        from winremote import services
+
+        fake = self._fake_evtlog([7036, 7040])
+        with patch.object(services, "HAS_EVTLOG", True), patch.object(services, "win32evtlog", fake, create=True):
+            result = services.event_log("System", 5, "error")
+        assert fake.EvtQuery.call_args[0][0] == "System"
+        assert fake.EvtQuery.call_args[0][2] == "*[System[Level=2]]"
+        assert fake.EvtNext.call_args_list[0][0][1] == 5
+        lines = result.splitlines()
+        assert len(lines) == 2
+        assert lines[0] == (
+            "2024-05-01 10:20:30   7036  Error        Service Control Manager: The service entered the stopped state."
+        )
+        fake.EvtOpenPublisherMetadata.assert_called_once_with("Service Control Manager")
+
+    def test_query_error(self):
+        from winremote import services
+
+        fake = MagicMock()
+        fake.EvtQuery.side_effect = Exception("channel not found")
+        with patch.object(services, "HAS_EVTLOG", True), patch.object(services, "win32evtlog", fake, create=True):
+            assert services.event_log("Nope") == "EventLog error: channel not found"
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+import inspect
 from unittest.mock import MagicMock, patch
 
 
@@ -9,7 +11,10 @@ def _call_tool(tool_name, **kwargs):
     from winremote.__main__ import mcp
 
     tool = mcp._tool_manager._tools[tool_name]
-    return tool.fn(**kwargs)
+    result = tool.fn(**kwargs)
+    if inspect.isawaitable(result):
+        result = asyncio.run(result)
+    return result
 
 
 class TestShell:
@@ -34,22 +39,138 @@ class TestShell:
         assert "timed out" in result.lower()
 
 
+async def _run_job(start_tool, **kwargs):
+    """Start a background job and poll it until it finishes."""
+    from winremote.__main__ import mcp
+
+    tools = mcp._tool_manager._tools
+    started = await tools[start_tool].fn(**kwargs)
+    job_id = started.split()[2].rstrip(".")
+    for _ in range(200):
+        status = tools["PollJob"].fn(job_id=job_id)
+        if "running" not in status and "pending" not in status:
+            return started, status
+        await asyncio.sleep(0.01)
+    return started, status
+
+
+class TestShellJob:
+    @patch("subprocess.run")
+    def test_start_then_poll(self, mock_run):
+        mock_run.return_value = MagicMock(stdout="done", stderr="", returncode=0)
+        started, status = asyncio.run(_run_job("ShellStart", command="long"))
+        assert started.startswith("Started job ")
+        assert "(ShellStart): completed" in status
+        assert status.endswith("\ndone")
+
+    def test_poll_unknown_job(self):
+        assert _call_tool("PollJob", job_id="nope") == "Job nope not found"
+
+
 class TestScrape:
-    @patch("urllib.request.urlopen")
-    def test_scrape_success(self, mock_urlopen):
-        mock_resp = MagicMock()
-        mock_resp.read.return_value = b"<html><body><h1>Hello</h1></body></html>"
-        mock_resp.__enter__ = MagicMock(return_value=mock_resp)
-        mock_resp.__exit__ = MagicMock(return_value=False)
-        mock_urlopen.return_value = mock_resp
-        result = _call_tool("Scrape", url="https://example.com")
-        assert "Hello" in result or "task:" in result
+    def setup_method(self):
+        from winremote import scrape
+
+        scrape.clear_cache()
+
+    @staticmethod
+    def _mock_client(handler):
+        import httpx
+
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler), follow_redirects=True)
+
+    def test_scrape_success(self):
+        import httpx
+
+        client = self._mock_client(lambda req: httpx.Response(200, html="<html><body><h1>Hello</h1></body></html>"))
+        with patch("winremote.scrape._get_client", return_value=client):
+            result = _call_tool("Scrape", url="https://example.com")
+        assert "# Hello" in result
+        assert "task:" in result
+
+    def test_scrape_http_error(self):
+        import httpx
+
+        client = self._mock_client(lambda req: httpx.Response(404))
+        with patch("winremote.scrape._get_client", return_value=client):
+            result = _call_tool("Scrape", url="https://example.com/missing")
+        assert "Scrape error" in result
+        assert "404" in result
 
     def test_scrape_error(self):
-        with patch("urllib.request.urlopen", side_effect=Exception("network error")):
+        import httpx
+
+        def boom(req):
+            raise httpx.ConnectError("network error")
+
+        with patch("winremote.scrape._get_client", return_value=self._mock_client(boom)):
             result = _call_tool("Scrape", url="https://bad.url")
             assert "error" in result.lower()
 
+    def test_repeat_url_served_from_cache(self):
+        import httpx
+
+        calls = []
+
+        def handler(req):
+            calls.append(req.url)
+            return httpx.Response(200, html="<p>cached</p>")
+
+        client = self._mock_client(handler)
+        with patch("winremote.scrape._get_client", return_value=client):
+            first = _call_tool("Scrape", url="https://example.com/a")
+            second = _call_tool("Scrape", url="https://example.com/a")
+        assert len(calls) == 1
+        assert "cached" in first and "cached" in second
+
+    def test_same_content_skips_conversion(self):
+        import httpx
+
+        from winremote import scrape
+
+        client = self._mock_client(lambda req: httpx.Response(200, html="<p>same</p>"))
+        with (
+            patch("winremote.scrape._get_client", return_value=client),
+            patch("winremote.scrape.html_to_markdown", wraps=scrape.html_to_markdown) as convert,
+        ):
+            _call_tool("Scrape", url="https://example.com/1")
+            _call_tool("Scrape", url="https://example.com/2")
+        assert convert.call_count == 1
+
+    def test_scrape_job(self):
+        import httpx
+
+        client = self._mock_client(lambda req: httpx.Response(200, html="<h1>Later</h1>"))
+        with patch("winremote.scrape._get_client", return_value=client):
+            _, status = asyncio.run(_run_job("ScrapeStart", url="https://example.com"))
+        assert "(ScrapeStart): completed" in status
+        assert "# Later" in status
+
+    def test_body_read_is_capped(self):
+        import httpx
+
+        client = self._mock_client(lambda req: httpx.Response(200, html="<p>" + "y" * 5000 + "</p>"))
+        with (
+            patch("winremote.scrape._get_client", return_value=client),
+            patch("winremote.scrape.MAX_HTML_BYTES", 1000),
+        ):
+            result = _call_tool("Scrape", url="https://example.com/big")
+        assert "y" * 990 in result
+        assert "y" * 1000 not in result
+        assert "[... page truncated at 1KB]" in result
+
+    def test_script_and_style_text_dropped(self):
+        from winremote.scrape import html_to_markdown
+
+        md = html_to_markdown("<style>p{color:red}</style><script>var x = 1;</script><p>body</p>")
+        assert md.strip() == "body"
+
+    def test_truncates_long_pages(self):
+        from winremote.scrape import MAX_MARKDOWN_CHARS, html_to_markdown
+
+        md = html_to_markdown("<p>" + "x" * (MAX_MARKDOWN_CHARS + 10) + "</p>")
+        assert md.endswith("[... truncated]")
+
 
 class TestApp:
     @patch("winremote.__main__.desktop")
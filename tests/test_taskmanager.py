@@ -73,6 +73,95 @@ class TestTaskManager:
         assert "Error" in result
         assert "boom" in result
 
+    def test_wrap_threaded_tool_runs_off_loop(self):
+        import asyncio
+        import threading
+
+        seen = {}
+
+        def my_tool(x):
+            seen["thread"] = threading.current_thread()
+            return f"result={x}"
+
+        wrapped = self.tm.wrap_threaded_tool("Click", my_tool)
+        result = asyncio.run(wrapped(42))
+        assert "result=42" in result
+        assert "task:" in result
+        assert seen["thread"] is not threading.main_thread()
+
+    def test_wrap_threaded_tool_skips_thread_semaphore(self):
+        import asyncio
+        import threading
+
+        # An exhausted threading semaphore would block (then time out) if it were taken
+        self.tm._thread_semaphores[ToolCategory.DESKTOP] = threading.Semaphore(0)
+        wrapped = self.tm.wrap_threaded_tool("Click", lambda: "clicked")
+        assert asyncio.run(wrapped()).endswith("clicked")
+
+    def test_wrap_async_tool(self):
+        import asyncio
+
+        async def my_tool(x):
+            return f"result={x}"
+
+        async def bad_tool():
+            raise RuntimeError("boom")
+
+        assert "result=7" in asyncio.run(self.tm.wrap_async_tool("Scrape", my_tool)(7))
+        result = asyncio.run(self.tm.wrap_async_tool("Scrape", bad_tool)())
+        assert "Error in Scrape: boom" in result
+        assert self.tm.list_tasks(status="failed")[0]["tool_name"] == "Scrape"
+
+    def test_submit_runs_in_background(self):
+        import asyncio
+
+        async def bad_job():
+            raise RuntimeError("boom")
+
+        async def run():
+            ok = self.tm.submit("ShellStart", lambda x: f"result={x}", 3)
+            bad = self.tm.submit("ScrapeStart", bad_job)
+            assert ok.status == TaskStatus.PENDING
+            await asyncio.sleep(0.1)
+            return ok, bad
+
+        ok, bad = asyncio.run(run())
+        assert ok.status == TaskStatus.COMPLETED
+        assert ok.result == "result=3"
+        assert ok.category == ToolCategory.SHELL
+        assert bad.status == TaskStatus.FAILED
+        assert bad.error == "boom"
+        assert self.tm.get_job(ok.task_id) is ok
+
+    def test_history_drops_oldest_finished(self):
+        self.tm._max_history = 3
+        wrapped = self.tm.wrap_sync_tool("Ping", lambda: "pong")
+        running = self.tm.create_task("Shell")
+        for _ in range(5):
+            wrapped()
+        tasks = self.tm.list_tasks()
+        assert len(tasks) == 4
+        assert self.tm.get_task(running.task_id) is not None
+
+    def test_cancelled_task_that_raises_is_finished_once(self):
+        import asyncio
+
+        self.tm._max_history = 2
+
+        def cancel_then_raise():
+            self.tm.cancel_task(self.tm.list_tasks(status="running")[0]["task_id"])
+            raise RuntimeError("interrupted")
+
+        async def cancel_then_raise_async():
+            cancel_then_raise()
+
+        assert self.tm.wrap_sync_tool("Shell", cancel_then_raise)().endswith("Cancelled during execution")
+        assert asyncio.run(self.tm.wrap_async_tool("Ping", cancel_then_raise_async)()).endswith(
+            "Cancelled during execution"
+        )
+        assert len(self.tm._finished) == 2
+        assert [t["status"] for t in self.tm.list_tasks()] == ["cancelled", "cancelled"]
+
     def test_task_duration(self):
         import time
 